@@ -0,0 +1,116 @@
+"""
+============================================================
+🧪 KeyCrypt — Breach Index Benchmark
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Builds 64- and 32-bit indexes from a synthetic breach list
+  with scriptsss/build_breach_index.py (same code path as prod)
+✔ False-positive rate: random passwords that are NOT in the
+  list, measured vs. expected n / 2^bits
+✔ Lookup cost: single contains() (warm page cache), and
+  batched contains_many() per password
+✔ Size on disk vs. a Python set of the same passwords
+
+Usage (from Engine/):
+    python -m benchmarks.bench_breach_index --entries 2000000 --probes 1000000
+============================================================
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import tempfile
+
+from benchmarks.fixtures import summarize_ms
+from scriptsss.build_breach_index import build_index
+from server.breach_index import BreachIndex
+
+
+def random_passwords(n: int, seed: int, prefix: str = ""):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    for i in range(n):
+        yield prefix + "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 14))) + str(i)
+
+
+def write_list(path: str, n: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for pw in random_passwords(n, seed=1, prefix="b:"):
+            f.write(pw + "\n")
+
+
+def measure(index: BreachIndex, members, probes, single_lookups: int) -> dict:
+    # False positives: the "n:" prefix guarantees probes are not in the list
+    start = time.perf_counter()
+    false_pos = int(index.contains_many(probes).sum())
+    batch_s = time.perf_counter() - start
+
+    # False negatives must be 0
+    missing = int((~index.contains_many(members)).sum())
+
+    samples = []
+    for pw in probes[:single_lookups]:
+        t0 = time.perf_counter()
+        index.contains(pw)
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "entries": len(index),
+        "bits": index.bits,
+        "bytes": int(index.fingerprints.nbytes),
+        "bytes_per_entry": round(index.fingerprints.nbytes / max(len(index), 1), 2),
+        "false_positives": false_pos,
+        "probes": len(probes),
+        "measured_fpr": false_pos / len(probes),
+        "expected_fpr": index.expected_fpr(),
+        "false_negatives": missing,
+        "single_lookup": summarize_ms(samples),
+        "batch_us_per_lookup": round(batch_s / len(probes) * 1e6, 3),
+    }
+
+
+def run_benchmark(entries: int, probes: int, single_lookups: int, root: str = None) -> dict:
+    root = root or tempfile.mkdtemp(prefix="kc-breach-")
+    list_path = os.path.join(root, "breach_list.txt")
+    print(f"🌱 Writing synthetic breach list ({entries} passwords) → {list_path}")
+    write_list(list_path, entries)
+
+    probe_list = list(random_passwords(probes, seed=2, prefix="n:"))
+    member_sample = list(random_passwords(min(entries, 100_000), seed=1, prefix="b:"))
+
+    # Baseline: what keeping the list in a Python set would cost per worker
+    sample = member_sample[:min(len(member_sample), 100_000)]
+    set_bytes_per_entry = (sys.getsizeof(set(sample)) + sum(sys.getsizeof(p) for p in sample)) / len(sample)
+
+    results = {"entries": entries, "python_set_bytes_per_entry": round(set_bytes_per_entry, 1), "indexes": []}
+    for bits in (64, 32):
+        output = os.path.join(root, f"breach_index_{bits}.npy")
+        print(f"🏗️  Building {bits}-bit index...")
+        meta = build_index([list_path], output, bits=bits)
+        index = BreachIndex(output)
+        run = measure(index, member_sample, probe_list, single_lookups)
+        run["build_s"] = meta["timings_s"]["total"]
+        print(f"   → {run['bytes_per_entry']} B/entry, FPR {run['measured_fpr']:.2e} "
+              f"(expected {run['expected_fpr']:.2e}), single p50 {run['single_lookup']['p50_ms'] * 1000:.1f} µs, "
+              f"p99 {run['single_lookup']['p99_ms'] * 1000:.1f} µs, batch {run['batch_us_per_lookup']} µs/lookup")
+        results["indexes"].append(run)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Breach index FPR / lookup-cost benchmark")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--probes", type=int, default=500_000)
+    parser.add_argument("--single-lookups", type=int, default=20_000)
+    parser.add_argument("--root", default=None)
+    parser.add_argument("--output", default="breach_index_results.json")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.entries, args.probes, args.single_lookups, args.root)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results saved → {args.output}")
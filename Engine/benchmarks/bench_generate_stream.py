@@ -0,0 +1,77 @@
+"""
+============================================================
+🧪 KeyCrypt — Generator Streaming Benchmark
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Time-to-first-candidate (TTFC) for /stream (NDJSON + SSE)
+✔ Compared against the buffered JSON endpoint
+✔ Runs fully offline against the local bucket stand-in
+
+Usage (from Engine/):
+    python -m benchmarks.bench_generate_stream --runs 20 --output ttfc.json
+============================================================
+"""
+
+import json
+import asyncio
+import argparse
+import tempfile
+
+from benchmarks.fixtures import seed_local_bucket, use_local_backends, asgi_request, summarize_ms as _summary
+
+
+async def _run(app, user_id: str, runs: int, count: int, keywords):
+    buffered, ttfc = {"total": []}, {}
+    for fmt in ("ndjson", "sse"):
+        ttfc[fmt] = {"first": [], "total": []}
+
+    path = f"/generate/generate-passwords/{user_id}"
+    query = {"keywords": keywords}
+
+    # One untimed call of each to load the sub-app, GRU and base model
+    await asgi_request(app, "GET", path, query)
+
+    for _ in range(runs):
+        res = await asgi_request(app, "GET", path, query)
+        assert res["status"] == 200, res["body"][:200]
+        buffered["total"].append(res["elapsed"] * 1000)
+
+        for fmt in ("ndjson", "sse"):
+            res = await asgi_request(app, "GET", f"{path}/stream",
+                                     {**query, "count": count, "format": fmt})
+            assert res["status"] == 200, res["body"][:200]
+            ttfc[fmt]["first"].append(res["chunks"][0][0] * 1000)
+            ttfc[fmt]["total"].append(res["elapsed"] * 1000)
+
+    return {
+        "buffered_json": {"time_to_first_byte": _summary(buffered["total"])},
+        **{f"stream_{fmt}": {
+            "time_to_first_candidate": _summary(v["first"]),
+            "total": _summary(v["total"]),
+        } for fmt, v in ttfc.items()},
+    }
+
+
+def run_benchmark(root: str = None, runs: int = 20, count: int = 15, keywords=("shubham", "2003")) -> dict:
+    root = root or tempfile.mkdtemp(prefix="kc-bench-")
+    use_local_backends(root)
+    seed_local_bucket(root)
+
+    from main import app
+    return asyncio.run(_run(app, "bench_user", runs, count, list(keywords)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generator streaming TTFC benchmark")
+    parser.add_argument("--root", default=None, help="Local bucket directory (temp dir by default)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--count", type=int, default=15)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.root, args.runs, args.count)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📊 Results saved → {args.output}")
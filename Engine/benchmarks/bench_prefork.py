@@ -0,0 +1,194 @@
+"""
+============================================================
+🧪 KeyCrypt — Pre-fork Memory / Throughput Benchmark
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Starts server/prefork.py with 1, 2, 4, 8 workers, with
+  and without the pre-fork preload (copy-on-write sharing)
+✔ Memory from /proc/<pid>/smaps_rollup (Linux):
+    worker USS → incremental memory each extra worker costs
+    total PSS  → real footprint of parent + all workers
+✔ Aggregate throughput from a closed-loop client against
+  /strength (distinct inputs, so the forest runs every time)
+
+Usage (from Engine/):
+    python -m benchmarks.bench_prefork --workers 1,2,4,8 --output prefork.json
+Note: client and server share the machine — compare runs
+with each other, not with production numbers.
+============================================================
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+from benchmarks.fixtures import seed_local_bucket, synthetic_password, summarize_ms
+
+
+# ============================================================
+# 🔹 Memory (Linux /proc)
+# ============================================================
+def smaps_rollup(pid: int) -> dict:
+    """Rss / Pss / USS in MB for one process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])      # kB
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "uss_mb": round(uss / 1024, 1),
+    }
+
+
+def child_pids(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def memory_report(parent_pid: int) -> dict:
+    parent = smaps_rollup(parent_pid)
+    workers = [smaps_rollup(pid) for pid in child_pids(parent_pid)]
+    n = len(workers) or 1
+    return {
+        "parent": parent,
+        "workers": workers,
+        "worker_avg_rss_mb": round(sum(w["rss_mb"] for w in workers) / n, 1),
+        "worker_avg_uss_mb": round(sum(w["uss_mb"] for w in workers) / n, 1),
+        "total_pss_mb": round(parent["pss_mb"] + sum(w["pss_mb"] for w in workers), 1),
+    }
+
+
+# ============================================================
+# 🔹 Closed-loop Throughput
+# ============================================================
+async def hammer(base_url: str, concurrency: int, duration: float) -> dict:
+    from scriptsss.data_loader import extract_password_features
+
+    rng = random.Random(9)
+    payloads = [extract_password_features(synthetic_password(rng)) for _ in range(2000)]
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency)) as client:
+        deadline = time.perf_counter() + duration
+
+        async def loop(worker_id):
+            nonlocal errors
+            i = worker_id
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    res = await client.post(f"/strength/predict-strength/user_{i % 500}",
+                                            json=payloads[i % len(payloads)], timeout=30)
+                    if res.status_code == 200:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                i += concurrency
+
+        start = time.perf_counter()
+        await asyncio.gather(*(loop(w) for w in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency": summarize_ms(latencies) if latencies else None,
+    }
+
+
+async def wait_ready(base_url: str, timeout: float = 180.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/ready", timeout=5)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError("Pre-fork server did not become ready")
+
+
+# ============================================================
+# 🔹 One Configuration
+# ============================================================
+def run_config(root: str, workers: int, preload: bool, port: int, concurrency: int, duration: float) -> dict:
+    env = {**os.environ, "KEYCRYPT_LOCAL_STORAGE": root, "KEYCRYPT_LOCAL_FIRESTORE": "1",
+           "KEYCRYPT_WARMUP": "all", "KEYCRYPT_PREDICTION_CACHE_SIZE": "0"}
+    env.setdefault("KEYCRYPT_GRU_VARIANT", "int8")
+    cmd = [sys.executable, "-m", "server.prefork", "--workers", str(workers), "--port", str(port)]
+    if not preload:
+        cmd.append("--no-preload")
+
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        time.sleep(1.0)     # let every worker finish its own warm-up
+        idle = memory_report(proc.pid)
+        load = asyncio.run(hammer(base_url, concurrency, duration))
+        loaded = memory_report(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+    return {"workers": workers, "preload": preload, "memory_idle": idle,
+            "memory_after_load": loaded, "throughput": load}
+
+
+def run_benchmark(root: str = None, workers=(1, 2, 4, 8), concurrency: int = 32, duration: float = 10.0,
+                  port: int = 8790, model_samples: int = 20000, model_estimators: int = 200) -> dict:
+    root = root or tempfile.mkdtemp(prefix="kc-prefork-")
+    print(f"🌱 Seeding base model ({model_estimators} trees, {model_samples} rows) → {root}")
+    seeded = seed_local_bucket(root, n_samples=model_samples, n_estimators=model_estimators)
+
+    runs = []
+    for preload in (True, False):
+        for n in workers:
+            print(f"🍴 workers={n} preload={preload} ...")
+            run = run_config(root, n, preload, port, concurrency, duration)
+            mem = run["memory_after_load"]
+            print(f"   → {run['throughput']['throughput_rps']} req/s, worker USS {mem['worker_avg_uss_mb']} MB, "
+                  f"total PSS {mem['total_pss_mb']} MB")
+            runs.append(run)
+            port += 1
+
+    return {"seeded": seeded, "concurrency": concurrency, "duration_s": duration, "runs": runs}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-fork RSS / throughput benchmark")
+    parser.add_argument("--root", default=None)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--model-samples", type=int, default=20000)
+    parser.add_argument("--model-estimators", type=int, default=200)
+    parser.add_argument("--output", default="prefork_results.json")
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        sys.exit("❌ bench_prefork needs Linux (/proc smaps_rollup + fork)")
+
+    report = run_benchmark(args.root, tuple(int(w) for w in args.workers.split(",")), args.concurrency,
+                           args.duration, args.port, args.model_samples, args.model_estimators)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results saved → {args.output}")
@@ -0,0 +1,283 @@
+"""
+============================================================
+🧪 KeyCrypt — Engine Benchmark Suite (Offline)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Runs against a LocalBucket + in-memory Firestore seeded
+  with synthetic users, features and models — no credentials
+✔ Sections:
+    featurize   → feature extraction throughput
+    predict     → single (cached / uncached) + batch latency
+    model_load  → base / user / GRU, cold vs warm
+    generate    → end-to-end generation + stream TTFC
+    retrain     → retrain time vs Kaggle dataset size
+✔ Machine-readable JSON (with environment + git revision)
+✔ --baseline old.json → per-metric change vs a previous run
+
+Usage (from Engine/):
+    python -m benchmarks.bench_suite --output bench_results.json
+    python -m benchmarks.bench_suite --only predict,model_load --baseline bench_results.json
+============================================================
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+from benchmarks.fixtures import (
+    seed_local_bucket, seed_kaggle_dataset, seed_user_model, seed_firestore,
+    use_local_backends, synthetic_password, summarize_ms, time_calls,
+)
+
+SECTIONS = ("featurize", "predict", "model_load", "generate", "retrain")
+
+
+# ============================================================
+# 🔹 Sections
+# ============================================================
+def bench_featurize(n: int = 20000) -> dict:
+    from scriptsss.data_loader import extract_password_features
+    from scripts.password_generator import extract_features
+
+    rng = random.Random(3)
+    passwords = [synthetic_password(rng) for _ in range(n)]
+    report = {"passwords": n}
+    for name, fn in (("data_loader", extract_password_features), ("generator", extract_features)):
+        start = time.perf_counter()
+        for pwd in passwords:
+            fn(pwd)
+        seconds = time.perf_counter() - start
+        report[name] = {"seconds": round(seconds, 4), "passwords_per_s": round(n / seconds, 1)}
+
+    # Pattern stage alone (batch API) + cost per char by length → should stay flat (linear scan)
+    from server.pattern_features import get_detector, pattern_features_many
+    get_detector()
+    start = time.perf_counter()
+    pattern_features_many(passwords)
+    seconds = time.perf_counter() - start
+    report["patterns"] = {"seconds": round(seconds, 4), "passwords_per_s": round(n / seconds, 1),
+                          "us_per_char": {}}
+    for length in (8, 32, 128, 512):
+        batch = [(pwd * (length // max(len(pwd), 1) + 1))[:length] for pwd in passwords[:500]]
+        start = time.perf_counter()
+        pattern_features_many(batch)
+        report["patterns"]["us_per_char"][length] = round((time.perf_counter() - start) / (500 * length) * 1e6, 3)
+    return report
+
+
+def bench_predict(repeat: int = 200, batch_sizes=(1, 16, 128, 1024)) -> dict:
+    from scriptsss.data_loader import extract_password_features
+    from server.firebase_model import load_base_strength_model
+    from server.prediction_cache import prediction_cache
+    from scripts.strength_predictor import predict_with_model
+    from scripts.password_generator import score_passwords
+
+    model_data = load_base_strength_model()
+    rng = random.Random(5)
+    features = [extract_password_features(synthetic_password(rng)) for _ in range(repeat)]
+
+    # Uncached: distinct vectors, and the base entries dropped first
+    prediction_cache.invalidate("base")
+    it = iter(features)
+    uncached = time_calls(lambda: predict_with_model(model_data, "base", "bench", next(it)), repeat)
+
+    # Cached: the same vector every time (first call fills the cache)
+    predict_with_model(model_data, "base", "bench", features[0])
+    cached = time_calls(lambda: predict_with_model(model_data, "base", "bench", features[0]), repeat)
+
+    batch = {}
+    for size in batch_sizes:
+        passwords = [synthetic_password(rng) for _ in range(size)]
+        runs = max(3, min(50, 2000 // size))
+        stats = time_calls(lambda: score_passwords(passwords, model_data), runs)
+        stats["per_item_ms"] = round(stats["mean_ms"] / size, 4)
+        batch[str(size)] = stats
+
+    return {"single_uncached": uncached, "single_cached": cached, "batch": batch}
+
+
+def bench_model_load(user_id: str, repeat: int = 10) -> dict:
+    import server.firebase_model as firebase_model
+    import scripts.password_generator as password_generator
+
+    def cold_base():
+        firebase_model._base_model_data = None
+        firebase_model.load_base_strength_model()
+
+    def cold_gru():
+        password_generator._gru_model = None
+        password_generator.get_gru_model()
+
+    report = {
+        "base_cold": time_calls(cold_base, repeat),
+        "base_warm": time_calls(firebase_model.load_base_strength_model, repeat),
+        # Personalized models are downloaded on every call
+        "user": time_calls(lambda: firebase_model.load_strength_model_for_user(user_id), repeat),
+        "user_fallback_to_base": time_calls(
+            lambda: firebase_model.load_strength_model_for_user("bench_user_without_model"), repeat),
+        "gru_cold": time_calls(cold_gru, max(3, repeat // 2)),
+        "gru_warm": time_calls(password_generator.get_gru_model, repeat),
+        "gru_variant": password_generator.GRU_VARIANT,
+    }
+    return report
+
+
+def bench_generate(user_id: str, runs: int = 10, count: int = 15) -> dict:
+    from main import app
+    from benchmarks.bench_generate_stream import _run
+
+    return asyncio.run(_run(app, user_id, runs, count, ["shubham", "2003"]))
+
+
+def bench_retrain(root: str, user_id: str, sizes=(1000, 4000, 16000)) -> dict:
+    from server.train_user_model import train_user_model
+    from server.tracing import span
+
+    report = {}
+    for size in sizes:
+        csv_bytes = seed_kaggle_dataset(root, size)
+        with span(f"retrain {size}") as root_span:
+            start = time.perf_counter()
+            result = train_user_model(user_id)
+            seconds = time.perf_counter() - start
+        # Top-level steps under train_user_model (fetch / features / upload …)
+        steps = {c.name: round(c.duration_ms, 1) for c in root_span.children[0].children}
+        report[str(size)] = {
+            "csv_bytes": csv_bytes,
+            "samples": result["samples"],
+            "seconds": round(seconds, 3),
+            "samples_per_s": round(result["samples"] / seconds, 1),
+            "steps_ms": steps,
+        }
+    return report
+
+
+# ============================================================
+# 🔹 Environment + Baseline Comparison
+# ============================================================
+def environment() -> dict:
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                  text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        revision = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": revision,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": {m: version(m) for m in ("numpy", "pandas", "sklearn", "fastapi")},
+    }
+
+
+def _flatten(report: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> list:
+    """Timing metrics (*_ms, seconds) that moved more than `threshold`."""
+    now, before = _flatten(current["results"]), _flatten(baseline.get("results", {}))
+    changes = []
+    for key, value in now.items():
+        old = before.get(key)
+        if not old or not (key.endswith("_ms") or key.endswith("seconds")):
+            continue
+        change = (value - old) / old
+        if abs(change) >= threshold:
+            changes.append({"metric": key, "baseline": old, "current": value,
+                            "change_pct": round(change * 100, 1),
+                            "verdict": "slower" if change > 0 else "faster"})
+    return sorted(changes, key=lambda c: -abs(c["change_pct"]))
+
+
+# ============================================================
+# 🔹 Runner
+# ============================================================
+def run_suite(root: str = None, only=SECTIONS, retrain_sizes=(1000, 4000, 16000),
+              repeat: int = 200, runs: int = 10) -> dict:
+    root = root or tempfile.mkdtemp(prefix="kc-bench-")
+    use_local_backends(root)
+    os.environ.setdefault("KEYCRYPT_SLOW_TRACE_MS", "1e9")     # keep span trees out of the output
+
+    print(f"🌱 Seeding local stand-ins → {root}")
+    seeded = seed_local_bucket(root)
+    seeded["kaggle_csv_bytes"] = seed_kaggle_dataset(root, retrain_sizes[0])
+
+    from server.firebase_client import get_db
+    user_ids = seed_firestore(get_db())
+    personalized = user_ids[0]
+    seed_user_model(root, personalized)
+    seeded.update({"users": len(user_ids), "firestore_documents": get_db().document_count()})
+
+    results = {}
+    for section in only:
+        print(f"⏱️ Running section: {section}")
+        start = time.perf_counter()
+        if section == "featurize":
+            results[section] = bench_featurize()
+        elif section == "predict":
+            results[section] = bench_predict(repeat)
+        elif section == "model_load":
+            results[section] = bench_model_load(personalized)
+        elif section == "generate":
+            results[section] = bench_generate(user_ids[1], runs)
+        elif section == "retrain":
+            # Retrain a user without a personalized model so uploads don't skew later sections
+            results[section] = bench_retrain(root, user_ids[-1], retrain_sizes)
+        print(f"✅ {section} done in {time.perf_counter() - start:.1f}s")
+
+    return {"environment": environment(), "seeded": seeded, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KeyCrypt Engine benchmark suite (offline)")
+    parser.add_argument("--root", default=None, help="Local bucket directory (temp dir by default)")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"Comma-separated subset of {SECTIONS}")
+    parser.add_argument("--retrain-sizes", default="1000,4000,16000")
+    parser.add_argument("--repeat", type=int, default=200, help="Single-predict iterations")
+    parser.add_argument("--runs", type=int, default=10, help="End-to-end generation runs")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    only = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = [s for s in only if s not in SECTIONS]
+    if unknown:
+        parser.error(f"Unknown sections: {unknown}")
+
+    report = run_suite(args.root, only, tuple(int(s) for s in args.retrain_sizes.split(",")),
+                       args.repeat, args.runs)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = {"baseline": args.baseline, "changes": compare(report, json.load(f))}
+        for change in report["comparison"]["changes"]:
+            print(f"{'🔺' if change['verdict'] == 'slower' else '🔻'} {change['metric']}: "
+                  f"{change['baseline']} → {change['current']} ({change['change_pct']:+}%)")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"📊 Results saved → {args.output}")
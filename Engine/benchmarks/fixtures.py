@@ -0,0 +1,265 @@
+"""
+============================================================
+🧪 KeyCrypt — Benchmark Fixtures (Local Stand-ins)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Seeds a LocalBucket with a synthetic base strength model
+✔ Seeds a synthetic int8 GRU artifact (no TensorFlow needed)
+✔ Seeds the Kaggle feature CSV, per-user models and the
+  in-memory Firestore (users, password features, metadata)
+✔ Minimal in-process ASGI driver that timestamps body chunks
+  (TestClient / httpx buffer the whole body, hiding streaming)
+============================================================
+"""
+
+import os
+import io
+import json
+import time
+import random
+import string
+import asyncio
+import statistics
+from datetime import datetime
+from urllib.parse import urlencode
+
+import numpy as np
+
+BASE_MODEL_PATH = "models/base/password_strength_base.pkl"
+GRU_INT8_PATH = "models/base/gru_base_rnn_int8.npz"
+KAGGLE_PATH = "kaggle_password_feature/kaggle_password_feature.csv"
+
+CHARSET = string.ascii_letters + string.digits + string.punctuation
+
+
+# ============================================================
+# 🔹 Synthetic Data
+# ============================================================
+def synthetic_password(rng: random.Random) -> str:
+    """Mix of weak (short, single class), medium and strong shapes."""
+    kind = rng.random()
+    if kind < 0.35:
+        return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 8)))
+    if kind < 0.7:
+        return "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(8, 11)))
+    return "".join(rng.choices(CHARSET, k=rng.randint(12, 20)))
+
+
+def synthetic_label(password: str) -> int:
+    classes = sum([
+        any(c.islower() for c in password),
+        any(c.isupper() for c in password),
+        any(c.isdigit() for c in password),
+        any(not c.isalnum() for c in password),
+    ])
+    if len(password) >= 12 and classes >= 3:
+        return 2
+    if len(password) >= 8 and classes >= 2:
+        return 1
+    return 0
+
+
+def synthetic_feature_rows(n: int, seed: int = 42):
+    """Feature rows (data_loader schema) + labels for n synthetic passwords."""
+    from scriptsss.data_loader import extract_password_features
+
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        pwd = synthetic_password(rng)
+        row = extract_password_features(pwd)
+        row["label"] = synthetic_label(pwd)
+        rows.append(row)
+    return rows
+
+
+# ============================================================
+# 🔹 Bucket Seeding
+# ============================================================
+def build_strength_model(n_samples: int = 3000, n_estimators: int = 100, seed: int = 42) -> dict:
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.DataFrame(synthetic_feature_rows(n_samples, seed))
+    features = [c for c in df.columns if c != "label"]
+    scaler = StandardScaler()
+    X = scaler.fit_transform(df[features])
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed)
+    model.fit(X, df["label"])
+    return {"model": model, "scaler": scaler, "features": features, "accuracy": None}
+
+
+def build_int8_gru(path: str, vocab_size: int = 96, embed_dim: int = 128,
+                   units: int = 256, seed: int = 42):
+    """Random weights in the scripts/gru_int8.py artifact format (2x GRU + Dense)."""
+    rng = np.random.default_rng(seed)
+
+    def q(shape):
+        return rng.integers(-127, 128, size=shape, dtype=np.int8)
+
+    def scale(n):
+        return np.full(n, 0.01, dtype=np.float32)
+
+    arrays = {
+        "embedding_q": q((vocab_size, embed_dim)), "embedding_scale": scale(vocab_size),
+        "dense_kernel_q": q((units, vocab_size)), "dense_kernel_scale": scale(vocab_size),
+        "dense_bias": np.zeros(vocab_size, dtype=np.float32),
+    }
+    gru_layers = []
+    in_dim = embed_dim
+    for idx, return_sequences in enumerate([True, False]):
+        arrays[f"gru{idx}_kernel_q"] = q((in_dim, 3 * units))
+        arrays[f"gru{idx}_kernel_scale"] = scale(3 * units)
+        arrays[f"gru{idx}_recurrent_q"] = q((units, 3 * units))
+        arrays[f"gru{idx}_recurrent_scale"] = scale(3 * units)
+        arrays[f"gru{idx}_bias"] = np.zeros((2, 3 * units), dtype=np.float32)
+        gru_layers.append({"units": units, "reset_after": True, "return_sequences": return_sequences})
+        in_dim = units
+
+    meta = {"format": "keycrypt-gru-int8", "version": 1, "gru_layers": gru_layers}
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    np.savez(path, **arrays)     # path or binary file object
+
+
+def seed_local_bucket(root: str, n_samples: int = 3000, n_estimators: int = 100) -> dict:
+    """Writes the base artifacts the Engine expects into a LocalBucket."""
+    import joblib
+    from server.storage import LocalBucket
+
+    bucket = LocalBucket(root)
+    seeded = {}
+
+    if not bucket.blob(BASE_MODEL_PATH).exists():
+        buf = io.BytesIO()
+        joblib.dump(build_strength_model(n_samples, n_estimators), buf)
+        bucket.blob(BASE_MODEL_PATH).upload_from_string(buf.getvalue())
+    seeded["base_model_bytes"] = bucket.get_blob(BASE_MODEL_PATH).size
+
+    if not bucket.blob(GRU_INT8_PATH).exists():
+        buf = io.BytesIO()
+        build_int8_gru(buf)
+        bucket.blob(GRU_INT8_PATH).upload_from_string(buf.getvalue())
+    seeded["gru_int8_bytes"] = bucket.get_blob(GRU_INT8_PATH).size
+
+    return seeded
+
+
+def seed_kaggle_dataset(root: str, n_rows: int, seed: int = 7) -> int:
+    """(Re)writes the Kaggle feature CSV with n_rows synthetic labelled rows."""
+    import pandas as pd
+    from server.storage import LocalBucket
+
+    csv = pd.DataFrame(synthetic_feature_rows(n_rows, seed)).to_csv(index=False)
+    LocalBucket(root).blob(KAGGLE_PATH).upload_from_string(csv)
+    return len(csv)
+
+
+def seed_user_model(root: str, user_id: str, n_samples: int = 1500, n_estimators: int = 50, seed: int = 1):
+    """Uploads a personalized model the way upload_trained_model() lays it out."""
+    import joblib
+    from server.storage import LocalBucket
+
+    buf = io.BytesIO()
+    joblib.dump(build_strength_model(n_samples, n_estimators, seed), buf)
+    LocalBucket(root).blob(f"models/users/user_{user_id}_model.pkl").upload_from_string(buf.getvalue())
+
+
+def seed_firestore(db, n_users: int = 20, rows_per_user: int = 50, unlabeled_share: float = 0.3,
+                   seed: int = 11, user_ids=None) -> list:
+    """
+    Seeds password-features/{uid}/userPasswordFeatures and user-models/{uid}
+    for bench_user_0..n-1 (or the given user_ids).
+    A share of rows is unlabeled (label = -1) so retrain auto-labels them.
+    """
+    rng = random.Random(seed)
+    user_ids = list(user_ids) if user_ids is not None else [f"bench_user_{i}" for i in range(n_users)]
+    for uid in user_ids:
+        batch = db.batch()
+        features = db.collection("password-features").document(uid).collection("userPasswordFeatures")
+        for i, row in enumerate(synthetic_feature_rows(rows_per_user, rng.getrandbits(32))):
+            if rng.random() < unlabeled_share:
+                row["label"] = -1
+            batch.set(features.document(f"pw_{i}"), row)
+        batch.commit()
+        db.collection("user-models").document(uid).set({"createdAt": datetime.utcnow()}, merge=True)
+    return user_ids
+
+
+def use_local_backends(root: str):
+    """Points the Engine at the local stand-ins (call before importing sub-apps)."""
+    os.environ["KEYCRYPT_LOCAL_STORAGE"] = root
+    os.environ["KEYCRYPT_LOCAL_FIRESTORE"] = "1"
+    os.environ.setdefault("KEYCRYPT_GRU_VARIANT", "int8")
+
+
+# ============================================================
+# 🔹 Timing Helpers
+# ============================================================
+def summarize_ms(values_ms) -> dict:
+    values = sorted(values_ms)
+    return {
+        "n": len(values),
+        "mean_ms": round(statistics.fmean(values), 3),
+        "p50_ms": round(values[len(values) // 2], 3),
+        "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        "p99_ms": round(values[min(len(values) - 1, int(len(values) * 0.99))], 3),
+        "min_ms": round(values[0], 3),
+    }
+
+
+def time_calls(fn, repeat: int) -> dict:
+    """Calls fn() `repeat` times and summarizes the wall time of each call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize_ms(samples)
+
+
+# ============================================================
+# 🔹 In-process ASGI Driver
+# ============================================================
+async def asgi_request(app, method: str, path: str, query: dict = None, body: bytes = b"",
+                       headers: dict = None) -> dict:
+    """
+    Sends one HTTP request straight into an ASGI app.
+    Returns status, full body and the arrival time of every body chunk.
+    """
+    query_string = urlencode(query or {}, doseq=True).encode()
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if body:
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query_string, "headers": raw_headers,
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    start = time.perf_counter()
+    result = {"status": None, "chunks": [], "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk:
+                result["chunks"].append((time.perf_counter() - start, len(chunk)))
+                result["body"] += chunk
+
+    await app(scope, receive, send)
+    result["elapsed"] = time.perf_counter() - start
+    return result
@@ -0,0 +1,330 @@
+"""
+============================================================
+🧪 KeyCrypt — Mixed-Traffic Load Test (Unified App)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Drives /strength, /generate and /retrain together
+✔ Targets:
+    in-process   → httpx ASGITransport against main.app
+    --url        → an already running server
+    --spawn N    → starts `uvicorn main:app --workers N`
+                   on localhost with the local stand-ins
+✔ User population: a few hot users (personalized models,
+  repeated inputs) vs. many cold users (mostly base model)
+✔ Request mix: --mix strength=70,generate=25,retrain=5
+✔ Open-loop Poisson arrivals; per-route throughput,
+  p50 / p95 / p99 latency and error rate
+✔ --find-saturation → steps the offered rate up until
+  throughput, latency (SLO) or errors give out
+
+Usage (from Engine/):
+    python -m benchmarks.load_test --rate 20 --duration 15
+    python -m benchmarks.load_test --spawn 4 --find-saturation --slo-ms 500
+Note: in-process mode shares one CPU/GIL between client and
+server — use --spawn for worker-count comparisons.
+============================================================
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+from benchmarks.fixtures import (
+    seed_local_bucket, seed_kaggle_dataset, seed_user_model, seed_firestore,
+    use_local_backends, synthetic_password, summarize_ms,
+)
+
+DEFAULT_MIX = "strength=70,generate=25,retrain=5"
+ROUTES = ("strength", "generate", "generate_stream", "retrain")
+
+
+# ============================================================
+# 🔹 Population + Request Mix
+# ============================================================
+class Population:
+    """
+    Hot users get most of the traffic and reuse a handful of inputs
+    (prediction cache hits); cold users are many and rarely repeat.
+    """
+
+    def __init__(self, hot_users: int = 5, cold_users: int = 1000, hot_share: float = 0.8, seed: int = 21):
+        self.rng = random.Random(seed)
+        self.hot = [f"hot_user_{i}" for i in range(hot_users)]
+        self.cold = [f"cold_user_{i}" for i in range(cold_users)]
+        self.hot_share = hot_share if self.hot else 0.0
+        self.inputs = {uid: [synthetic_password(self.rng) for _ in range(8)] for uid in self.hot}
+
+    def pick(self):
+        if self.cold and self.rng.random() >= self.hot_share:
+            return self.rng.choice(self.cold), synthetic_password(self.rng)
+        uid = self.rng.choice(self.hot)
+        return uid, self.rng.choice(self.inputs[uid])
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route '{name}' (expected one of {ROUTES})")
+        mix[name] = float(weight or 1)
+    if not sum(mix.values()) > 0:
+        raise ValueError("Request mix weights must sum to > 0")
+    return mix
+
+
+def build_request(route: str, user_id: str, password: str):
+    """→ (method, path, kwargs for httpx)."""
+    from scriptsss.data_loader import extract_password_features
+
+    if route == "strength":
+        return "POST", f"/strength/predict-strength/{user_id}", {"json": extract_password_features(password)}
+    if route == "generate":
+        return "GET", f"/generate/generate-passwords/{user_id}", {"params": {"keywords": ["shubham", "2003"]}}
+    if route == "generate_stream":
+        return "GET", f"/generate/generate-passwords/{user_id}/stream", {
+            "params": {"keywords": ["shubham", "2003"], "count": 15}}
+    return "POST", f"/retrain/retrain/{user_id}", {}
+
+
+# ============================================================
+# 🔹 One Load Step (fixed offered rate)
+# ============================================================
+async def run_step(client: httpx.AsyncClient, population: Population, mix: dict, rate: float,
+                   duration: float, max_inflight: int, timeout: float) -> dict:
+    routes, weights = list(mix), list(mix.values())
+    rng = random.Random(int(rate * 1000))
+    samples = {route: {"latency_ms": [], "errors": 0, "shed": 0, "status": {}} for route in routes}
+    inflight = set()
+
+    async def one(route, method, path, kwargs):
+        start = time.perf_counter()
+        try:
+            res = await client.request(method, path, timeout=timeout, **kwargs)
+            status = str(res.status_code)
+            ok = res.status_code < 400
+        except Exception as e:
+            status, ok = type(e).__name__, False
+        latency = (time.perf_counter() - start) * 1000
+        bucket = samples[route]
+        bucket["status"][status] = bucket["status"].get(status, 0) + 1
+        if ok:
+            bucket["latency_ms"].append(latency)
+        else:
+            bucket["errors"] += 1
+
+    start = time.perf_counter()
+    next_at = start
+    while next_at - start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        route = rng.choices(routes, weights)[0]
+        if len(inflight) >= max_inflight:
+            # Open loop: never queue unboundedly on the client side
+            samples[route]["shed"] += 1
+        else:
+            user_id, password = population.pick()
+            method, path, kwargs = build_request(route, user_id, password)
+            task = asyncio.ensure_future(one(route, method, path, kwargs))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        next_at += rng.expovariate(rate)
+
+    if inflight:
+        await asyncio.wait(inflight)
+    elapsed = time.perf_counter() - start
+
+    per_route, all_latency, total, errors, shed = {}, [], 0, 0, 0
+    for route, bucket in samples.items():
+        count = len(bucket["latency_ms"]) + bucket["errors"] + bucket["shed"]
+        if not count:
+            continue
+        failed = bucket["errors"] + bucket["shed"]
+        per_route[route] = {
+            "requests": count,
+            "throughput_rps": round(len(bucket["latency_ms"]) / elapsed, 2),
+            "error_rate": round(failed / count, 4),
+            "shed": bucket["shed"],
+            "status": bucket["status"],
+            "latency": summarize_ms(bucket["latency_ms"]) if bucket["latency_ms"] else None,
+        }
+        all_latency += bucket["latency_ms"]
+        total, errors, shed = total + count, errors + bucket["errors"], shed + bucket["shed"]
+
+    return {
+        "offered_rps": rate,
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(len(all_latency) / elapsed, 2),
+        "error_rate": round((errors + shed) / total, 4) if total else None,
+        "latency": summarize_ms(all_latency) if all_latency else None,
+        "routes": per_route,
+    }
+
+
+def is_saturated(step: dict, slo_ms: float, max_error_rate: float) -> list:
+    reasons = []
+    if step["throughput_rps"] < 0.9 * step["offered_rps"]:
+        reasons.append("throughput")
+    if step["latency"] is None or step["latency"]["p95_ms"] > slo_ms:
+        reasons.append("latency")
+    if step["error_rate"] is None or step["error_rate"] > max_error_rate:
+        reasons.append("errors")
+    return reasons
+
+
+async def find_saturation(client, population, mix, start_rate, growth, max_rate, duration,
+                          max_inflight, timeout, slo_ms, max_error_rate) -> dict:
+    steps, rate, last_good = [], start_rate, None
+    while rate <= max_rate:
+        print(f"📈 Offering {rate:.1f} req/s for {duration:.0f}s ...")
+        step = await run_step(client, population, mix, rate, duration, max_inflight, timeout)
+        step["saturated_by"] = is_saturated(step, slo_ms, max_error_rate)
+        steps.append(step)
+        p95 = step["latency"]["p95_ms"] if step["latency"] else None
+        print(f"   → {step['throughput_rps']} req/s, p95 {p95} ms, errors {step['error_rate']}")
+        if step["saturated_by"]:
+            break
+        last_good = step
+        rate *= growth
+
+    return {
+        "slo_p95_ms": slo_ms,
+        "max_error_rate": max_error_rate,
+        "saturation_rps": last_good["throughput_rps"] if last_good else None,
+        "saturated_at_offered_rps": steps[-1]["offered_rps"] if steps and steps[-1]["saturated_by"] else None,
+        "steps": steps,
+    }
+
+
+# ============================================================
+# 🔹 Targets
+# ============================================================
+def prepare_backends(root: str, population: Population, cold_model_share: float):
+    """Seeds the bucket (+ in-process Firestore); hot users get personalized models."""
+    use_local_backends(root)
+    seed_local_bucket(root)
+    seed_kaggle_dataset(root, 2000)
+    for uid in population.hot:
+        seed_user_model(root, uid)
+    rng = random.Random(5)
+    for uid in rng.sample(population.cold, int(len(population.cold) * cold_model_share)):
+        seed_user_model(root, uid, n_samples=500, n_estimators=20)
+
+
+def spawn_server(root: str, workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "KEYCRYPT_LOCAL_STORAGE": root, "KEYCRYPT_LOCAL_FIRESTORE": "1",
+           "KEYCRYPT_WARMUP": os.getenv("KEYCRYPT_WARMUP", "all")}
+    env.setdefault("KEYCRYPT_GRU_VARIANT", "int8")
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    print(f"🚀 Spawning {' '.join(cmd[2:])}")
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 120.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/ready", timeout=5)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError("Server did not become ready")
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    population = Population(args.hot_users, args.cold_users, args.hot_share)
+    root = args.root or tempfile.mkdtemp(prefix="kc-load-")
+    prepare_backends(root, population, args.cold_model_share)
+
+    server = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url)
+        target = {"mode": "url", "url": args.url}
+    elif args.spawn:
+        server = spawn_server(root, args.spawn, args.port)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}",
+                                   limits=httpx.Limits(max_connections=args.max_inflight))
+        target = {"mode": "spawn", "workers": args.spawn, "port": args.port}
+    else:
+        # Hot users retrain on real feature history (in-process store only)
+        from server.firebase_client import get_db
+        seed_firestore(get_db(), user_ids=population.hot)
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://keycrypt")
+        target = {"mode": "in-process"}
+
+    try:
+        if server:
+            await wait_ready(client)
+        # Untimed pass so lazy sub-app imports don't land in the first step
+        for route in mix:
+            method, path, kwargs = build_request(route, *population.pick())
+            await client.request(method, path, timeout=args.timeout, **kwargs)
+
+        common = dict(duration=args.duration, max_inflight=args.max_inflight, timeout=args.timeout)
+        if args.find_saturation:
+            result = await find_saturation(client, population, mix, args.rate, args.growth, args.max_rate,
+                                           slo_ms=args.slo_ms, max_error_rate=args.max_error_rate, **common)
+        else:
+            result = await run_step(client, population, mix, args.rate, **common)
+    finally:
+        await client.aclose()
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "target": target,
+        "mix": mix,
+        "population": {"hot_users": len(population.hot), "cold_users": len(population.cold),
+                       "hot_share": population.hot_share, "cold_model_share": args.cold_model_share},
+        "result": result,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KeyCrypt mixed-traffic load test")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default=None, help="Running server (e.g. http://localhost:8000)")
+    target.add_argument("--spawn", type=int, default=0, metavar="WORKERS",
+                        help="Start uvicorn on localhost with this many workers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--root", default=None, help="Local bucket directory (temp dir by default)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Route weights, routes: {ROUTES}")
+    parser.add_argument("--hot-users", type=int, default=5)
+    parser.add_argument("--cold-users", type=int, default=1000)
+    parser.add_argument("--hot-share", type=float, default=0.8, help="Share of requests from hot users")
+    parser.add_argument("--cold-model-share", type=float, default=0.05,
+                        help="Share of cold users that have a personalized model")
+    parser.add_argument("--rate", type=float, default=10.0, help="Offered req/s (start rate with --find-saturation)")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per step")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--find-saturation", action="store_true")
+    parser.add_argument("--growth", type=float, default=1.5)
+    parser.add_argument("--max-rate", type=float, default=2000.0)
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p95 latency SLO for saturation")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report["result"] if not args.find_saturation else
+                     {k: v for k, v in report["result"].items() if k != "steps"}, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results saved → {args.output}")
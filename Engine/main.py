@@ -1,26 +1,59 @@
 """
 ============================================================
-🌐 KeyCrypt Unified FastAPI Backend (Safe Import Version)
+🌐 KeyCrypt Unified FastAPI Backend (Lazy Import Version)
 Author: Shubham Patel (NIT Raipur)
 ============================================================
-✔ Loads 3 sub-APIs (predictor / retrain / generator)
+✔ Mounts 5 sub-APIs (predictor / retrain / generator / reuse /
+  features) lazily
+✔ Heavy modules + Firebase clients load on first request
+  to a route, or during an explicit warm-up phase
 ✔ If any sub-API is missing → print message & continue
+✔ Per-module import / init timing breakdown logged at boot
+✔ GET /ready → readiness + which models are warm
+✔ POST /warmup/{user_id} → login-time prefetch of the user's
+  strength model (+ optional generator / feature cache)
+✔ GET /metrics → Prometheus text format (routes, stages, caches)
+✔ Span tree logged for slow requests; admin-gated per-request
+  profiles (?profile=cprofile|sample) at GET /admin/profiles
 ✔ Global CORS
 ✔ Unified backend running on port 5000
+
+Warm-up (optional):
+    KEYCRYPT_WARMUP=strength,generate   # or "all"
+Multi-worker (pre-fork, shared preloaded models):
+    KEYCRYPT_WORKERS=4 python main.py   # see server/prefork.py
 ============================================================
 """
 
-from fastapi import FastAPI
+import time
+
+_boot_start = time.perf_counter()
+
+import os
+import sys
+import threading
+from fastapi import FastAPI, Header, HTTPException, Query, Path, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-import importlib
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketClose
+from server.startup_timing import (
+    timed, timed_import, record_timing, get_timings, format_timing_report, warm_models
+)
+from server import metrics, tracing
+
+record_timing("fastapi + main", "import", time.perf_counter() - _boot_start)
 
 
 # ============================================================
 # 🔧 Safe Import Function
 # ============================================================
-def safe_import(module_path: str, app_name: str):
+def safe_import(module_path: str, app_name: str, preload=()):
     try:
-        module = importlib.import_module(module_path)
+        # Heavy dependencies first, so the breakdown shows where time goes
+        for dep in preload:
+            timed_import(dep)
+        module = timed_import(module_path)
         sub_app = getattr(module, "app")
         print(f"✅ Loaded sub-API: {app_name} ({module_path})")
         return sub_app
@@ -29,6 +62,56 @@ def safe_import(module_path: str, app_name: str):
         return None
 
 
+# ============================================================
+# 💤 Lazy Sub-App (imports on first request / warm-up)
+# ============================================================
+class LazySubApp:
+    """ASGI wrapper that imports its sub-API module on first use."""
+
+    def __init__(self, route: str, module_path: str, name: str, preload=()):
+        self.route = route
+        self.module_path = module_path
+        self.name = name
+        self.preload = preload
+        self.app = None
+        self.state = "pending"      # pending → loaded | failed
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.state == "pending":
+                self.app = safe_import(self.module_path, self.name, self.preload)
+                self.state = "loaded" if self.app else "failed"
+        return self.app
+
+    def warmup(self):
+        """Imports the module and runs its optional `warmup()` hook."""
+        if not self.load():
+            return
+        module = timed_import(self.module_path)
+        hook = getattr(module, "warmup", None)
+        if hook:
+            with timed(f"{self.name} warm-up", "warmup"):
+                hook()
+
+    async def __call__(self, scope, receive, send):
+        if self.state == "pending":
+            await run_in_threadpool(self.load)
+
+        if self.app is None:
+            if scope["type"] == "websocket":
+                await WebSocketClose(code=1011)(scope, receive, send)
+                return
+            response = JSONResponse(
+                {"detail": f"{self.name} is unavailable (module failed to load)"},
+                status_code=503,
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
 # ============================================================
 # 🌐 Main FastAPI App
 # ============================================================
@@ -50,29 +133,226 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Root span per request (+ optional admin profiling)
+app.add_middleware(tracing.TracingMiddleware)
+
+# Per-route latency histograms (outermost, so it sees the final status)
+app.add_middleware(metrics.MetricsMiddleware)
+
 
 # ============================================================
-# 🔀 SAFE MOUNT: Sub-APIs
+# 🔀 LAZY MOUNT: Sub-APIs
 # ============================================================
 sub_apis = [
-    ("/strength", "scripts.strength_predictor", "Strength Predictor API"),
-    ("/retrain", "server.train_user_model", "Model Retraining API"),
-    ("/generate", "scripts.password_generator", "Password Generator API"),
+    ("/strength", "scripts.strength_predictor", "Strength Predictor API", ("pandas", "firebase_admin")),
+    ("/retrain", "server.train_user_model", "Model Retraining API", ("pandas", "sklearn.ensemble", "firebase_admin")),
+    ("/generate", "scripts.password_generator", "Password Generator API", ("numpy", "pandas", "firebase_admin")),
+    ("/reuse", "scripts.reuse_detector", "Password Reuse Detector API", ("numpy", "firebase_admin")),
+    ("/features", "scripts.feature_ingest", "Bulk Feature Ingestion API", ("pandas", "firebase_admin")),
+]
+
+lazy_apps = {}
+for route, module_path, name, preload in sub_apis:
+    lazy_apps[route.strip("/")] = LazySubApp(route, module_path, name, preload)
+    app.mount(route, lazy_apps[route.strip("/")])
+    print(f"🔗 Mounted {name} at {route} (lazy)")
+
+
+# ============================================================
+# 🔥 Warm-up Phase (optional, background)
+# ============================================================
+WARMUP_TARGETS = [
+    t.strip() for t in os.getenv("KEYCRYPT_WARMUP", "").split(",") if t.strip()
 ]
+if "all" in WARMUP_TARGETS:
+    WARMUP_TARGETS = list(lazy_apps)
 
-for route, module_path, name in sub_apis:
-    sub_app = safe_import(module_path, name)
-    if sub_app:
-        app.mount(route, sub_app)
-        print(f"🔗 Mounted {name} at {route}")
+_warmup_done = threading.Event()
+
+
+def run_warmup():
+    for target in WARMUP_TARGETS:
+        sub = lazy_apps.get(target)
+        if sub is None:
+            print(f"⚠️ Unknown warm-up target: {target}")
+            continue
+        try:
+            sub.warmup()
+        except Exception as e:
+            print(f"⚠️ Warm-up failed for {sub.name} → {e}")
+    _warmup_done.set()
+    print(format_timing_report("WARM-UP TIMING BREAKDOWN"))
+
+
+@app.on_event("startup")
+def log_boot_timing():
+    record_timing("boot total", "boot", time.perf_counter() - _boot_start)
+    print(format_timing_report())
+    if WARMUP_TARGETS:
+        print(f"🔥 Warming up in background → {', '.join(WARMUP_TARGETS)}")
+        threading.Thread(target=run_warmup, name="keycrypt-warmup", daemon=True).start()
     else:
-        print(f"⏭️ Skipped mounting {name} (module missing)")
+        _warmup_done.set()
+
+
+# ============================================================
+# ✅ Readiness
+# ============================================================
+@app.get("/ready")
+def readiness():
+    """
+    Ready once the configured warm-up phase has finished.
+    Sub-APIs that were never requested stay "pending" (lazy).
+    """
+    ready = _warmup_done.is_set()
+    body = {
+        "ready": ready,
+        "warmup_targets": WARMUP_TARGETS,
+        "sub_apis": {route: sub.state for route, sub in lazy_apps.items()},
+        "warm_models": sorted(warm_models()),
+        "timings": get_timings(),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+# ============================================================
+# 🔥 Per-user Session Warm-up (called right after login)
+# ============================================================
+_user_warmups = set()           # (user_id, part) currently warming
+_user_warmups_lock = threading.Lock()
+
+
+def user_warm_state(user_id: str, parts) -> dict:
+    """Cheap lookups only — no imports or I/O for parts never loaded."""
+    state = {}
+    if "strength" in parts:
+        if lazy_apps["strength"].state != "loaded":
+            state["strength"] = "cold"
+        else:
+            from server.firebase_model import user_model_cache
+            model_state = user_model_cache.state(user_id)
+            state["strength"] = "warm" if model_state in ("warm", "no_model") else model_state
+    if "generator" in parts:
+        state["generator"] = "warm" if "gru" in warm_models() else "cold"
+    if "features" in parts:
+        dataset = sys.modules.get("server.firebase_dataset")
+        age = dataset.user_features_age(user_id) if dataset else None
+        state["features"] = "warm" if age is not None and age < dataset.USER_FEATURES_MAX_AGE_S else "cold"
+    with _user_warmups_lock:
+        for part in parts:
+            if state.get(part) == "cold" and (user_id, part) in _user_warmups:
+                state[part] = "loading"
+    return state
+
+
+def _warm_user_part(user_id: str, part: str):
+    try:
+        if part == "strength":
+            lazy_apps["strength"].load()
+            from server.firebase_model import load_base_strength_model, user_model_cache
+            load_base_strength_model()
+            user_model_cache.prefetch(user_id)
+        elif part == "generator":
+            lazy_apps["generate"].warmup()
+        elif part == "features":
+            from server.firebase_dataset import get_user_features
+            get_user_features(user_id)
+    except Exception as e:
+        print(f"⚠️ Warm-up of {part} failed for {user_id} → {e}")
+    finally:
+        with _user_warmups_lock:
+            _user_warmups.discard((user_id, part))
+
+
+@app.post("/warmup/{user_id}", status_code=202)
+def warmup_user(
+    background: BackgroundTasks,
+    user_id: str = Path(..., description="Firebase user ID"),
+    generator: bool = Query(default=False, description="Also load the GRU generator + candidate pool"),
+    features: bool = Query(default=False, description="Also prefetch the user's feature rows"),
+):
+    """
+    Returns immediately; loading happens after the response is sent.
+    Parts that are already warm (or already warming) are not scheduled again.
+    """
+    parts = ["strength"] + (["generator"] if generator else []) + (["features"] if features else [])
+    state = user_warm_state(user_id, parts)
+
+    scheduled = []
+    with _user_warmups_lock:
+        for part in parts:
+            if state[part] != "cold" or (user_id, part) in _user_warmups:
+                continue
+            _user_warmups.add((user_id, part))
+            scheduled.append(part)
+    for part in scheduled:
+        background.add_task(_warm_user_part, user_id, part)
+
+    return {"user_id": user_id, "scheduled": scheduled, "state": state}
+
+
+@app.get("/warmup/{user_id}")
+def warmup_user_state(
+    user_id: str = Path(..., description="Firebase user ID"),
+    generator: bool = Query(default=False),
+    features: bool = Query(default=False),
+):
+    parts = ["strength"] + (["generator"] if generator else []) + (["features"] if features else [])
+    return {"user_id": user_id, "state": user_warm_state(user_id, parts)}
+
+
+# ============================================================
+# 📈 Metrics
+# ============================================================
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ============================================================
+# 🔬 Admin: Captured Profiles
+# ============================================================
+def require_admin(token):
+    if not tracing.admin_token_ok(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/admin/profiles")
+def list_captured_profiles(x_admin_token: str = Header(default=None)):
+    require_admin(x_admin_token)
+    return {"profiles": tracing.list_profiles()}
+
+
+@app.get("/admin/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query(default="raw", pattern="^(raw|text)$",
+                        description="raw → .prof / .folded file, text → top functions / stacks"),
+    x_admin_token: str = Header(default=None),
+):
+    require_admin(x_admin_token)
+    record = tracing.get_profile(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found (or evicted)")
+    if format == "text":
+        return PlainTextResponse(tracing.profile_as_text(record))
+    return Response(
+        record["data"],
+        media_type=record["content_type"],
+        headers={"Content-Disposition": f'attachment; filename="{record["filename"]}"'},
+    )
 
 
 # ============================================================
 # 🚀 Run Server
 # ============================================================
 if __name__ == "__main__":
-    import uvicorn
-    print("🌐 Starting KeyCrypt Unified API Server on port 5000...")
-    uvicorn.run(app, host="localhost", port=8000)
+    workers = int(os.getenv("KEYCRYPT_WORKERS", "1"))
+    if workers > 1:
+        from server.prefork import serve
+        print(f"🌐 Starting KeyCrypt Unified API Server (pre-fork, {workers} workers)...")
+        serve(workers, host="localhost", port=8000, app=app, lazy_apps=lazy_apps)
+    else:
+        import uvicorn
+        print("🌐 Starting KeyCrypt Unified API Server on port 5000...")
+        uvicorn.run(app, host="localhost", port=8000)
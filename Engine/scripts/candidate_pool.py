@@ -0,0 +1,142 @@
+"""
+============================================================
+🔐 KeyCrypt — Pre-generated Base Candidate Pool
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Bounded in-memory ring buffer of keyword-independent base strings
+✔ Background producer refills below a low watermark
+✔ Every candidate is handed out once (taken, never re-served)
+✔ Metrics: refill rate, occupancy, hit / miss counts
+============================================================
+"""
+
+import time
+import threading
+from collections import deque
+
+
+class CandidatePool:
+    """
+    Fixed-capacity ring buffer filled by a daemon thread.
+    `producer(n)` must return a list of n fresh base candidates.
+    """
+
+    def __init__(self, producer, capacity: int = 2048, batch_size: int = 64,
+                 low_watermark: float = 0.5, rate_window: float = 60.0):
+        self.producer = producer
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.low_mark = int(capacity * low_watermark)
+        self.rate_window = rate_window
+
+        self._slots = [None] * capacity
+        self._head = 0          # next slot to take
+        self._size = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+        self._hits = 0
+        self._misses = 0
+        self._produced = 0
+        self._refills = deque()   # (timestamp, count) within rate_window
+        self._last_error = None
+
+    # --------------------------------------------------------
+    # Ring buffer
+    # --------------------------------------------------------
+    def _put_many(self, items):
+        """Appends as many items as fit; caller holds the condition."""
+        added = 0
+        for item in items:
+            if self._size == self.capacity:
+                break
+            self._slots[(self._head + self._size) % self.capacity] = item
+            self._size += 1
+            added += 1
+        return added
+
+    def take(self, n: int) -> list:
+        """Takes up to n candidates; the shortfall is counted as misses."""
+        with self._cond:
+            count = min(n, self._size)
+            out = []
+            for _ in range(count):
+                out.append(self._slots[self._head])
+                self._slots[self._head] = None
+                self._head = (self._head + 1) % self.capacity
+                self._size -= 1
+            self._hits += count
+            self._misses += n - count
+            if self._size < self.low_mark:
+                self._cond.notify()
+        return out
+
+    # --------------------------------------------------------
+    # Background producer
+    # --------------------------------------------------------
+    def _run(self):
+        # Hysteresis: refill to full once occupancy drops below the low mark
+        filling = True
+        while True:
+            with self._cond:
+                if not filling:
+                    while not self._stopped and self._size >= self.low_mark:
+                        self._cond.wait()
+                    filling = True
+                if self._stopped:
+                    return
+                want = min(self.batch_size, self.capacity - self._size)
+                if want <= 0:
+                    filling = False
+                    continue
+
+            try:
+                batch = self.producer(want)
+            except Exception as e:
+                self._last_error = str(e)
+                print(f"⚠️ Candidate pool producer failed → {e}")
+                time.sleep(1.0)
+                continue
+
+            with self._cond:
+                added = self._put_many(batch)
+                self._produced += added
+                self._refills.append((time.time(), added))
+                if self._size >= self.capacity:
+                    filling = False
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="kc-candidate-pool", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    # --------------------------------------------------------
+    # Metrics
+    # --------------------------------------------------------
+    def stats(self) -> dict:
+        now = time.time()
+        with self._cond:
+            while self._refills and now - self._refills[0][0] > self.rate_window:
+                self._refills.popleft()
+            recent = sum(count for _, count in self._refills)
+            requested = self._hits + self._misses
+            return {
+                "capacity": self.capacity,
+                "occupancy": self._size,
+                "occupancy_ratio": round(self._size / self.capacity, 3),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / requested, 3) if requested else None,
+                "produced_total": self._produced,
+                "refill_rate_per_s": round(recent / self.rate_window, 2),
+                "running": self._thread is not None and self._thread.is_alive(),
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,278 @@
+"""
+============================================================
+📥 KeyCrypt — Bulk Feature Ingestion API
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ Sub-app mounted at /features by main.py
+✅ POST /{user_id}/bulk → validates feature rows against the
+   base model's feature schema, writes them in Firestore
+   batches (≤ 500 writes) committed by a bounded thread pool
+✅ Every stored row gets a sortable ingest_key, stamped per batch
+   right before its commit; POST returns the settled horizon taken
+   before its first commit as a resume cursor (reading from it sees
+   every row the request wrote)
+✅ GET  /{user_id}?since=<cursor> → settled rows ingested after
+   the cursor, oldest first, plus the next cursor
+✅ GET  /schema → the accepted feature names
+
+Concurrency:
+    KEYCRYPT_INGEST_CONCURRENCY=4     # batch commits in flight (process-wide)
+    KEYCRYPT_INGEST_SETTLE_S=10       # readers don't see rows newer than this
+                                      # (must exceed one batch commit)
+============================================================
+"""
+
+import os
+import math
+import time
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Path, Query, Body
+from pydantic import BaseModel, Field
+from server.firebase_client import FIRESTORE_BATCH_LIMIT, get_db
+from server.firebase_dataset import (
+    FEATURE_CURSOR_FIELD, get_user_features, user_features_ref, invalidate_user_features,
+)
+from server.firebase_model import load_base_strength_model
+from server.metrics import FEATURE_ROWS_INGESTED
+from server.tracing import traced
+
+app = FastAPI(
+    title="KeyCrypt — Bulk Feature Ingestion API",
+    description="Batched, schema-checked writes of password feature rows",
+    version="1.0.0",
+)
+
+MAX_ROWS_PER_REQUEST = 50_000
+MAX_ERRORS_REPORTED = 50
+LABELS = (-1, 0, 1, 2)                      # -1 = unlabeled (auto-labelled at retrain)
+INGEST_CONCURRENCY = max(1, int(os.getenv("KEYCRYPT_INGEST_CONCURRENCY", "4")))
+INGEST_SETTLE_S = float(os.getenv("KEYCRYPT_INGEST_SETTLE_S", "10"))
+
+
+class BulkFeaturesIn(BaseModel):
+    rows: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_ROWS_PER_REQUEST)
+    strict: bool = Field(default=False, description="Reject the whole request if any row is invalid")
+
+
+# ============================================================
+# 🔹 Ingest Keys (cursor order)
+# ============================================================
+_NONCE = secrets.token_hex(3)               # keeps keys unique across workers
+_clock_lock = threading.Lock()
+_last_us = 0
+
+
+def _ingest_stamp() -> int:
+    """Wall-clock µs, strictly increasing within this process."""
+    global _last_us
+    with _clock_lock:
+        _last_us = max(_last_us + 1, int(time.time() * 1e6))
+        return _last_us
+
+
+def ingest_key(stamp_us: int, row: int) -> str:
+    return f"{stamp_us:016d}-{_NONCE}-{row:06d}"
+
+
+def settled_horizon() -> str:
+    """Keys below this were assigned more than INGEST_SETTLE_S ago (their commits have landed)."""
+    return f"{int((time.time() - INGEST_SETTLE_S) * 1e6):016d}"
+
+
+# ============================================================
+# 🔹 Schema Validation
+# ============================================================
+def feature_schema() -> list:
+    return list(load_base_strength_model()["features"])
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return value
+    return None
+
+
+def validate_rows(rows: list, schema: list):
+    """
+    Returns (clean rows, their request positions, errors, dropped field counts).
+    A row needs every schema feature as a finite number; unknown
+    fields are dropped (never stored), label defaults to -1.
+    """
+    allowed = set(schema) | {"label"}
+    clean, positions, errors, dropped = [], [], [], {}
+    for i, row in enumerate(rows):
+        missing = [f for f in schema if f not in row]
+        bad = [f for f in schema if f in row and _number(row[f]) is None]
+        label = row.get("label", -1)
+        if missing or bad or isinstance(label, bool) or label not in LABELS:
+            reason = []
+            if missing:
+                reason.append(f"missing {missing[:5]}")
+            if bad:
+                reason.append(f"non-numeric {bad[:5]}")
+            if isinstance(label, bool) or label not in LABELS:
+                reason.append(f"label must be one of {list(LABELS)}")
+            errors.append({"index": i, "reason": "; ".join(reason)})
+            continue
+        for field in row:
+            if field not in allowed:
+                dropped[field] = dropped.get(field, 0) + 1
+        out = {f: _number(row[f]) for f in schema}
+        out["label"] = int(label)
+        clean.append(out)
+        positions.append(i)
+    return clean, positions, errors, dropped
+
+
+# ============================================================
+# 🔹 Batched Writes (bounded concurrency)
+# ============================================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    # Created on first use, so a pre-fork parent never owns its threads
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=INGEST_CONCURRENCY, thread_name_prefix="kc-ingest")
+        return _pool
+
+
+def _commit(db, ref, rows: list, offset: int):
+    """
+    Stamps one batch right before committing it, so every key is at most
+    one commit old when it lands — however long the whole request runs.
+    """
+    stamp, now = _ingest_stamp(), time.time()
+    batch = db.batch()
+    for i, row in enumerate(rows):
+        key = ingest_key(stamp, offset + i)
+        batch.set(ref.document(key), {**row, FEATURE_CURSOR_FIELD: key, "ingested_at": now})
+    batch.commit()
+
+
+@traced()
+def write_rows(user_id: str, rows: list) -> dict:
+    """
+    Commits rows in ≤ 500-write batches, each stamped with its own ingest keys.
+    """
+    db, ref = get_db(), user_features_ref(user_id)
+    chunks = [rows[i:i + FIRESTORE_BATCH_LIMIT] for i in range(0, len(rows), FIRESTORE_BATCH_LIMIT)]
+
+    executor = _executor()
+    futures = {executor.submit(_commit, db, ref, chunk, n * FIRESTORE_BATCH_LIMIT): n
+               for n, chunk in enumerate(chunks)}
+    failed = {}
+    for future in as_completed(futures):
+        try:
+            future.result()
+        except Exception as e:
+            failed[futures[future]] = str(e)
+
+    return {
+        "batches": len(chunks),
+        "failed_batches": len(failed),
+        "failed": [{"rows": (n * FIRESTORE_BATCH_LIMIT, n * FIRESTORE_BATCH_LIMIT + len(chunks[n])),
+                    "error": failed[n]} for n in sorted(failed)],
+        "written": len(rows) - sum(len(chunks[n]) for n in failed),
+    }
+
+
+@app.post("/{user_id}/bulk")
+def ingest_bulk(user_id: str = Path(..., description="Firebase user ID"), body: BulkFeaturesIn = Body(...)):
+    """
+    Validates + stores feature rows. `failed_rows` lists the request
+    positions of rows whose batch failed, so they can be re-sent as-is.
+    """
+    start = time.perf_counter()
+    try:
+        schema = feature_schema()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Feature schema unavailable: {str(e)}")
+
+    validate_start = time.perf_counter()
+    clean, positions, errors, dropped = validate_rows(body.rows, schema)
+    if errors and body.strict:
+        FEATURE_ROWS_INGESTED.inc(len(body.rows), result="rejected")
+        raise HTTPException(status_code=422, detail={"rejected": len(errors), "errors": errors[:MAX_ERRORS_REPORTED]})
+    validate_s = time.perf_counter() - validate_start
+
+    # Every row of this request gets a key above this, so resuming from it
+    # can't skip any of them (nor anything that settles later)
+    cursor = settled_horizon()
+    try:
+        report = write_rows(user_id, clean) if clean else {
+            "batches": 0, "failed_batches": 0, "failed": [], "written": 0}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Feature ingestion failed: {str(e)}")
+    if report["written"]:
+        invalidate_user_features(user_id)
+    seconds = time.perf_counter() - start
+    failed = report.pop("failed")
+    failed_rows = [positions[i] for f in failed for i in range(*f["rows"])]
+
+    FEATURE_ROWS_INGESTED.inc(report["written"], result="written")
+    FEATURE_ROWS_INGESTED.inc(len(errors), result="rejected")
+    FEATURE_ROWS_INGESTED.inc(len(clean) - report["written"], result="failed")
+    return {
+        "user_id": user_id,
+        "received": len(body.rows),
+        "accepted": len(clean),
+        "rejected": len(errors),
+        "errors": errors[:MAX_ERRORS_REPORTED],
+        "dropped_fields": dropped,
+        **report,
+        "failed_rows": failed_rows,
+        "batch_errors": sorted({f["error"] for f in failed})[:MAX_ERRORS_REPORTED],
+        "seconds": round(seconds, 4),
+        "validate_seconds": round(validate_s, 4),
+        "rows_per_s": round(report["written"] / seconds, 1) if seconds > 0 else None,
+        "concurrency": INGEST_CONCURRENCY,
+        "cursor": cursor,
+        "visible_after_s": INGEST_SETTLE_S,
+    }
+
+
+# ============================================================
+# 🔹 Schema + Incremental Reads
+# ============================================================
+@app.get("/schema")
+def get_schema():
+    try:
+        return {"features": feature_schema(), "labels": list(LABELS), "max_rows": MAX_ROWS_PER_REQUEST}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Feature schema unavailable: {str(e)}")
+
+
+@app.get("/{user_id}")
+def read_since(
+    user_id: str = Path(..., description="Firebase user ID"),
+    since: Optional[str] = Query(default=None, description="Cursor from a previous read (omit to start at the beginning)"),
+    limit: int = Query(default=1000, ge=1, le=10_000),
+):
+    """
+    Ingested rows after `since`, oldest first. Rows younger than
+    KEYCRYPT_INGEST_SETTLE_S are held back so that a batch still
+    committing can't land behind a cursor already handed out.
+    """
+    try:
+        df = get_user_features(user_id, since=since or "", limit=limit)
+        page_full = len(df) == limit            # before the horizon filter
+        held_back = 0
+        if not df.empty:
+            settled = df[FEATURE_CURSOR_FIELD] < settled_horizon()
+            held_back = int((~settled).sum())
+            df = df[settled]
+        rows = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        cursor = rows[-1][FEATURE_CURSOR_FIELD] if rows else since
+        return {"user_id": user_id, "rows": rows, "count": len(rows), "cursor": cursor,
+                "held_back": held_back, "more": page_full or held_back > 0}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Feature read failed: {str(e)}")
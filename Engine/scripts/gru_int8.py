@@ -0,0 +1,337 @@
+"""
+============================================================
+🔐 KeyCrypt — Int8 Quantized GRU Generator (CPU Serving)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Post-training quantization of gru_base_rnn.h5 → int8 weights
+✔ Per-output-channel symmetric scales (float32)
+✔ Pure NumPy runtime — no TensorFlow needed to serve
+✔ Keras-compatible `predict()` so gen.py / generator can use it
+✔ Comparison report: per-step latency, size, KL divergence
+  on next-char contexts from the encoded training corpus
+
+Usage:
+    python -m scripts.gru_int8 quantize gru_base_rnn.h5 gru_base_rnn_int8.npz
+    python -m scripts.gru_int8 compare gru_base_rnn.h5 gru_base_rnn_int8.npz \
+        --vocab data/vocab.json --report gru_int8_report.json
+    (contexts from data/strong_corpus.*; --corpus <prefix> to override)
+============================================================
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+SEQ_LEN = 24
+
+
+# ============================================================
+# 🔹 Quantization Helpers
+# ============================================================
+def quantize_per_channel(weights: np.ndarray, axis: int = 0):
+    """
+    Symmetric int8 quantization with one scale per output channel.
+    `axis` is the reduction axis (input dimension) of the matrix.
+    """
+    weights = np.asarray(weights, dtype=np.float32)
+    max_abs = np.max(np.abs(weights), axis=axis, keepdims=True)
+    scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    q = np.clip(np.round(weights / scale), -127, 127).astype(np.int8)
+    return q, np.squeeze(scale, axis=axis)
+
+
+def quantize_gru_model(h5_path: str, output_path: str) -> dict:
+    """
+    Reads the float Keras GRU model and writes an int8 .npz artifact.
+    Biases stay float32 (they are tiny and sensitive to rounding).
+    """
+    from tensorflow.keras.models import load_model  # only needed offline
+
+    model = load_model(h5_path)
+    arrays = {}
+    gru_layers = []
+
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        weights = layer.get_weights()
+
+        if kind == "Embedding":
+            # One scale per vocabulary row
+            q, scale = quantize_per_channel(weights[0], axis=1)
+            arrays["embedding_q"], arrays["embedding_scale"] = q, scale
+
+        elif kind == "GRU":
+            idx = len(gru_layers)
+            kernel, recurrent, bias = weights
+            arrays[f"gru{idx}_kernel_q"], arrays[f"gru{idx}_kernel_scale"] = quantize_per_channel(kernel)
+            arrays[f"gru{idx}_recurrent_q"], arrays[f"gru{idx}_recurrent_scale"] = quantize_per_channel(recurrent)
+            arrays[f"gru{idx}_bias"] = np.asarray(bias, dtype=np.float32)
+            gru_layers.append({
+                "units": int(layer.units),
+                "reset_after": bool(layer.reset_after),
+                "return_sequences": bool(layer.return_sequences),
+            })
+
+        elif kind == "Dense":
+            kernel, bias = weights
+            arrays["dense_kernel_q"], arrays["dense_kernel_scale"] = quantize_per_channel(kernel)
+            arrays["dense_bias"] = np.asarray(bias, dtype=np.float32)
+
+        # Dropout / InputLayer carry no weights at inference time
+
+    meta = {"format": "keycrypt-gru-int8", "version": 1, "gru_layers": gru_layers}
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    # Uncompressed → loads without a decompression pass
+    np.savez(output_path, **arrays)
+    print(f"💾 Int8 GRU saved → {output_path} ({os.path.getsize(output_path)} bytes)")
+    return meta
+
+
+# ============================================================
+# 🔹 Int8 Runtime (NumPy)
+# ============================================================
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class Int8GRUModel:
+    """
+    Minimal inference runtime for the quantized generator.
+    Weights stay int8 at rest; each matmul rescales its float32 output
+    per channel instead of materializing a float copy of the model.
+    """
+
+    def __init__(self, npz_path: str):
+        data = np.load(npz_path)
+        self.meta = json.loads(bytes(data["meta"]).decode("utf-8"))
+        self.arrays = {name: data[name] for name in data.files if name != "meta"}
+        self.path = npz_path
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(arr.nbytes for arr in self.arrays.values()))
+
+    def _qmatmul(self, x, name):
+        q = self.arrays[f"{name}_q"]
+        return (x @ q) * self.arrays[f"{name}_scale"]
+
+    def _gru(self, x, idx, layer):
+        units = layer["units"]
+        bias = self.arrays[f"gru{idx}_bias"]
+        if layer["reset_after"]:
+            input_bias, recurrent_bias = bias[0], bias[1]
+        else:
+            input_bias, recurrent_bias = bias, np.zeros_like(bias)
+
+        batch, steps, _ = x.shape
+        x_proj = self._qmatmul(x, f"gru{idx}_kernel") + input_bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        outputs = []
+
+        recurrent_q = self.arrays[f"gru{idx}_recurrent_q"]
+        recurrent_scale = self.arrays[f"gru{idx}_recurrent_scale"]
+
+        for t in range(steps):
+            xz, xr, xh = np.split(x_proj[:, t], 3, axis=-1)
+
+            if layer["reset_after"]:
+                h_proj = (h @ recurrent_q) * recurrent_scale + recurrent_bias
+                hz, hr, hh = np.split(h_proj, 3, axis=-1)
+                z = _sigmoid(xz + hz)
+                r = _sigmoid(xr + hr)
+                candidate = np.tanh(xh + r * hh)
+            else:
+                h_proj = (h @ recurrent_q[:, :2 * units]) * recurrent_scale[:2 * units]
+                hz, hr = np.split(h_proj, 2, axis=-1)
+                z = _sigmoid(xz + hz)
+                r = _sigmoid(xr + hr)
+                hh = ((r * h) @ recurrent_q[:, 2 * units:]) * recurrent_scale[2 * units:]
+                candidate = np.tanh(xh + hh)
+
+            h = (z * h + (1.0 - z) * candidate).astype(np.float32)
+            outputs.append(h)
+
+        return np.stack(outputs, axis=1) if layer["return_sequences"] else h
+
+    def predict(self, x, verbose=0):
+        """Keras-style predict: int token ids (batch, steps) → softmax (batch, vocab)."""
+        x = np.asarray(x, dtype=np.int64)
+        if x.ndim == 1:
+            x = x[None, :]
+
+        emb = self.arrays["embedding_q"][x].astype(np.float32)
+        hidden = emb * self.arrays["embedding_scale"][x][..., None]
+
+        for idx, layer in enumerate(self.meta["gru_layers"]):
+            hidden = self._gru(hidden, idx, layer)
+
+        if hidden.ndim == 3:
+            hidden = hidden[:, -1]
+
+        logits = self._qmatmul(hidden, "dense_kernel") + self.arrays["dense_bias"]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=-1, keepdims=True)
+
+
+def load_int8_model(npz_path: str) -> Int8GRUModel:
+    if not os.path.exists(npz_path):
+        raise FileNotFoundError(f"❌ Int8 GRU model not found: {npz_path}")
+    model = Int8GRUModel(npz_path)
+    print(f"✅ Int8 GRU loaded from: {npz_path} ({model.nbytes} bytes of weights)")
+    return model
+
+
+# ============================================================
+# 🔹 Float vs Int8 Comparison Report
+# ============================================================
+def default_corpus_prefix(vocab_path: str):
+    """preprocess_strong_dataset writes strong_corpus.* next to vocab.json."""
+    return os.path.join(os.path.dirname(os.path.abspath(vocab_path)), "strong_corpus") if vocab_path else None
+
+
+def _corpus_windows(prefix: str, num_samples: int, seq_len: int, rng, block_size: int = 256):
+    """num_samples next-char contexts from the encoded corpus (None if it has none)."""
+    from scriptsss.sequence_dataset import load_corpus, block_windows
+
+    tokens, offsets, meta = load_corpus(prefix)
+    n = meta["n_sequences"]
+    starts = np.arange(0, n, block_size)
+    rng.shuffle(starts)
+    picked, total = [], 0
+    for first in starts:
+        X, _, _ = block_windows(tokens, offsets, int(first), int(min(first + block_size, n)), seq_len)
+        picked.append(X)
+        total += len(X)
+        if total >= num_samples * 4:            # enough to draw from without clustering on a few blocks
+            break
+    if not total:
+        return None
+    windows = np.concatenate(picked)
+    return windows[rng.choice(len(windows), size=min(num_samples, len(windows)), replace=False)]
+
+
+def _sample_windows(vocab_path: str, num_samples: int, seq_len: int, seed: int = 42, corpus_prefix: str = None):
+    """
+    → (windows, source). Real contexts from the encoded training corpus
+    when there is one; uniform random token ids only as a fallback.
+    """
+    rng = np.random.default_rng(seed)
+    prefix = corpus_prefix or default_corpus_prefix(vocab_path)
+    if prefix and os.path.exists(f"{prefix}.json"):
+        windows = _corpus_windows(prefix, num_samples, seq_len, rng)
+        if windows is not None:
+            return windows, f"corpus:{prefix}"
+        print(f"⚠️ Corpus {prefix} has no windows → falling back to random tokens")
+
+    vocab_size = 96
+    if vocab_path and os.path.exists(vocab_path):
+        with open(vocab_path, "r", encoding="utf-8") as f:
+            vocab_size = len(json.load(f)) + 1
+    return rng.integers(1, vocab_size, size=(num_samples, seq_len)), "random"
+
+
+def _latency_stats(samples_ms):
+    arr = np.asarray(samples_ms)
+    return {
+        "mean_ms": round(float(arr.mean()), 4),
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p95_ms": round(float(np.percentile(arr, 95)), 4),
+    }
+
+
+def compare_models(float_path: str, int8_path: str, vocab_path: str = None,
+                   num_samples: int = 256, seq_len: int = SEQ_LEN, timing_steps: int = 50,
+                   corpus_prefix: str = None) -> dict:
+    """
+    Compares the float Keras model with the int8 runtime on the same inputs:
+    contexts from the encoded corpus (corpus_prefix, or strong_corpus next
+    to the vocab), random token windows only if there is no corpus.
+    Divergence is KL(float || int8) over next-character distributions.
+    """
+    from tensorflow.keras.models import load_model
+
+    float_model = load_model(float_path)
+    int8_model = load_int8_model(int8_path)
+    windows, source = _sample_windows(vocab_path, num_samples, seq_len, corpus_prefix=corpus_prefix)
+    num_samples = len(windows)
+
+    p = np.maximum(float_model.predict(windows, verbose=0), 1e-8)
+    q = np.maximum(int8_model.predict(windows), 1e-8)
+    kl = np.sum(p * (np.log(p) - np.log(q)), axis=-1)
+    top1_agreement = float(np.mean(p.argmax(axis=-1) == q.argmax(axis=-1)))
+
+    # Per-step latency = one next-character prediction for a single sequence
+    float_ms, int8_ms = [], []
+    for i in range(timing_steps):
+        window = windows[i % num_samples][None, :]
+        start = time.perf_counter()
+        float_model.predict(window, verbose=0)
+        float_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        int8_model.predict(window)
+        int8_ms.append((time.perf_counter() - start) * 1000)
+
+    float_param_bytes = int(sum(w.nbytes for w in float_model.get_weights()))
+
+    report = {
+        "samples": num_samples,
+        "seq_len": seq_len,
+        "windows": source,
+        "latency_per_step": {
+            "float32": _latency_stats(float_ms),
+            "int8": _latency_stats(int8_ms),
+        },
+        "size": {
+            "float32_file_bytes": os.path.getsize(float_path),
+            "int8_file_bytes": os.path.getsize(int8_path),
+            "float32_weight_bytes": float_param_bytes,
+            "int8_weight_bytes": int8_model.nbytes,
+        },
+        "divergence": {
+            "kl_mean": round(float(kl.mean()), 6),
+            "kl_max": round(float(kl.max()), 6),
+            "top1_agreement": round(top1_agreement, 4),
+        },
+    }
+    return report
+
+
+# ============================================================
+# 🚀 CLI
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Quantize / compare the KeyCrypt GRU generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    q = sub.add_parser("quantize", help="Write int8 .npz from a float .h5 model")
+    q.add_argument("float_model")
+    q.add_argument("output")
+
+    c = sub.add_parser("compare", help="Latency / size / divergence report")
+    c.add_argument("float_model")
+    c.add_argument("int8_model")
+    c.add_argument("--vocab", default=None)
+    c.add_argument("--corpus", default=None, help="Encoded corpus prefix (default: strong_corpus next to --vocab)")
+    c.add_argument("--samples", type=int, default=256)
+    c.add_argument("--report", default="gru_int8_report.json")
+
+    args = parser.parse_args()
+
+    if args.command == "quantize":
+        quantize_gru_model(args.float_model, args.output)
+    else:
+        report = compare_models(args.float_model, args.int8_model, args.vocab, args.samples,
+                                corpus_prefix=args.corpus)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+        print(f"📊 Comparison report saved → {args.report}")
+
+
+if __name__ == "__main__":
+    main()
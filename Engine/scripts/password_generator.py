@@ -8,18 +8,49 @@ Author: Shubham Patel (NIT Raipur)
 ✔ Human-style keyword blending (capitalization, slicing, leetspeak)
 ✔ Strength predicted using user/base ML model
 ✔ Returns ranked strong passwords
+✔ GRU variant chosen at startup: KEYCRYPT_GRU_VARIANT=float|int8
+✔ Base candidates pre-generated in a background pool (KEYCRYPT_POOL_SIZE)
+✔ Adaptive mode (?k=...): batches until k candidates reach min_score
+  or a time / candidate budget runs out (top-k heap, no full sort)
+✔ Streaming mode (/stream): NDJSON or SSE, one record per scored
+  candidate + a final summary record
+✔ Optional policy (min/max length, required classes, banned chars,
+  max keyword share) — candidates built to satisfy it by construction
 ============================================================
 """
 
+import os
+import json
+import time
+import heapq
+import threading
+import itertools
 import numpy as np
 import string
 import math
 import pandas as pd
 import random
-from typing import List
-from fastapi import FastAPI, Path, Query, HTTPException
-from tensorflow.keras.models import load_model
-from server.firebase_model import load_gru_model, load_strength_model_for_user
+from typing import List, Optional
+from fastapi import FastAPI, Path, Query, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from server.firebase_model import (
+    load_gru_model, load_gru_int8_model, load_base_strength_model, user_model_cache
+)
+from server.startup_timing import timed, mark_warm
+from scripts.candidate_pool import CandidatePool
+from scripts.password_policy import PasswordPolicy, build_policy_candidates
+from server.metrics import stage, register_collector, GENERATOR_CANDIDATES, MODEL_CACHE_BYTES
+from server.tracing import traced
+from server.breach_index import breach_feature
+from server.pattern_features import get_detector
+
+# Which generator to serve ("float" → Keras .h5, "int8" → NumPy runtime)
+GRU_VARIANT = os.getenv("KEYCRYPT_GRU_VARIANT", "float").strip().lower()
+if GRU_VARIANT not in ("float", "int8"):
+    raise ValueError(f"❌ Unknown KEYCRYPT_GRU_VARIANT: {GRU_VARIANT} (expected 'float' or 'int8')")
+
+# Pre-generated base candidates (0 disables the pool)
+POOL_SIZE = int(os.getenv("KEYCRYPT_POOL_SIZE", "2048"))
 
 # ============================================================
 # 🔹 FastAPI Setup
@@ -30,6 +61,45 @@ app = FastAPI(
     version="3.0.0"
 )
 
+# ============================================================
+# 🔹 GRU Generator Loader (variant fixed at startup)
+# ============================================================
+_gru_model = None
+_gru_lock = threading.Lock()
+
+
+def get_gru_model():
+    """Loads the configured GRU variant once and reuses it across requests."""
+    global _gru_model
+    if _gru_model is not None:
+        return _gru_model
+    with _gru_lock:                     # concurrent first requests → one download
+        if _gru_model is None:
+            with timed(f"gru generator ({GRU_VARIANT})", "init"):
+                local_path = load_gru_int8_model() if GRU_VARIANT == "int8" else load_gru_model()
+                try:
+                    with stage("deserialize"):
+                        if GRU_VARIANT == "int8":
+                            from scripts.gru_int8 import load_int8_model
+                            model = load_int8_model(local_path)
+                        else:
+                            from tensorflow.keras.models import load_model
+                            model = load_model(local_path)
+                    MODEL_CACHE_BYTES.set(os.path.getsize(local_path), model=f"gru_{GRU_VARIANT}")
+                finally:
+                    os.remove(local_path)
+            _gru_model = model
+            mark_warm("gru")
+            print(f"🧠 GRU generator ready → variant: {GRU_VARIANT}")
+    return _gru_model
+
+
+def warmup():
+    """Explicit warm-up hook used by main.py (GRU + base strength model + pool + pattern automata)."""
+    get_candidate_pool(get_gru_model())
+    load_base_strength_model()
+    get_detector()
+
 # ============================================================
 # 🔹 Helper — Feature Extraction
 # ============================================================
@@ -60,7 +130,10 @@ def extract_features(password: str):
         "digitRatio": digit_ratio,
         "symbolRatio": symbol_ratio,
         "entropy": entropy,
-        "charClassCount": char_class_count
+        "charClassCount": char_class_count,
+        "breached": breach_feature(password),
+        # Leetspeak / capitalized keywords, keyboard walks, dates
+        **get_detector().features(password)
     }
 
 # ============================================================
@@ -122,7 +195,8 @@ def blend_keywords_into_password(base_pwd: str, keywords: List[str]) -> str:
 def generate_passwords(gru_model, num_passwords=12, max_length=12):
     """
     GRU-like random sampling (mock).
-    Replace with real GRU prediction if needed.
+    Replace with real GRU prediction if needed — the loaded model
+    (float or int8) is not sampled yet: serving has no vocab artifact.
     """
     chars = list(string.ascii_letters + string.digits + string.punctuation)
     passwords = []
@@ -135,75 +209,362 @@ def generate_passwords(gru_model, num_passwords=12, max_length=12):
 
     return passwords
 
+# ============================================================
+# 🔹 Background Candidate Pool
+# ============================================================
+_candidate_pool = None
+
+
+def get_candidate_pool(gru_model):
+    """Starts the background producer on first use."""
+    global _candidate_pool
+    if _candidate_pool is None and POOL_SIZE > 0:
+        _candidate_pool = CandidatePool(
+            lambda n: generate_passwords(gru_model, num_passwords=n),
+            capacity=POOL_SIZE,
+        ).start()
+        print(f"♻️ Candidate pool started → capacity {POOL_SIZE}")
+    return _candidate_pool
+
+
+def draw_base_passwords(gru_model, num_passwords: int):
+    """Takes base candidates from the pool; generates any shortfall inline."""
+    pool = get_candidate_pool(gru_model)
+    base = pool.take(num_passwords) if pool else []
+    if len(base) < num_passwords:
+        base += generate_passwords(gru_model, num_passwords=num_passwords - len(base))
+    return base
+
+
+@register_collector
+def _pool_metrics():
+    if _candidate_pool is None:
+        return
+    stats = _candidate_pool.stats()
+    yield ("keycrypt_candidate_pool_takes_total", "counter", "Base candidates requested from the pool",
+           [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])])
+    yield ("keycrypt_candidate_pool_hit_ratio", "gauge", "Candidate pool hit ratio", [({}, stats["hit_ratio"])])
+    yield ("keycrypt_candidate_pool_occupancy", "gauge", "Candidates waiting in the pool", [({}, stats["occupancy"])])
+    yield ("keycrypt_candidate_pool_produced_total", "counter", "Candidates produced by the background pool",
+           [({}, stats["produced_total"])])
+
+
+@app.get("/pool-stats")
+def pool_stats():
+    """Refill rate, occupancy and hit / miss counts of the candidate pool."""
+    if _candidate_pool is None:
+        return {"enabled": POOL_SIZE > 0, "running": False}
+    return {"enabled": True, **_candidate_pool.stats()}
+
+# ============================================================
+# 🔹 Policy (optional request parameters)
+# ============================================================
+def policy_params(
+    min_length: Optional[int] = Query(default=None, ge=1, le=128, description="Policy: minimum length"),
+    max_length: Optional[int] = Query(default=None, ge=1, le=128, description="Policy: maximum length"),
+    require: List[str] = Query(default=[], description="Policy: required classes (lower, upper, digit, symbol)"),
+    banned: str = Query(default="", max_length=256, description="Policy: banned characters"),
+    max_keyword_share: Optional[float] = Query(default=None, ge=0, le=1, description="Policy: max keyword share of length"),
+) -> Optional[PasswordPolicy]:
+    """Returns None when no policy field is given (legacy random blending)."""
+    if min_length is None and max_length is None and not require and not banned and max_keyword_share is None:
+        return None
+
+    min_len = min_length or (min(12, max_length) if max_length else 12)
+    policy = PasswordPolicy(
+        min_length=min_len,
+        max_length=max_length or max(20, min_len),
+        required=require or None,
+        banned=banned,
+        max_keyword_share=0.5 if max_keyword_share is None else max_keyword_share,
+    )
+    try:
+        return policy.validate()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid password policy: {e}")
+
+
+def new_policy_stats(policy: Optional[PasswordPolicy]) -> Optional[dict]:
+    return {**policy.to_dict(), "built": 0, "accepted": 0} if policy else None
+
+
+def rejected_count(policy_stats: Optional[dict]) -> int:
+    """Candidates built but dropped by the policy check (never scored)."""
+    return policy_stats["built"] - policy_stats["accepted"] if policy_stats else 0
+
+
+def blend_batch(base_passwords: List[str], keywords: List[str],
+                policy: Optional[PasswordPolicy] = None, policy_stats: dict = None) -> List[str]:
+    """Random keyword blending, or policy-valid construction when a policy is set."""
+    if policy is None:
+        with stage("blend"):
+            return [blend_keywords_into_password(pwd, keywords) for pwd in base_passwords]
+
+    with stage("blend"):
+        accepted, stats = build_policy_candidates(base_passwords, keywords, policy)
+    if policy_stats is not None:
+        policy_stats["built"] += stats["built"]
+        policy_stats["accepted"] += stats["accepted"]
+        policy_stats["acceptance_rate"] = round(policy_stats["accepted"] / policy_stats["built"], 4)
+    return accepted
+
+# ============================================================
+# 🔹 Batch Scoring (vectorized over candidates)
+# ============================================================
+LABEL_MAP = {0: "Weak", 1: "Medium", 2: "Strong"}
+
+
+def score_passwords(passwords: List[str], model_data: dict) -> List[dict]:
+    """Featurizes + scores a batch with one scaler / forest call."""
+    with stage("featurize"):
+        feature_list = [extract_features(pwd) for pwd in passwords]
+        df = pd.DataFrame(feature_list).reindex(columns=model_data["features"], fill_value=0)
+    with stage("scale"):
+        scaled = model_data["scaler"].transform(df)
+
+    model = model_data["model"]
+    with stage("predict"):
+        probs = model.predict_proba(scaled)
+    # Same as model.predict(), without a second pass over the forest
+    preds = model.classes_[np.argmax(probs, axis=1)]
+    GENERATOR_CANDIDATES.inc(len(passwords), mode="scored")
+
+    results = []
+    for pwd, features, pred, prob in zip(passwords, feature_list, preds, probs):
+        results.append({
+            "password": pwd,
+            "breached": bool(features.get("breached")),
+            "predicted_label": LABEL_MAP[int(pred)],
+            "confidence": {
+                "weak": round(float(prob[0]), 3),
+                "medium": round(float(prob[1]), 3),
+                "strong": round(float(prob[2]), 3)
+            },
+            "strength_score": round(float(prob[2] * 100), 2)
+        })
+    return results
+
+
+# ============================================================
+# 🔹 Adaptive Early-Exit Generation
+# ============================================================
+def generate_until_k_strong(gru_model, keywords: List[str], model_data: dict, k: int,
+                            min_score: float, max_candidates: int, time_budget_ms: int,
+                            batch_size: int, policy: Optional[PasswordPolicy] = None,
+                            policy_stats: dict = None) -> dict:
+    """
+    Produces + scores candidates in batches until the best k all reach
+    `min_score`, or the candidate / time budget is exhausted.
+    Keeps a size-k min-heap of the best results seen so far.
+    The budget counts drawn candidates; evaluated_count only those that
+    passed the policy and were actually scored.
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    heap = []                       # (score, tiebreak, result) — smallest on top
+    tiebreak = itertools.count()
+    drawn, evaluated, batches = 0, 0, 0
+    stop_reason = "candidate_budget"
+
+    while drawn < max_candidates:
+        n = min(batch_size, max_candidates - drawn)
+        base = draw_base_passwords(gru_model, num_passwords=n)
+        blended = blend_batch(base, keywords, policy, policy_stats)
+
+        for result in score_passwords(blended, model_data) if blended else []:
+            entry = (result["strength_score"], next(tiebreak), result)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+
+        drawn += n
+        evaluated += len(blended)
+        batches += 1
+
+        if len(heap) == k and heap[0][0] >= min_score:
+            stop_reason = "target_met"
+            break
+        if time.perf_counter() >= deadline:
+            stop_reason = "time_budget"
+            break
+
+    top = [result for _, _, result in sorted(heap, reverse=True)]
+    return {
+        "results": top,
+        "evaluated_count": evaluated,
+        "rejected_count": drawn - evaluated,
+        "batches": batches,
+        "target_met": len(top) == k and all(r["strength_score"] >= min_score for r in top),
+        "stop_reason": stop_reason,
+    }
+
 # ============================================================
 # 🔹 API: Generate + Blend Keywords + Rank
 # ============================================================
 @app.get("/generate-passwords/{user_id}")
+@traced()
 def generate_and_rank_passwords(
     user_id: str = Path(..., description="Firebase user ID"),
-    keywords: List[str] = Query(default=[], description="User keywords (ALL included)")
+    keywords: List[str] = Query(default=[], description="User keywords (ALL included)"),
+    k: Optional[int] = Query(default=None, ge=1, le=50, description="Adaptive mode: number of strong passwords wanted"),
+    min_score: float = Query(default=80.0, ge=0, le=100, description="Adaptive mode: target strength_score"),
+    max_candidates: int = Query(default=300, ge=1, le=5000, description="Adaptive mode: candidate budget"),
+    time_budget_ms: int = Query(default=1000, ge=10, le=10000, description="Adaptive mode: time budget"),
+    batch_size: int = Query(default=32, ge=1, le=512, description="Adaptive mode: candidates per batch"),
+    policy: Optional[PasswordPolicy] = Depends(policy_params),
 ):
     """
     Generates GRU passwords, blends ALL keywords, evaluates strength,
     and returns ranked results.
+    With `k`, keeps generating in batches until k candidates reach `min_score`.
+    With policy fields, candidates are constructed to satisfy the policy.
     """
     print("🔥 Keywords received:", keywords)
 
     try:
-        # 1️⃣ Load GRU model
-        gru_model_path = load_gru_model()
-        gru_model = load_model(gru_model_path)
-
-        # 2️⃣ Generate base GRU-style passwords
-        base_passwords = generate_passwords(gru_model, num_passwords=15)
+        # 1️⃣ Load GRU model (float or int8, cached)
+        gru_model = get_gru_model()
 
-        # 3️⃣ Blend ALL keywords
-        final_passwords = [
-            blend_keywords_into_password(pwd, keywords)
-            for pwd in base_passwords
-        ]
+        # 2️⃣ Resolve model (cached personalized / base, never waits on storage)
+        model_data, model_type = user_model_cache.resolve(user_id)
 
-        # 4️⃣ Extract features
-        feature_list = [extract_features(pwd) for pwd in final_passwords]
-
-        # 5️⃣ Load model (personalized / base)
-        model_data, model_type = load_strength_model_for_user(user_id)
-        model = model_data["model"]
-        scaler = model_data["scaler"]
-        features_list = model_data["features"]
-
-        df = pd.DataFrame(feature_list).reindex(columns=features_list, fill_value=0)
-        scaled = scaler.transform(df)
+        response = {
+            "user_id": user_id,
+            "keywords_used": keywords,
+            "model_used": model_type,
+            "model_version": model_data.get("version"),
+            "generator_variant": GRU_VARIANT,
+        }
 
-        preds = model.predict(scaled)
-        probs = model.predict_proba(scaled)
+        policy_stats = new_policy_stats(policy)
 
-        label_map = {0: "Weak", 1: "Medium", 2: "Strong"}
-
-        # 6️⃣ Build ranked results
-        results = []
-        for pwd, pred, prob in zip(final_passwords, preds, probs):
-            results.append({
-                "password": pwd,
-                "predicted_label": label_map[int(pred)],
-                "confidence": {
-                    "weak": round(float(prob[0]), 3),
-                    "medium": round(float(prob[1]), 3),
-                    "strong": round(float(prob[2]), 3)
-                },
-                "strength_score": round(float(prob[2] * 100), 2)
+        if k is not None:
+            # 3️⃣ Adaptive: batches until k strong (or budget exhausted)
+            outcome = generate_until_k_strong(
+                gru_model, keywords, model_data, k=k, min_score=min_score,
+                max_candidates=max_candidates, time_budget_ms=time_budget_ms,
+                batch_size=batch_size, policy=policy, policy_stats=policy_stats,
+            )
+            results_sorted = outcome["results"]
+            response.update({
+                "mode": "adaptive",
+                "target": {"k": k, "min_score": min_score},
+                "target_met": outcome["target_met"],
+                "stop_reason": outcome["stop_reason"],
+                "batches": outcome["batches"],
+                "evaluated_count": outcome["evaluated_count"],
+                "rejected_count": outcome["rejected_count"],
             })
+        else:
+            # 3️⃣ Fixed: 15 base passwords (pool, inline on miss) + blend ALL keywords
+            final_passwords = []
+            for _ in range(5):      # a policy can reject a few; bounded retries
+                base_passwords = draw_base_passwords(gru_model, num_passwords=15 - len(final_passwords))
+                final_passwords += blend_batch(base_passwords, keywords, policy, policy_stats)
+                if len(final_passwords) >= 15:
+                    break
+
+            # 4️⃣ Featurize + score in one batch, then rank
+            results = score_passwords(final_passwords, model_data)
+            results_sorted = sorted(results, key=lambda x: x["strength_score"], reverse=True)
+            response.update({"mode": "fixed", "evaluated_count": len(results),
+                             "rejected_count": rejected_count(policy_stats)})
+
+        if policy_stats:
+            response["policy"] = policy_stats
+
+        response.update({
+            "generated_count": len(results_sorted),
+            "best_password": results_sorted[0] if results_sorted else None,
+            "all_passwords": results_sorted
+        })
+        return response
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Password generation failed: {str(e)}")
 
-        results_sorted = sorted(results, key=lambda x: x["strength_score"], reverse=True)
 
-        return {
+# ============================================================
+# 🔹 API: Streaming Generate (NDJSON / SSE)
+# ============================================================
+def _stream_records(user_id: str, keywords: List[str], count: int, batch_size: int,
+                    policy: Optional[PasswordPolicy] = None):
+    """
+    Yields one record per scored candidate, then a summary.
+    The first candidate is scored alone so it reaches the client as early
+    as possible; the rest go through the forest in small batches.
+    """
+    start = time.perf_counter()
+    try:
+        gru_model = get_gru_model()
+        model_data, model_type = user_model_cache.resolve(user_id)
+
+        policy_stats = new_policy_stats(policy)
+        best, emitted, first_ms, rounds = None, 0, None, 0
+        while emitted < count and rounds < count * 5:
+            rounds += 1
+            n = 1 if emitted == 0 else min(batch_size, count - emitted)
+            base = draw_base_passwords(gru_model, num_passwords=n)
+            blended = blend_batch(base, keywords, policy, policy_stats)
+            if not blended:
+                continue
+
+            for result in score_passwords(blended, model_data):
+                if first_ms is None:
+                    first_ms = round((time.perf_counter() - start) * 1000, 2)
+                if best is None or result["strength_score"] > best["strength_score"]:
+                    best = result
+                yield "candidate", {"index": emitted, **result}
+                emitted += 1
+
+        summary = {
             "user_id": user_id,
             "keywords_used": keywords,
             "model_used": model_type,
-            "generated_count": len(results_sorted),
-            "best_password": results_sorted[0] if results_sorted else None,
-            "all_passwords": results_sorted
+            "model_version": model_data.get("version"),
+            "generator_variant": GRU_VARIANT,
+            "generated_count": emitted,
+            "evaluated_count": emitted,
+            "rejected_count": rejected_count(policy_stats),
+            "best_password": best,
+            "time_to_first_candidate_ms": first_ms,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
         }
-
+        if policy_stats:
+            summary["policy"] = policy_stats
+        yield "summary", summary
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Password generation failed: {str(e)}")
+        # Headers are already sent — report the failure in-band
+        yield "error", {"detail": f"Password generation failed: {str(e)}"}
+
+
+def _format_ndjson(records):
+    for kind, payload in records:
+        yield json.dumps({"type": kind, **payload}) + "\n"
+
+
+def _format_sse(records):
+    for kind, payload in records:
+        yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.get("/generate-passwords/{user_id}/stream")
+def stream_generated_passwords(
+    user_id: str = Path(..., description="Firebase user ID"),
+    keywords: List[str] = Query(default=[], description="User keywords (ALL included)"),
+    count: int = Query(default=15, ge=1, le=200, description="Number of candidates to stream"),
+    batch_size: int = Query(default=5, ge=1, le=64, description="Candidates scored per forest call"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$", description="ndjson or sse"),
+    policy: Optional[PasswordPolicy] = Depends(policy_params),
+):
+    """Streams each scored candidate as soon as it is ready, then a summary record."""
+    print("🔥 Keywords received (stream):", keywords)
+    records = _stream_records(user_id, keywords, count, batch_size, policy)
+
+    if format == "sse":
+        return StreamingResponse(
+            _format_sse(records),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return StreamingResponse(_format_ndjson(records), media_type="application/x-ndjson")
@@ -0,0 +1,194 @@
+"""
+============================================================
+🔐 KeyCrypt — Policy-Driven Candidate Construction
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Explicit policy: min / max length, required classes,
+  banned characters, maximum keyword share
+✔ Candidates satisfy the policy by construction — no
+  generate-then-reject round trips through the ML scorer
+✔ Batched: lengths / positions drawn once per batch with NumPy
+✔ Acceptance rate reported (built vs. policy-valid)
+============================================================
+"""
+
+import string
+import random
+import numpy as np
+from collections import Counter
+from typing import List, Optional
+
+CHAR_CLASSES = {
+    "lower": string.ascii_lowercase,
+    "upper": string.ascii_uppercase,
+    "digit": string.digits,
+    "symbol": "!@#$%&*?" + "^-_=+.,:;~",
+}
+
+LEET = str.maketrans({"a": "@", "e": "3", "i": "1", "o": "0"})
+
+
+def char_class(c: str) -> Optional[str]:
+    if c.islower():
+        return "lower"
+    if c.isupper():
+        return "upper"
+    if c.isdigit():
+        return "digit"
+    if not c.isalnum():
+        return "symbol"
+    return None
+
+
+# ============================================================
+# 🔹 Policy
+# ============================================================
+class PasswordPolicy:
+    def __init__(self, min_length: int = 12, max_length: int = 20, required: List[str] = None,
+                 banned: str = "", max_keyword_share: float = 0.5):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.required = list(dict.fromkeys(required or ["lower", "upper", "digit", "symbol"]))
+        self.banned = set(banned or "")
+        self.max_keyword_share = max_keyword_share
+
+        # Allowed alphabet per class once banned characters are removed
+        self.alphabets = {
+            name: "".join(c for c in chars if c not in self.banned)
+            for name, chars in CHAR_CLASSES.items()
+        }
+        self.filler_alphabet = "".join(self.alphabets.values())
+
+    def validate(self):
+        """Raises ValueError if no password can satisfy the policy."""
+        unknown = [r for r in self.required if r not in CHAR_CLASSES]
+        if unknown:
+            raise ValueError(f"Unknown character classes: {unknown}")
+        if not 1 <= self.min_length <= self.max_length:
+            raise ValueError("min_length must be ≥ 1 and ≤ max_length")
+        if not 0.0 <= self.max_keyword_share <= 1.0:
+            raise ValueError("max_keyword_share must be between 0 and 1")
+        empty = [r for r in self.required if not self.alphabets[r]]
+        if empty:
+            raise ValueError(f"Required classes fully banned: {empty}")
+        if len(self.required) > self.max_length:
+            raise ValueError("max_length is shorter than the number of required classes")
+        if not self.filler_alphabet:
+            raise ValueError("Every filler character is banned")
+        return self
+
+    def check(self, password: str, keyword_chars: int = 0) -> bool:
+        if not self.min_length <= len(password) <= self.max_length:
+            return False
+        if any(c in self.banned for c in password):
+            return False
+        present = {char_class(c) for c in password}
+        if any(r not in present for r in self.required):
+            return False
+        return keyword_chars <= self.max_keyword_share * len(password)
+
+    def to_dict(self) -> dict:
+        return {
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+            "required": self.required,
+            "banned": "".join(sorted(self.banned)),
+            "max_keyword_share": self.max_keyword_share,
+        }
+
+
+# ============================================================
+# 🔹 Constructive Builder
+# ============================================================
+def _style_keyword(kw: str, rng: random.Random, banned) -> str:
+    """Same human-style transforms as blend_keywords_into_password, minus banned chars."""
+    if rng.random() < 0.20:
+        kw = kw.capitalize()
+    if rng.random() < 0.30:
+        kw = kw.translate(LEET)
+    return "".join(c for c in kw if c not in banned)
+
+
+def _fit_keywords(styled: List[str], budget: int) -> List[str]:
+    """Trims keywords (longest first) until their total fits the share budget."""
+    styled = [kw for kw in styled if kw]
+    while styled and sum(len(kw) for kw in styled) > budget:
+        longest = max(range(len(styled)), key=lambda i: len(styled[i]))
+        styled[longest] = styled[longest][:-1]
+        styled = [kw for kw in styled if kw]
+    return styled
+
+
+def _uncovered(required: List[str], styled: List[str]) -> List[str]:
+    present = {char_class(c) for kw in styled for c in kw}
+    return [r for r in required if r not in present]
+
+
+def _place_required(filler: list, styled: List[str], policy: PasswordPolicy, rng: random.Random):
+    """
+    Puts each missing required class into the filler (keywords stay intact).
+    Only slots whose class is optional or occurs more than once are
+    overwritten, so no required class is ever removed again.
+    """
+    counts = Counter(char_class(c) for c in filler)
+    counts.update(char_class(c) for kw in styled for c in kw)
+    for cls in policy.required:
+        if counts[cls]:
+            continue
+        free = [i for i, c in enumerate(filler)
+                if char_class(c) not in policy.required or counts[char_class(c)] > 1]
+        slot = rng.choice(free)         # non-empty: filler ≥ classes the keywords miss
+        counts[char_class(filler[slot])] -= 1
+        filler[slot] = rng.choice(policy.alphabets[cls])
+        counts[cls] += 1
+
+
+def build_policy_candidates(base_passwords: List[str], keywords: List[str],
+                            policy: PasswordPolicy, rng: random.Random = None):
+    """
+    Builds one policy-valid candidate per base string.
+    Returns (accepted_passwords, stats).
+    """
+    rng = rng or random.Random()
+    n = len(base_passwords)
+    np_rng = np.random.default_rng(rng.getrandbits(32))
+
+    # One draw per batch for lengths and keyword placements
+    lengths = np_rng.integers(policy.min_length, policy.max_length + 1, size=n)
+    placements = np_rng.random(size=(n, max(len(keywords), 1)))
+
+    accepted = []
+    for i, base in enumerate(base_passwords):
+        length = int(lengths[i])
+        budget = int(policy.max_keyword_share * length)
+        styled = _fit_keywords([_style_keyword(kw, rng, policy.banned) for kw in keywords], budget)
+
+        # Filler must have room for every required class the keywords don't cover
+        needed = _uncovered(policy.required, styled)
+        while len(needed) > length - sum(len(kw) for kw in styled):
+            styled = _fit_keywords(styled, sum(len(kw) for kw in styled) - 1)
+            needed = _uncovered(policy.required, styled)
+        kw_chars = sum(len(kw) for kw in styled)
+
+        # Filler from the GRU base string, topped up from the allowed alphabet
+        filler_len = length - kw_chars
+        filler = [c for c in base if c not in policy.banned][:filler_len]
+        while len(filler) < filler_len:
+            filler.append(rng.choice(policy.filler_alphabet))
+        _place_required(filler, styled, policy, rng)
+
+        # Insert keywords at start / mid / end of the filler
+        pwd = "".join(filler)
+        for j, kw in enumerate(styled):
+            pos = int(placements[i, j] * (len(pwd) + 1))
+            pwd = pwd[:pos] + kw + pwd[pos:]
+
+        if policy.check(pwd, kw_chars):
+            accepted.append(pwd)
+
+    stats = {
+        "built": n,
+        "accepted": len(accepted),
+        "acceptance_rate": round(len(accepted) / n, 4) if n else None,
+    }
+    return accepted, stats
@@ -0,0 +1,138 @@
+"""
+============================================================
+🔐 KeyCrypt — Password Reuse Detector API
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ Sub-app mounted at /reuse by main.py
+✅ Near-duplicate detection across a user's vault entries
+   (MinHash / LSH over keyed n-gram sketches, see
+   server/reuse_index.py) — passwords are sketched in memory
+   and discarded, only sketches are stored
+✅ PUT    /{user_id}/entries/{entry_id}  add / replace an entry
+✅ DELETE /{user_id}/entries/{entry_id}  forget an entry
+✅ POST   /{user_id}/check               "is this new password
+                                         a variation of one I have?"
+✅ POST   /{user_id}/audit               bulk (re)index + report
+✅ GET    /{user_id}/audit               report from stored sketches
+============================================================
+"""
+
+from typing import List
+from fastapi import FastAPI, HTTPException, Path, Query, Body
+from pydantic import BaseModel, Field
+from server.reuse_index import reuse_indexes, save_sketches, delete_sketch, DEFAULT_THRESHOLD
+from server.tracing import traced
+
+app = FastAPI(
+    title="KeyCrypt — Password Reuse Detector API",
+    description="Finds vault entries that are small variations of each other",
+    version="1.0.0",
+)
+
+
+class PasswordIn(BaseModel):
+    password: str = Field(..., min_length=1, max_length=512)
+
+
+class EntryIn(BaseModel):
+    entry_id: str = Field(..., min_length=1, max_length=256)
+    password: str = Field(..., min_length=1, max_length=512)
+
+
+class AuditIn(BaseModel):
+    entries: List[EntryIn] = Field(default_factory=list, max_length=50000)
+    replace: bool = Field(default=False, description="Drop stored entries that are not in this list")
+
+
+def threshold_param():
+    return Query(default=DEFAULT_THRESHOLD, ge=0.1, le=1.0, description="Minimum estimated similarity")
+
+
+# ============================================================
+# 🔹 Incremental Updates
+# ============================================================
+@app.put("/{user_id}/entries/{entry_id}")
+def put_entry(
+    user_id: str = Path(..., description="Firebase user ID"),
+    entry_id: str = Path(..., description="Vault entry ID"),
+    body: PasswordIn = Body(...),
+    threshold: float = threshold_param(),
+):
+    """Stores the entry's sketch and returns the entries it nearly duplicates."""
+    try:
+        index = reuse_indexes.get(user_id)
+        record = index.add(entry_id, body.password)
+        save_sketches(user_id, {entry_id: record})
+        return {"user_id": user_id, "entry_id": entry_id, **index.query_entry(entry_id, threshold)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reuse update failed: {str(e)}")
+
+
+@app.delete("/{user_id}/entries/{entry_id}")
+def remove_entry(user_id: str = Path(...), entry_id: str = Path(...)):
+    try:
+        removed = reuse_indexes.get(user_id).remove(entry_id)
+        delete_sketch(user_id, entry_id)
+        return {"user_id": user_id, "entry_id": entry_id, "removed": removed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reuse delete failed: {str(e)}")
+
+
+@app.post("/{user_id}/check")
+def check_password(
+    user_id: str = Path(..., description="Firebase user ID"),
+    body: PasswordIn = Body(...),
+    threshold: float = threshold_param(),
+):
+    """Near-duplicates of a candidate password, without storing anything."""
+    try:
+        return {"user_id": user_id, **reuse_indexes.get(user_id).query(body.password, threshold)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reuse check failed: {str(e)}")
+
+
+# ============================================================
+# 🔹 Batch Audit
+# ============================================================
+@traced()
+def audit_vault(user_id: str, entries: List[EntryIn], replace: bool, threshold: float) -> dict:
+    index = reuse_indexes.get(user_id)
+    records = {entry.entry_id: index.add(entry.entry_id, entry.password) for entry in entries}
+    if records:
+        save_sketches(user_id, records)
+
+    removed = 0
+    if replace:
+        for entry_id in index.entry_ids():
+            if entry_id not in records:
+                index.remove(entry_id)
+                delete_sketch(user_id, entry_id)
+                removed += 1
+
+    return {**index.audit(threshold), "indexed": len(records), "removed": removed}
+
+
+@app.post("/{user_id}/audit")
+def audit_with_entries(
+    user_id: str = Path(..., description="Firebase user ID"),
+    body: AuditIn = Body(...),
+    threshold: float = threshold_param(),
+):
+    """Sketches + stores every given entry, then reports near-duplicate groups for the whole vault."""
+    try:
+        return audit_vault(user_id, body.entries, body.replace, threshold)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reuse audit failed: {str(e)}")
+
+
+@app.get("/{user_id}/audit")
+def audit_stored(user_id: str = Path(...), threshold: float = threshold_param()):
+    try:
+        return reuse_indexes.get(user_id).audit(threshold)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reuse audit failed: {str(e)}")
+
+
+@app.get("/cache-stats")
+def reuse_cache_stats():
+    return reuse_indexes.stats()
@@ -5,44 +5,216 @@ Author: Shubham Patel (NIT Raipur)
 ============================================================
 ✅ Modular version — No duplicate CORS or FastAPI setup
 ✅ Only defines sub-routes, to be mounted in main.py
+✅ LRU prediction cache keyed by model version + feature vector
+✅ WebSocket /ws/{user_id} — live typing stream, superseded inputs
+   dropped, latest result pushed; model pinned per connection, a
+   "model" message announces a mid-session swap
+✅ Stale-while-revalidate personalized models: answers at once with
+   the cached (or base) model, newer model swapped in the background;
+   every response carries model_version
+✅ Breach check: "breachHash" (hex SHA-1, computed client-side) or a
+   precomputed "breached" feature → "breached" in every response
+✅ Optional "password" field → "breached" + weak-pattern features
+   computed server-side (same values the training data carries);
+   the plaintext is dropped before caching / inference
 ============================================================
 """
 
+import json
+import asyncio
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Path, Body
-from server.firebase_model import load_strength_model_for_user
+from fastapi import FastAPI, HTTPException, Path, Body, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from server.firebase_model import load_base_strength_model, user_model_cache
+from server.prediction_cache import prediction_cache, feature_vector, vector_digest
+from server.metrics import stage
+from server.breach_index import get_breach_index, resolve_breach_feature
+from server.pattern_features import get_detector, resolve_pattern_features
 
 # Define sub-app only (no global CORS here)
 app = FastAPI(title="KeyCrypt Strength Predictor API")
 
+
+def warmup():
+    """Explicit warm-up hook used by main.py (base model + breach index + pattern automata)."""
+    load_base_strength_model()
+    get_breach_index()
+    get_detector()
+
+
+def predict_with_model(model_data: dict, model_type: str, user_id: str, features: dict) -> dict:
+    """Runs (or serves from cache) one prediction with an already-resolved model."""
+    model = model_data["model"]
+    scaler = model_data["scaler"]
+    features_list = model_data["features"]
+
+    # Cache lookup: personalized models per user, base model shared
+    model_key = user_id if model_type == "user" else "base"
+    version = model_data.get("version")
+    with stage("featurize"):
+        features, breached = resolve_breach_feature(features)
+        features = resolve_pattern_features(features)
+        vector = feature_vector(features, features_list)
+    digest = vector_digest(vector) if vector is not None else None
+    cached = prediction_cache.get(model_key, version, digest) if digest is not None else None
+    if cached is not None:
+        return {"user_id": user_id, **cached, "breached": breached, "model_used": model_type,
+                "model_version": version, "cache_hit": True}
+
+    with stage("frame"):
+        df = pd.DataFrame([features]).reindex(columns=features_list, fill_value=0)
+    with stage("scale"):
+        scaled = scaler.transform(df)
+    with stage("predict"):
+        prob = model.predict_proba(scaled)[0]
+    # Same as model.predict(), without a second pass over the forest
+    pred = int(model.classes_[np.argmax(prob)])
+
+    label_map = {0: "Weak", 1: "Medium", 2: "Strong"}
+    result = {
+        "predicted_label": label_map.get(pred, "Unknown"),
+        "confidence": {
+            "weak": round(float(prob[0]), 3),
+            "medium": round(float(prob[1]), 3),
+            "strong": round(float(prob[2]), 3)
+        },
+    }
+    if digest is not None:
+        prediction_cache.put(model_key, version, digest, result)
+    return {"user_id": user_id, **result, "breached": breached, "model_used": model_type,
+            "model_version": version, "cache_hit": False}
+
+
 @app.post("/predict-strength/{user_id}")
 def predict_strength(
     user_id: str = Path(..., description="Firebase user ID"),
     features: dict = Body(..., description="Password feature dictionary from frontend")
 ):
-    """Predict password strength for given user."""
+    """
+    Predict password strength for given user.
+    Optional "breachHash" (hex SHA-1 of the password) is checked against
+    the breach index and fed to the model as the "breached" feature.
+    Optional "password" → breach + weak-pattern features computed here.
+    Never waits on storage: a cold / just-retrained user is answered with
+    the base (or previous) model while the new one loads in the background.
+    """
     try:
-        model_data, model_type = load_strength_model_for_user(user_id)
-        model = model_data["model"]
-        scaler = model_data["scaler"]
-        features_list = model_data["features"]
+        model_data, model_type = user_model_cache.resolve(user_id)
+        return predict_with_model(model_data, model_type, user_id, features)
 
-        df = pd.DataFrame([features]).reindex(columns=features_list, fill_value=0)
-        scaled = scaler.transform(df)
-        pred = int(model.predict(scaled)[0])
-        prob = model.predict_proba(scaled)[0]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-        label_map = {0: "Weak", 1: "Medium", 2: "Strong"}
-        return {
-            "user_id": user_id,
-            "predicted_label": label_map.get(pred, "Unknown"),
-            "confidence": {
-                "weak": round(float(prob[0]), 3),
-                "medium": round(float(prob[1]), 3),
-                "strong": round(float(prob[2]), 3)
-            },
-            "model_used": model_type
-        }
 
+# ============================================================
+# 🔌 WebSocket — Live Typing Strength Stream
+# ============================================================
+@app.websocket("/ws/{user_id}")
+async def live_strength(websocket: WebSocket, user_id: str):
+    """
+    The connection is pinned to one model: every result comes from the
+    model announced in "ready" (or in the latest "model" message). When the
+    serving cache swaps in a newer model mid-session (background load /
+    retrain), the pin moves before the next evaluation and a
+    {"type": "model", ...} message announces it ahead of that result.
+    Client sends {"seq": n, "features": {...}} (or a bare feature dict) per
+    keystroke; only the latest input is evaluated, and a result is pushed
+    only if no newer input arrived while it was being computed.
+    """
+    await websocket.accept()
+    try:
+        model_data, model_type = await run_in_threadpool(user_model_cache.resolve, user_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+        await websocket.send_json({"type": "error", "detail": f"Model load failed: {str(e)}"})
+        await websocket.close(code=1011)
+        return
+
+    await websocket.send_json({
+        "type": "ready",
+        "user_id": user_id,
+        "model_used": model_type,
+        "model_version": model_data.get("version"),
+    })
+
+    state = {"latest": None, "seq": 0, "dropped": 0, "evaluated": 0, "model": (model_data, model_type)}
+
+    def repin():
+        """Moves the pin if the serving cache now has a different model version (None if unchanged)."""
+        current, current_type = user_model_cache.resolve(user_id)
+        pinned, pinned_type = state["model"]
+        if (current.get("version"), current_type) == (pinned.get("version"), pinned_type):
+            return None
+        state["model"] = (current, current_type)
+        return {"type": "model", "user_id": user_id, "model_used": current_type,
+                "model_version": current.get("version")}
+
+    def predict_latest(features):
+        pinned, pinned_type = state["model"]
+        return predict_with_model(pinned, pinned_type, user_id, features)
+    pending = asyncio.Event()
+
+    async def evaluator():
+        while True:
+            await pending.wait()
+            pending.clear()
+            seq, features = state["latest"]
+            try:
+                announcement = await run_in_threadpool(repin)
+                if announcement is not None:
+                    await websocket.send_json(announcement)
+                result = await run_in_threadpool(predict_latest, features)
+            except Exception as e:
+                await websocket.send_json({"type": "error", "seq": seq, "detail": f"Prediction failed: {str(e)}"})
+                continue
+            state["evaluated"] += 1
+
+            if state["latest"][0] != seq:
+                # Superseded while computing → skip, evaluate the newer input
+                state["dropped"] += 1
+                continue
+            await websocket.send_json({"type": "result", "seq": seq, **result, "dropped": state["dropped"]})
+
+    task = asyncio.create_task(evaluator())
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Expected a JSON object"})
+                continue
+
+            features = message.get("features", message)
+            seq = message.get("seq", state["seq"] + 1)
+            if pending.is_set():
+                # Previous input never started evaluating → superseded
+                state["dropped"] += 1
+            state["seq"] = seq
+            state["latest"] = (seq, features)
+            pending.set()
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        task.cancel()
+
+
+@app.get("/cache-stats")
+def cache_stats():
+    """Prediction cache hit ratio, size and approximate memory usage."""
+    return prediction_cache.stats()
+
+
+@app.get("/model-cache-stats")
+def model_cache_stats():
+    """Personalized model cache: users cached, base fallbacks, stale serves, loads."""
+    return user_model_cache.stats()
+
+
+@app.get("/breach-index-stats")
+def breach_index_stats():
+    """Breach index size, bit width, expected false-positive rate and lookup counts."""
+    index = get_breach_index()
+    return index.stats() if index is not None else {"enabled": False}
@@ -0,0 +1,157 @@
+"""
+============================================================
+🔐 KeyCrypt — Breach Index Builder (offline)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ Streams any number of breach lists, any size:
+     plain → one password per line (rockyou-style)
+     sha1  → "SHA1HEX[:count]" per line (HIBP downloads)
+✅ Fingerprint = first 64 (or 32) bits of SHA-1
+✅ Out-of-core sort: fingerprints partitioned by their top bits
+   into on-disk runs, each run sorted + deduplicated in memory
+   and appended → one globally sorted array
+✅ Output: breach_index.npy (memory-mapped by server/breach_index.py)
+          breach_index.json (entries, bits, sources, timings)
+
+Usage (from Engine/):
+    python -m scriptsss.build_breach_index rockyou.txt --output ./data/breach_index.npy
+    python -m scriptsss.build_breach_index pwned-passwords-sha1.txt --format sha1 --bits 64
+Serve with:
+    KEYCRYPT_BREACH_INDEX=./data/breach_index.npy python main.py
+============================================================
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import numpy as np
+
+from server.breach_index import FINGERPRINT_DTYPES, fingerprint_from_digest
+
+
+# ============================================================
+# 🔹 Streaming Fingerprints
+# ============================================================
+def iter_fingerprint_chunks(path: str, fmt: str, bits: int, chunk_lines: int = 1_000_000):
+    """Yields uint arrays of fingerprints, `chunk_lines` input lines at a time."""
+    dtype = FINGERPRINT_DTYPES[bits]
+    buf = []
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.rstrip(b"\r\n")
+            if not line:
+                continue
+            if fmt == "sha1":
+                try:
+                    digest = bytes.fromhex(line.split(b":", 1)[0][:16].decode("ascii"))
+                except ValueError:
+                    continue
+            else:
+                # Bytes as stored in the list; lists are mostly UTF-8 already
+                password = line.decode("utf-8", errors="surrogateescape")
+                digest = hashlib.sha1(password.encode("utf-8", errors="surrogateescape")).digest()
+            buf.append(fingerprint_from_digest(digest, bits))
+            if len(buf) >= chunk_lines:
+                yield np.array(buf, dtype=dtype)
+                buf = []
+    if buf:
+        yield np.array(buf, dtype=dtype)
+
+
+# ============================================================
+# 🔹 Build (partition → sort runs → concatenate)
+# ============================================================
+def build_index(inputs, output: str, fmt: str = "plain", bits: int = 64, partition_bits: int = 6,
+                tmp_dir: str = None) -> dict:
+    if bits not in FINGERPRINT_DTYPES:
+        raise ValueError("❌ bits must be 32 or 64")
+    dtype = FINGERPRINT_DTYPES[bits]
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_dir = tmp_dir or output + ".parts"
+    os.makedirs(tmp_dir, exist_ok=True)
+    n_parts = 1 << partition_bits
+    shift = dtype(bits - partition_bits)
+    started = time.perf_counter()
+
+    print(f"🔀 Partitioning fingerprints into {n_parts} runs...")
+    lines = 0
+    files = [open(os.path.join(tmp_dir, f"run-{p:04d}.bin"), "wb") for p in range(n_parts)]
+    try:
+        for path in inputs:
+            for chunk in iter_fingerprint_chunks(path, fmt, bits):
+                lines += len(chunk)
+                # Top bits pick the run → run p only holds values below run p+1
+                part = (chunk >> shift).astype(np.int64)
+                order = np.argsort(part, kind="stable")
+                chunk, part = chunk[order], part[order]
+                bounds = np.searchsorted(part, np.arange(n_parts + 1))
+                for p in range(n_parts):
+                    if bounds[p] < bounds[p + 1]:
+                        chunk[bounds[p]:bounds[p + 1]].tofile(files[p])
+            print(f"   📥 {path} → {lines} lines so far")
+    finally:
+        for f in files:
+            f.close()
+    partition_s = time.perf_counter() - started
+
+    print("🧮 Sorting + deduplicating runs...")
+    t0 = time.perf_counter()
+    counts = []
+    for p in range(n_parts):
+        run_path = os.path.join(tmp_dir, f"run-{p:04d}.bin")
+        run = np.unique(np.fromfile(run_path, dtype=dtype))       # sorted + deduplicated
+        run.tofile(run_path)
+        counts.append(len(run))
+
+    total = sum(counts)
+    index = np.lib.format.open_memmap(output + ".tmp.npy", mode="w+", dtype=dtype, shape=(total,))
+    offset = 0
+    for p, count in enumerate(counts):
+        run_path = os.path.join(tmp_dir, f"run-{p:04d}.bin")
+        if count:
+            index[offset:offset + count] = np.fromfile(run_path, dtype=dtype)
+            offset += count
+        os.remove(run_path)
+    index.flush()
+    del index
+    os.replace(output + ".tmp.npy", output)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    sort_s = time.perf_counter() - t0
+
+    meta = {
+        "entries": total,
+        "input_lines": lines,
+        "bits": bits,
+        "hash": f"sha1[:{bits // 8}]",
+        "format": fmt,
+        "source": [os.path.basename(p) for p in inputs],
+        "bytes": os.path.getsize(output),
+        "expected_fpr": total / float(2 ** bits),
+        "timings_s": {"partition": round(partition_s, 2), "sort": round(sort_s, 2),
+                      "total": round(time.perf_counter() - started, 2)},
+    }
+    with open(os.path.splitext(output)[0] + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile breach lists into a memory-mapped fingerprint index")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("--output", default="breach_index.npy")
+    parser.add_argument("--format", choices=("plain", "sha1"), default="plain")
+    parser.add_argument("--bits", type=int, choices=(32, 64), default=64,
+                        help="Fingerprint size: 64 = ~no false positives, 32 = half the size")
+    parser.add_argument("--partition-bits", type=int, default=6,
+                        help="2^N on-disk runs; each run must fit in memory while sorting")
+    parser.add_argument("--tmp-dir", default=None)
+    args = parser.parse_args()
+
+    result = build_index(args.inputs, args.output, args.format, args.bits, args.partition_bits, args.tmp_dir)
+    print(f"✅ {result['input_lines']} lines → {result['entries']} unique fingerprints "
+          f"({result['bytes'] / 1e6:.1f} MB, expected FPR {result['expected_fpr']:.2e}) "
+          f"in {result['timings_s']['total']}s")
+    print(f"💾 {args.output}")
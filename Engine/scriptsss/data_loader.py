@@ -8,10 +8,17 @@ Project: KeyCrypt - Smart Password Manager with AI Insights
 This script:
 ✅ Loads Kaggle Password Strength Classifier Dataset
 ✅ Extracts ML-ready features from each password (JS equivalent)
+✅ "breached" feature from the breach index (server/breach_index.py)
+✅ Weak-pattern features — dictionary words (de-leeted), keyboard
+   walks, dates (server/pattern_features.py)
 ✅ Keeps labels: 0 (Weak), 1 (Medium), 2 (Strong)
 ✅ Skips malformed CSV lines safely
 ✅ Logs skipped rows (if any) for reference
 ✅ Outputs kaggle_password_features.csv for model training
+
+Usage (from Engine/, so the server.* imports resolve; data.csv is
+searched for under the current directory):
+    python -m scriptsss.data_loader
 """
 
 import os
@@ -19,6 +26,8 @@ import math
 import pandas as pd
 from collections import Counter
 from tqdm import tqdm
+from server.breach_index import breach_feature
+from server.pattern_features import pattern_features
 
 
 # ============================================================
@@ -109,9 +118,11 @@ def extract_password_features(password: str, user_data: dict = None, dims: int =
         "transitionDiversity": transition_diversity,
         "similarityToUser": similarity_to_user,
         "charClassCount": char_class_count,
+        "breached": breach_feature(password),  # 0 unless KEYCRYPT_BREACH_INDEX is set
         "label": -1
     }
     features.update(hashed_vector)
+    features.update(pattern_features(password))
     return features
 
 
@@ -0,0 +1,263 @@
+"""
+============================================================
+🔐 KeyCrypt — Deduplicating Dataset Merger (out-of-core)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ Streams any number of labelled password files in chunks
+   (CSV / TSV; header names auto-detected or given)
+✅ Normalizes every input to password,strength (0 / 1 / 2,
+   "weak" / "medium" / "strong" also accepted)
+✅ Exact dedup without holding the corpus in RAM:
+     pass 1 → rows hash-partitioned into N files on disk
+     pass 2 → one partition at a time deduplicated in memory
+✅ Conflicting labels resolved by --on-conflict:
+     max | min | first | majority (ties → lower label) | drop
+✅ Sharded output (merged-00000.csv, ...) that
+   data_loader.load_and_extract() reads as-is
+✅ Row counts + per-phase timings → merge_report.json
+
+Usage (from Engine/):
+    python -m scriptsss.data_merger data.csv rockyou_labelled.tsv=0 \\
+        --output-dir ./merged --on-conflict majority
+============================================================
+"""
+
+import os
+import csv
+import json
+import time
+import shutil
+import argparse
+import pandas as pd
+
+PASSWORD_COLUMNS = ("password", "pass", "pwd", "passwd", "plaintext", "text")
+STRENGTH_COLUMNS = ("strength", "label", "class", "score", "target")
+LABEL_NAMES = {"weak": 0, "medium": 1, "strong": 2}
+CONFLICT_RULES = ("max", "min", "first", "majority", "drop")
+
+
+# ============================================================
+# 🔹 Input Spec + Schema Normalization
+# ============================================================
+def parse_input(spec: str) -> dict:
+    """'path' or 'path=LABEL' (LABEL overrides / supplies the strength column)."""
+    path, _, label = spec.partition("=") if not os.path.exists(spec) else (spec, "", "")
+    return {"path": path, "label": int(label) if label else None}
+
+
+def read_chunks(path: str, chunksize: int):
+    sep = "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+    return pd.read_csv(path, sep=sep, chunksize=chunksize, dtype=str, keep_default_na=False,
+                       on_bad_lines="skip", encoding_errors="replace", engine="python" if sep == "\t" else "c")
+
+
+def pick_column(columns, candidates, what: str, path: str, required: bool = True):
+    lowered = {str(c).strip().lower(): c for c in columns}
+    for name in candidates:
+        if name in lowered:
+            return lowered[name]
+    if required:
+        raise ValueError(f"❌ {path}: no {what} column (looked for {', '.join(candidates)}; got {list(columns)})")
+    return None
+
+
+def normalize_labels(values: pd.Series) -> pd.Series:
+    text = values.astype(str).str.strip().str.lower()
+    named = text.map(LABEL_NAMES)
+    numeric = pd.to_numeric(text, errors="coerce")
+    labels = named.fillna(numeric)
+    return labels.where(labels.isin([0, 1, 2]))
+
+
+def normalize_chunk(chunk: pd.DataFrame, source: dict, password_col, strength_col) -> pd.DataFrame:
+    passwords = chunk[password_col].astype(str)
+    if source["label"] is not None:
+        labels = pd.Series(source["label"], index=chunk.index, dtype="float64")
+    else:
+        labels = normalize_labels(chunk[strength_col])
+    out = pd.DataFrame({"password": passwords, "strength": labels})
+    return out[(out["password"] != "") & out["strength"].notna()].astype({"strength": "int8"})
+
+
+# ============================================================
+# 🔹 Pass 1 — Hash Partitioning
+# ============================================================
+def partition_inputs(sources, tmp_dir: str, partitions: int, chunksize: int) -> dict:
+    os.makedirs(tmp_dir, exist_ok=True)
+    files = [open(os.path.join(tmp_dir, f"part-{p:04d}.csv"), "w", newline="", encoding="utf-8")
+             for p in range(partitions)]
+    writers = [csv.writer(f) for f in files]
+    per_input, order = [], 0
+
+    try:
+        for source_idx, source in enumerate(sources):
+            start = time.perf_counter()
+            read = kept = 0
+            password_col = strength_col = None
+            for chunk in read_chunks(source["path"], chunksize):
+                if password_col is None:
+                    password_col = pick_column(chunk.columns, PASSWORD_COLUMNS, "password", source["path"])
+                    strength_col = pick_column(chunk.columns, STRENGTH_COLUMNS, "strength", source["path"],
+                                               required=source["label"] is None)
+                read += len(chunk)
+                rows = normalize_chunk(chunk, source, password_col, strength_col)
+                kept += len(rows)
+
+                # Same password → same 64-bit hash → same partition, whatever file it came from
+                hashes = pd.util.hash_pandas_object(rows["password"], index=False).to_numpy()
+                for part, password, strength in zip(hashes % partitions, rows["password"], rows["strength"]):
+                    writers[part].writerow((password, strength, order))
+                    order += 1
+
+            per_input.append({"path": source["path"], "source": source_idx, "rows_read": read,
+                              "rows_valid": kept, "rows_invalid": read - kept,
+                              "seconds": round(time.perf_counter() - start, 2)})
+            print(f"   📥 {source['path']}: {read} rows → {kept} valid")
+    finally:
+        for f in files:
+            f.close()
+    return {"inputs": per_input, "rows": order}
+
+
+# ============================================================
+# 🔹 Pass 2 — Per-partition Dedup + Conflict Rule
+# ============================================================
+def resolve(group: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """group = all rows of one partition, sorted by arrival order."""
+    grouped = group.groupby("password", sort=False)["strength"]
+    if rule == "max":
+        labels = grouped.max()
+    elif rule == "min":
+        labels = grouped.min()
+    elif rule == "first":
+        labels = grouped.first()
+    elif rule == "majority":
+        counts = group.groupby(["password", "strength"], sort=False).size().rename("n").reset_index()
+        # Most votes first, then the lower (more conservative) label on ties
+        counts = counts.sort_values(["password", "n", "strength"], ascending=[True, False, True])
+        labels = counts.drop_duplicates("password").set_index("password")["strength"]
+    elif rule == "drop":
+        labels = grouped.first()[grouped.nunique() == 1]
+    else:
+        raise ValueError(f"❌ Unknown conflict rule '{rule}' (use {', '.join(CONFLICT_RULES)})")
+    return labels.rename("strength").reset_index()
+
+
+class ShardWriter:
+    """Rolls over to a new password,strength CSV every `shard_rows` rows."""
+
+    def __init__(self, output_dir: str, shard_rows: int, prefix: str = "merged"):
+        self.output_dir = output_dir
+        self.shard_rows = shard_rows
+        self.prefix = prefix
+        self.shards = []
+        self._file = self._writer = None
+        self._rows = 0
+
+    def _open(self):
+        path = os.path.join(self.output_dir, f"{self.prefix}-{len(self.shards):05d}.csv")
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["password", "strength"])
+        self.shards.append({"path": path, "rows": 0})
+        self._rows = 0
+
+    def write(self, rows: pd.DataFrame):
+        for password, strength in zip(rows["password"], rows["strength"]):
+            if self._file is None or self._rows >= self.shard_rows:
+                self.close()
+                self._open()
+            self._writer.writerow((password, int(strength)))
+            self._rows += 1
+            self.shards[-1]["rows"] += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def dedupe_partitions(tmp_dir: str, partitions: int, rule: str, shards: ShardWriter) -> dict:
+    unique = conflicts = dropped = 0
+    for p in range(partitions):
+        path = os.path.join(tmp_dir, f"part-{p:04d}.csv")
+        if os.path.getsize(path) == 0:
+            continue
+        rows = pd.read_csv(path, header=None, names=["password", "strength", "order"], dtype={"password": str},
+                           keep_default_na=False, encoding="utf-8").sort_values("order", kind="stable")
+        labels_per_password = rows.groupby("password", sort=False)["strength"].nunique()
+        conflicts += int((labels_per_password > 1).sum())
+
+        merged = resolve(rows, rule)
+        dropped += len(labels_per_password) - len(merged)
+        unique += len(merged)
+        shards.write(merged)
+        os.remove(path)
+    return {"unique": unique, "conflicting_passwords": conflicts, "dropped_conflicts": dropped}
+
+
+# ============================================================
+# 🔹 Merge
+# ============================================================
+def merge(inputs, output_dir: str, rule: str = "max", partitions: int = 64, shard_rows: int = 1_000_000,
+          chunksize: int = 200_000, tmp_dir: str = None) -> dict:
+    if rule not in CONFLICT_RULES:
+        raise ValueError(f"❌ Unknown conflict rule '{rule}' (use {', '.join(CONFLICT_RULES)})")
+    sources = [parse_input(spec) if isinstance(spec, str) else spec for spec in inputs]
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_dir = tmp_dir or os.path.join(output_dir, "_partitions")
+    started = time.perf_counter()
+
+    print(f"🔀 Pass 1 — partitioning {len(sources)} input(s) into {partitions} buckets...")
+    t0 = time.perf_counter()
+    pass1 = partition_inputs(sources, tmp_dir, partitions, chunksize)
+    partition_s = time.perf_counter() - t0
+
+    print(f"🧹 Pass 2 — deduplicating (on conflict: {rule})...")
+    t0 = time.perf_counter()
+    shards = ShardWriter(output_dir, shard_rows)
+    try:
+        pass2 = dedupe_partitions(tmp_dir, partitions, rule, shards)
+    finally:
+        shards.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    dedupe_s = time.perf_counter() - t0
+
+    valid = sum(i["rows_valid"] for i in pass1["inputs"])
+    report = {
+        "inputs": pass1["inputs"],
+        "rows_read": sum(i["rows_read"] for i in pass1["inputs"]),
+        "rows_valid": valid,
+        "rows_unique": pass2["unique"],
+        "duplicates_removed": valid - pass2["unique"] - pass2["dropped_conflicts"],
+        "conflicting_passwords": pass2["conflicting_passwords"],
+        "dropped_conflicts": pass2["dropped_conflicts"],
+        "conflict_rule": rule,
+        "partitions": partitions,
+        "shards": shards.shards,
+        "timings_s": {"partition": round(partition_s, 2), "dedupe": round(dedupe_s, 2),
+                      "total": round(time.perf_counter() - started, 2)},
+    }
+    with open(os.path.join(output_dir, "merge_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge + deduplicate labelled password datasets")
+    parser.add_argument("inputs", nargs="+", help="CSV/TSV files; 'path=LABEL' to force one label per file")
+    parser.add_argument("--output-dir", default="merged")
+    parser.add_argument("--on-conflict", default="max", choices=CONFLICT_RULES)
+    parser.add_argument("--partitions", type=int, default=64,
+                        help="On-disk hash buckets; each must fit in memory during pass 2")
+    parser.add_argument("--shard-rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--tmp-dir", default=None)
+    args = parser.parse_args()
+
+    result = merge(args.inputs, args.output_dir, args.on_conflict, args.partitions, args.shard_rows,
+                   args.chunksize, args.tmp_dir)
+    print(f"✅ {result['rows_read']} rows read → {result['rows_valid']} valid → {result['rows_unique']} unique "
+          f"({result['duplicates_removed']} duplicates, {result['conflicting_passwords']} label conflicts)")
+    print(f"⏱️  partition {result['timings_s']['partition']}s, dedupe {result['timings_s']['dedupe']}s")
+    print(f"💾 {len(result['shards'])} shard(s) + merge_report.json → {args.output_dir}")
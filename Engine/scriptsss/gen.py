@@ -19,7 +19,7 @@ import os
 # 🧠 Load Model and Vocabulary
 # ==========================================================
 def load_model_and_vocab(model_path=r"D:\CSE\Project\KeyCrpyt\engine\scripts\gru_base_rnn.h5",
-                         vocab_path=r"D:\CSE\Project\KeyCrpyt\engine\scripts\Vocab.json"):
+                         vocab_path=r"D:\CSE\Project\KeyCrpyt\engine\scripts\vocab.json"):
     """Load trained GRU model and vocabulary."""
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"❌ Model not found: {model_path}")
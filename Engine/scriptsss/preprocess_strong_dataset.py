@@ -0,0 +1,127 @@
+"""
+============================================================
+🔐 KeyCrypt — Strong Password Preprocessor (streaming)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ One pass over an arbitrarily large password,strength CSV,
+   read in chunks (memory = one chunk + the vocabulary)
+✅ Keeps strong passwords only (strength == 2 by default)
+✅ Builds the character vocabulary on the way → vocab.json
+   (ids 1..N in sorted char order, 0 stays the padding id)
+✅ Writes what train.py / gen.py expect:
+     vocab.json
+     kaggle_strong_passwords.csv      (filtered, human-readable)
+     strong_corpus.tokens.u16 / .offsets.i64 / .json
+                                      (integer-encoded, memory-mapped
+                                       by training — no text re-parsing)
+
+Usage (from Engine/):
+    python -m scriptsss.preprocess_strong_dataset data.csv --output-dir ./data
+============================================================
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from scriptsss.sequence_dataset import CorpusWriter, corpus_paths, TOKEN_DTYPE
+
+
+# ============================================================
+# 🔹 Vocabulary Remap (binary pass, no text)
+# ============================================================
+def remap_tokens(tokens_path: str, first_seen: dict, chunk: int = 1 << 22) -> dict:
+    """
+    Ids were handed out in first-seen order while streaming; rewrite them in
+    place so the vocabulary is sorted and independent of input row order.
+    """
+    vocab = {ch: i + 1 for i, ch in enumerate(sorted(first_seen))}
+    table = np.zeros(len(first_seen) + 1, dtype=TOKEN_DTYPE)
+    for ch, old in first_seen.items():
+        table[old] = vocab[ch]
+
+    if os.path.getsize(tokens_path):
+        tokens = np.memmap(tokens_path, dtype=TOKEN_DTYPE, mode="r+")
+        for start in range(0, len(tokens), chunk):
+            tokens[start:start + chunk] = table[tokens[start:start + chunk]]
+        tokens.flush()
+        del tokens
+    return vocab
+
+
+# ============================================================
+# 🔹 Single Streaming Pass
+# ============================================================
+def preprocess(input_path: str, output_dir: str, strength: int = 2, chunksize: int = 200_000,
+               corpus_name: str = "strong_corpus") -> dict:
+    os.makedirs(output_dir, exist_ok=True)
+    vocab_path = os.path.join(output_dir, "vocab.json")
+    csv_path = os.path.join(output_dir, "kaggle_strong_passwords.csv")
+    prefix = os.path.join(output_dir, corpus_name)
+
+    start = time.perf_counter()
+    first_seen = {}
+    writer = CorpusWriter(prefix, vocab_path)
+    rows_read = rows_kept = 0
+
+    with open(csv_path + ".tmp", "w", newline="", encoding="utf-8") as out:
+        out_csv = csv.writer(out)
+        out_csv.writerow(["password", "strength"])
+
+        reader = pd.read_csv(input_path, chunksize=chunksize, usecols=["password", "strength"],
+                             dtype={"password": str}, on_bad_lines="skip", encoding_errors="replace")
+        for chunk in reader:
+            rows_read += len(chunk)
+            chunk = chunk.dropna(subset=["password"])
+            strong = chunk.loc[pd.to_numeric(chunk["strength"], errors="coerce") == strength, "password"]
+
+            for password in strong:
+                if not password:
+                    continue
+                ids = [first_seen.setdefault(ch, len(first_seen) + 1) for ch in password]
+                writer.add(ids)
+                out_csv.writerow([password, strength])
+            rows_kept += len(strong)
+
+            if len(first_seen) >= np.iinfo(TOKEN_DTYPE).max:
+                raise ValueError(f"❌ Vocabulary exceeds {np.iinfo(TOKEN_DTYPE).max} chars — not a password corpus?")
+            print(f"   … {rows_read} rows read, {rows_kept} strong, {len(first_seen)} chars")
+
+    os.replace(csv_path + ".tmp", csv_path)
+    meta = writer.close({"source": os.path.abspath(input_path), "strength": strength})
+    vocab = remap_tokens(corpus_paths(prefix)["tokens"], first_seen)
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False, indent=2)
+
+    report = {
+        "rows_read": rows_read,
+        "rows_strong": rows_kept,
+        "sequences": meta["n_sequences"],
+        "tokens": meta["n_tokens"],
+        "max_len": meta["max_len"],
+        "vocab_size": len(vocab) + 1,
+        "seconds": round(time.perf_counter() - start, 2),
+        "vocab": vocab_path,
+        "csv": csv_path,
+        "corpus": prefix,
+    }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build vocab.json + encoded strong-password corpus")
+    parser.add_argument("input", help="CSV with password,strength columns (any size)")
+    parser.add_argument("--output-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--strength", type=int, default=2, help="Label to keep (2 = strong)")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"📂 Preprocessing {args.input} ...")
+    result = preprocess(args.input, args.output_dir, args.strength, args.chunksize)
+    print(f"✅ {result['sequences']} strong passwords / {result['rows_read']} rows, "
+          f"vocab size {result['vocab_size']} in {result['seconds']}s")
+    print(f"💾 {result['vocab']}\n💾 {result['csv']}\n💾 {result['corpus']}.*")
@@ -0,0 +1,231 @@
+"""
+============================================================
+🔐 KeyCrypt — Streaming Sequence Pipeline for GRU Training
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ Compact encoded corpus (written once, memory-mapped):
+     <prefix>.tokens.u16   all passwords' char ids, back to back
+     <prefix>.offsets.i64  start of each password (+ final end)
+     <prefix>.json         counts + vocab path
+✅ Windows built on the fly, one block of passwords at a time:
+     every next-char target gets its previous SEQ_LEN chars,
+     left-padded with 0 when the password is shorter
+     (short passwords now contribute samples too)
+✅ Shuffle = random block order + tf.data shuffle buffer, so
+   peak memory depends on block / buffer size, not corpus size
+✅ tf.data: shuffle → batch (or length buckets) → prefetch(AUTOTUNE)
+============================================================
+"""
+
+import os
+import json
+import numpy as np
+
+TOKEN_DTYPE = np.uint16          # vocab ids (0 = padding)
+OFFSET_DTYPE = np.int64
+
+
+# ============================================================
+# 🔹 Encoded Corpus — Writer / Reader
+# ============================================================
+def corpus_paths(prefix: str) -> dict:
+    return {
+        "tokens": f"{prefix}.tokens.u16",
+        "offsets": f"{prefix}.offsets.i64",
+        "meta": f"{prefix}.json",
+    }
+
+
+class CorpusWriter:
+    """Appends encoded passwords to disk; memory is one buffer, not the corpus."""
+
+    def __init__(self, prefix: str, vocab_path: str = None, flush_tokens: int = 1 << 20):
+        self.prefix = prefix
+        self.paths = corpus_paths(prefix)
+        self.vocab_path = vocab_path
+        self.flush_tokens = flush_tokens
+        os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+        self._tokens = open(self.paths["tokens"] + ".tmp", "wb")
+        self._offsets = open(self.paths["offsets"] + ".tmp", "wb")
+        self._token_buf, self._offset_buf = [], [0]
+        self.n_sequences = 0
+        self.n_tokens = 0
+        self.max_len = 0
+
+    def add(self, ids):
+        self._token_buf.extend(ids)
+        self.n_tokens += len(ids)
+        self.n_sequences += 1
+        self.max_len = max(self.max_len, len(ids))
+        self._offset_buf.append(self.n_tokens)
+        if len(self._token_buf) >= self.flush_tokens:
+            self._flush()
+
+    def _flush(self):
+        np.asarray(self._token_buf, dtype=TOKEN_DTYPE).tofile(self._tokens)
+        np.asarray(self._offset_buf, dtype=OFFSET_DTYPE).tofile(self._offsets)
+        self._token_buf, self._offset_buf = [], []
+
+    def close(self, extra_meta: dict = None) -> dict:
+        self._flush()
+        self._tokens.close()
+        self._offsets.close()
+        os.replace(self.paths["tokens"] + ".tmp", self.paths["tokens"])
+        os.replace(self.paths["offsets"] + ".tmp", self.paths["offsets"])
+        meta = {
+            "format": "keycrypt-corpus",
+            "version": 1,
+            "n_sequences": self.n_sequences,
+            "n_tokens": self.n_tokens,
+            "max_len": self.max_len,
+            "token_dtype": np.dtype(TOKEN_DTYPE).name,
+            "vocab_path": os.path.abspath(self.vocab_path) if self.vocab_path else None,
+            **(extra_meta or {}),
+        }
+        with open(self.paths["meta"], "w") as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+
+def encode_passwords(passwords, char_to_idx: dict, prefix: str, vocab_path: str = None) -> dict:
+    """Streams an iterable of passwords into an encoded corpus (unknown chars → 0 skipped)."""
+    writer = CorpusWriter(prefix, vocab_path)
+    for password in passwords:
+        ids = [char_to_idx[c] for c in str(password) if c in char_to_idx]
+        if ids:
+            writer.add(ids)
+    return writer.close()
+
+
+def load_corpus(prefix: str):
+    """→ (tokens memmap, offsets memmap, meta). Nothing is read into RAM."""
+    paths = corpus_paths(prefix)
+    with open(paths["meta"]) as f:
+        meta = json.load(f)
+    tokens = np.memmap(paths["tokens"], dtype=TOKEN_DTYPE, mode="r") if meta["n_tokens"] else \
+        np.zeros(0, dtype=TOKEN_DTYPE)
+    offsets = np.memmap(paths["offsets"], dtype=OFFSET_DTYPE, mode="r")
+    return tokens, offsets, meta
+
+
+# ============================================================
+# 🔹 Window Construction (NumPy, one block at a time)
+# ============================================================
+def block_windows(tokens, offsets, first: int, last: int, seq_len: int):
+    """
+    All (context, target) pairs for passwords [first, last).
+    Returns X (n, seq_len) int32 left-padded with 0, y (n,) int32 and the
+    unpadded context length of each row (used for length bucketing).
+    """
+    start, end = int(offsets[first]), int(offsets[last])
+    local = np.asarray(tokens[start:end], dtype=np.int32)
+    bounds = np.asarray(offsets[first:last + 1], dtype=np.int64) - start
+    lengths = np.diff(bounds)
+
+    # Targets: every char except each password's first one
+    n_targets = np.maximum(lengths - 1, 0)
+    if n_targets.sum() == 0:
+        empty = np.zeros((0, seq_len), dtype=np.int32)
+        return empty, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    seq_start = np.repeat(bounds[:-1], n_targets)
+    target_pos = seq_start + (np.arange(n_targets.sum()) - np.repeat(np.cumsum(n_targets) - n_targets, n_targets)) + 1
+
+    # Context = the seq_len chars before the target, clipped at the password start
+    idx = target_pos[:, None] + np.arange(-seq_len, 0)[None, :]
+    inside = idx >= seq_start[:, None]
+    X = np.where(inside, local[np.clip(idx, 0, None)], 0).astype(np.int32)
+    y = local[target_pos]
+    context_len = np.minimum(target_pos - seq_start, seq_len).astype(np.int32)
+    return X, y, context_len
+
+
+def iter_blocks(n_sequences: int, block_size: int, shuffle: bool, seed: int = None, ids=None):
+    """(first, last) password ranges; random block order when shuffling."""
+    lo, hi = (0, n_sequences) if ids is None else ids
+    starts = np.arange(lo, hi, block_size)
+    if shuffle:
+        np.random.default_rng(seed).shuffle(starts)
+    for first in starts:
+        yield int(first), int(min(first + block_size, hi))
+
+
+def split_ranges(n_sequences: int, validation_split: float):
+    """Holds out the last share of passwords (whole passwords, no window leakage)."""
+    n_val = int(n_sequences * validation_split)
+    return (0, n_sequences - n_val), (n_sequences - n_val, n_sequences)
+
+
+def count_windows(offsets, ids) -> int:
+    lo, hi = ids
+    lengths = np.diff(np.asarray(offsets[lo:hi + 1], dtype=np.int64))
+    return int(np.maximum(lengths - 1, 0).sum())
+
+
+# ============================================================
+# 🔹 tf.data Pipeline
+# ============================================================
+def bucket_widths(seq_len: int, boundaries=None) -> list:
+    """Window widths per bucket, e.g. boundaries (8, 16) + seq_len 24 → [8, 16, 24]."""
+    return sorted({int(b) for b in (boundaries or ()) if 0 < int(b) < seq_len} | {seq_len})
+
+
+def bucketed_windows(X, y, context_len, widths):
+    """Splits a block by context length and trims the left padding to each bucket's width."""
+    bucket = np.searchsorted(np.asarray(widths), context_len, side="left")
+    for b, width in enumerate(widths):
+        rows = np.nonzero(bucket == b)[0]
+        if len(rows):
+            yield X[rows, -width:], y[rows]
+
+
+def make_dataset(prefix: str, seq_len: int, batch_size: int = 256, ids=None, shuffle: bool = True,
+                 block_size: int = 2048, shuffle_buffer: int = 65536, seed: int = None,
+                 bucket_boundaries=None, skip_batches: int = 0):
+    """
+    Streaming (X, y) batches for model.fit().
+    Each iteration re-reads the memory-mapped corpus in a new block order.
+    bucket_boundaries → batches of similar context length, padded only to
+    their bucket's width instead of seq_len (less GRU work on padding).
+    skip_batches      → resume inside an epoch (same seed = same order).
+    """
+    import tensorflow as tf
+
+    tokens, offsets, meta = load_corpus(prefix)
+    n_sequences = meta["n_sequences"]
+    widths = bucket_widths(seq_len, bucket_boundaries)
+    epoch = {"n": 0}
+
+    def generate():
+        epoch["n"] += 1
+        block_seed = None if seed is None else seed + epoch["n"]
+        for first, last in iter_blocks(n_sequences, block_size, shuffle, block_seed, ids):
+            X, y, context_len = block_windows(tokens, offsets, first, last, seq_len)
+            if not len(y):
+                continue
+            if len(widths) == 1:
+                yield X, y
+            else:
+                yield from bucketed_windows(X, y, context_len, widths)
+
+    dataset = tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None, seq_len if len(widths) == 1 else None), dtype=tf.int32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+        ),
+    ).unbatch()
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    if len(widths) == 1:
+        dataset = dataset.batch(batch_size)
+    else:
+        # Every element of a bucket already has that bucket's width, so no extra padding
+        dataset = dataset.bucket_by_sequence_length(
+            element_length_func=lambda x, y: tf.shape(x)[0],
+            bucket_boundaries=[w + 1 for w in widths[:-1]],
+            bucket_batch_sizes=[batch_size] * len(widths),
+        )
+    if skip_batches:
+        dataset = dataset.skip(skip_batches)
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,313 @@
+"""
+============================================================
+🧹 KeyCrypt — Storage Inventory + Garbage Collection
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✅ Lists the bucket page by page, with top-level prefixes
+   (split `--depth` levels deep) listed concurrently
+✅ Cross-references models/users/ pickles with the
+   user-models Firestore collection
+✅ Report: size by prefix, size by age, garbage by category,
+   user-models docs whose pickle is missing
+✅ Garbage:
+     orphan_user_model  → models/users/user_<id>_model.pkl with
+                          no user-models/<id> doc
+     stale_temp_upload  → *.uploading / *.tmp left by a writer
+                          that never finished
+     outdated_kaggle    → kaggle_password_feature/ files older
+                          than the live feature CSV
+✅ Dry run first: the report holds a deletion plan, and only
+   --apply <report> deletes — each blob guarded by the
+   generation it was listed with, orphans re-checked
+✅ Works on the LocalBucket / in-memory Firestore stand-ins
+
+Usage (from Engine/):
+    python -m scriptsss.storage_inventory --output storage_inventory.json
+    python -m scriptsss.storage_inventory --apply storage_inventory.json
+Offline:
+    KEYCRYPT_LOCAL_STORAGE=/tmp/kc-bucket python -m scriptsss.storage_inventory
+============================================================
+"""
+
+import re
+import json
+import time
+import argparse
+from collections import namedtuple
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from server.storage import LocalBucket
+
+USER_MODELS_COLLECTION = "user-models"
+USER_MODEL_RE = re.compile(r"^models/users/user_(.+)_model\.pkl$")
+KAGGLE_PREFIX = "kaggle_password_feature/"
+KAGGLE_FEATURES_PATH = "kaggle_password_feature/kaggle_password_feature.csv"
+TEMP_SUFFIXES = (".uploading", ".tmp")
+AGE_BUCKETS = ((1, "<1d"), (7, "1-7d"), (30, "7-30d"), (90, "30-90d"), (None, ">90d"))
+SAMPLE_NAMES = 20
+
+BlobRecord = namedtuple("BlobRecord", "name size updated generation")
+
+
+def _record(blob) -> BlobRecord:
+    updated = blob.updated.timestamp() if blob.updated else 0.0
+    return BlobRecord(blob.name, int(blob.size or 0), updated, blob.generation)
+
+
+# ============================================================
+# 🔹 Paged, Concurrent Listing
+# ============================================================
+def _list_kwargs(bucket) -> dict:
+    # Only the local stand-in keeps in-progress uploads as visible files
+    return {"include_temp": True} if isinstance(bucket, LocalBucket) else {}
+
+
+def list_level(bucket, prefix: str, page_size: int):
+    """One delimited listing → (blobs directly under prefix, sub-prefixes, pages)."""
+    it = bucket.list_blobs(prefix=prefix or None, delimiter="/", page_size=page_size, **_list_kwargs(bucket))
+    records, pages = [], 0
+    for page in it.pages:
+        records.extend(_record(b) for b in page)
+        pages += 1
+    return records, sorted(it.prefixes), pages
+
+
+def list_prefix(bucket, prefix: str, page_size: int):
+    """Everything under prefix → (records, pages)."""
+    it = bucket.list_blobs(prefix=prefix, page_size=page_size, **_list_kwargs(bucket))
+    records, pages = [], 0
+    for page in it.pages:
+        records.extend(_record(b) for b in page)
+        pages += 1
+    return records, pages
+
+
+def inventory(bucket, workers: int = 8, depth: int = 2, page_size: int = 1000):
+    """
+    Expands prefixes `depth` levels with delimited listings, then lists
+    each remaining prefix in full on its own thread.
+    """
+    start = time.perf_counter()
+    records, pages, frontier = [], 0, [""]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kc-inventory") as pool:
+        for _ in range(depth):
+            if not frontier:
+                break
+            next_frontier = []
+            for level_records, subprefixes, level_pages in pool.map(
+                    lambda p: list_level(bucket, p, page_size), frontier):
+                records.extend(level_records)
+                next_frontier.extend(subprefixes)
+                pages += level_pages
+            frontier = next_frontier
+        for prefix_records, prefix_pages in pool.map(lambda p: list_prefix(bucket, p, page_size), frontier):
+            records.extend(prefix_records)
+            pages += prefix_pages
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "blobs": len(records),
+        "bytes": sum(r.size for r in records),
+        "pages": pages,
+        "leaf_prefixes": len(frontier),
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "blobs_per_s": round(len(records) / seconds, 1) if seconds > 0 else None,
+    }
+    return sorted(records), stats
+
+
+# ============================================================
+# 🔹 Firestore Cross-Reference
+# ============================================================
+def load_user_models(db) -> dict:
+    """user_id → model path recorded in user-models/{user_id} (None if absent)."""
+    return {doc.id: (doc.to_dict() or {}).get("path") for doc in db.collection(USER_MODELS_COLLECTION).stream()}
+
+
+def _user_model_owner(name: str):
+    match = USER_MODEL_RE.match(name)
+    return match.group(1) if match else None
+
+
+# ============================================================
+# 🔹 Classification + Report
+# ============================================================
+def classify(records, user_models: dict, now: float, min_age_s: float, temp_age_s: float) -> dict:
+    """
+    category → [(record, user_id)]; nothing younger than its grace period
+    is garbage. An empty user-models collection disables orphan detection
+    (wrong project / credentials would otherwise mark every pickle).
+    """
+    referenced = {path for path in user_models.values() if path}
+    kaggle_live = next((r for r in records if r.name == KAGGLE_FEATURES_PATH), None)
+    garbage = {"orphan_user_model": [], "stale_temp_upload": [], "outdated_kaggle": []}
+
+    for r in records:
+        age = now - r.updated
+        if r.name.endswith(TEMP_SUFFIXES):
+            if age >= temp_age_s:
+                garbage["stale_temp_upload"].append((r, None))
+            continue
+        if age < min_age_s:
+            continue
+        owner = _user_model_owner(r.name)
+        if owner is not None:
+            if user_models and owner not in user_models and r.name not in referenced:
+                garbage["orphan_user_model"].append((r, owner))
+        elif r.name.startswith(KAGGLE_PREFIX) and kaggle_live is not None and r.name != KAGGLE_FEATURES_PATH:
+            if r.updated < kaggle_live.updated:
+                garbage["outdated_kaggle"].append((r, None))
+    return garbage
+
+
+def _prefix_of(name: str, levels: int) -> str:
+    parts = name.split("/")[:-1][:levels]
+    return "/".join(parts) + "/" if parts else "(root)"
+
+
+def _age_bucket(age_s: float) -> str:
+    days = age_s / 86400
+    for limit, label in AGE_BUCKETS:
+        if limit is None or days < limit:
+            return label
+
+
+def _add(totals: dict, key: str, size: int):
+    entry = totals.setdefault(key, {"blobs": 0, "bytes": 0})
+    entry["blobs"] += 1
+    entry["bytes"] += size
+
+
+def build_report(bucket_name: str, records, listing: dict, user_models: dict, now: float,
+                 min_age_s: float, temp_age_s: float, prefix_levels: int = 2) -> dict:
+    by_prefix, by_age = {}, {label: {"blobs": 0, "bytes": 0} for _, label in AGE_BUCKETS}
+    for r in records:
+        _add(by_prefix, _prefix_of(r.name, prefix_levels), r.size)
+        _add(by_age, _age_bucket(now - r.updated), r.size)
+
+    garbage = classify(records, user_models, now, min_age_s, temp_age_s)
+    names = {r.name for r in records}
+    dangling = sorted(uid for uid, path in user_models.items()
+                      if (path or f"models/users/user_{uid}_model.pkl") not in names)
+
+    plan = [{"name": r.name, "generation": r.generation, "size": r.size, "category": category, "user_id": uid}
+            for category, items in garbage.items() for r, uid in items]
+    return {
+        "bucket": bucket_name,
+        "generated_at": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+        "listing": listing,
+        "by_prefix": dict(sorted(by_prefix.items(), key=lambda kv: -kv[1]["bytes"])),
+        "by_age": by_age,
+        "user_models": len(user_models),
+        "dangling_metadata": dangling,
+        "garbage": {
+            category: {"blobs": len(items), "bytes": sum(r.size for r, _ in items),
+                       "sample": [r.name for r, _ in items[:SAMPLE_NAMES]]}
+            for category, items in garbage.items()
+        },
+        "grace": {"min_age_hours": min_age_s / 3600, "temp_age_hours": temp_age_s / 3600},
+        "plan": plan,
+    }
+
+
+# ============================================================
+# 🔹 Apply a Dry-Run Plan
+# ============================================================
+def apply_plan(bucket, db, plan: list, workers: int = 8) -> dict:
+    """
+    Deletes the planned blobs. Orphans that gained a user-models doc since
+    the dry run are kept; a blob re-uploaded since (new generation) fails
+    its precondition and is kept too.
+    """
+    user_models = load_user_models(db)
+    referenced = {path for path in user_models.values() if path}
+    result = {"deleted": 0, "bytes_freed": 0, "skipped": [], "failed": []}
+
+    todo = []
+    for item in plan:
+        if item["category"] == "orphan_user_model" and not user_models:
+            result["skipped"].append({"name": item["name"], "reason": "user-models is empty"})
+        elif item["category"] == "orphan_user_model" and (
+                item.get("user_id") in user_models or item["name"] in referenced):
+            result["skipped"].append({"name": item["name"], "reason": "user-models doc now exists"})
+        else:
+            todo.append(item)
+
+    def delete(item):
+        try:
+            bucket.blob(item["name"]).delete(if_generation_match=item["generation"])
+            return item, None
+        except Exception as e:
+            return item, str(e)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kc-gc") as pool:
+        for item, error in pool.map(delete, todo):
+            if error is None:
+                result["deleted"] += 1
+                result["bytes_freed"] += item["size"]
+            else:
+                result["failed"].append({"name": item["name"], "error": error})
+    return result
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def print_report(report: dict):
+    listing = report["listing"]
+    print(f"📦 {report['bucket']} → {listing['blobs']} blobs, {_mb(listing['bytes'])} "
+          f"({listing['pages']} pages, {listing['seconds']}s, {listing['blobs_per_s']} blobs/s)")
+    print("📁 By prefix:")
+    for prefix, t in report["by_prefix"].items():
+        print(f"   {prefix:<40} {t['blobs']:>8}  {_mb(t['bytes'])}")
+    print("🕒 By age:")
+    for label, t in report["by_age"].items():
+        print(f"   {label:<8} {t['blobs']:>8}  {_mb(t['bytes'])}")
+    print("🗑️ Garbage:")
+    for category, t in report["garbage"].items():
+        print(f"   {category:<20} {t['blobs']:>8}  {_mb(t['bytes'])}")
+    if not report["user_models"]:
+        print("⚠️ user-models is empty → orphan detection skipped")
+    if report["dangling_metadata"]:
+        print(f"⚠️ {len(report['dangling_metadata'])} user-models doc(s) point at a missing pickle")
+
+
+# ============================================================
+# 🚀 MAIN EXECUTION
+# ============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KeyCrypt storage inventory + garbage collection")
+    parser.add_argument("--output", default="storage_inventory.json", help="Report + deletion plan (dry run)")
+    parser.add_argument("--apply", metavar="REPORT", help="Delete the plan of a previous dry-run report")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=2, help="Prefix levels expanded before parallel listing")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--min-age-hours", type=float, default=24.0,
+                        help="Grace period for orphans / outdated files (covers an in-flight retrain)")
+    parser.add_argument("--temp-age-hours", type=float, default=6.0)
+    args = parser.parse_args()
+
+    from server.firebase_client import get_bucket, get_db
+    bucket, db = get_bucket(), get_db()
+
+    if args.apply:
+        with open(args.apply) as f:
+            plan = json.load(f)["plan"]
+        print(f"🧹 Applying {len(plan)} planned deletion(s) from {args.apply}...")
+        outcome = apply_plan(bucket, db, plan, args.workers)
+        print(f"✅ Deleted {outcome['deleted']} blob(s), freed {_mb(outcome['bytes_freed'])} "
+              f"({len(outcome['skipped'])} skipped, {len(outcome['failed'])} failed)")
+        for row in outcome["skipped"] + outcome["failed"]:
+            print(f"   • {row}")
+    else:
+        records, listing = inventory(bucket, args.workers, args.depth, args.page_size)
+        report = build_report(getattr(bucket, "name", "bucket"), records, listing, load_user_models(db),
+                              time.time(), args.min_age_hours * 3600, args.temp_age_hours * 3600)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print_report(report)
+        print(f"📝 Dry run — {len(report['plan'])} deletion(s) planned → {args.output}")
+        print(f"   Review, then: python -m scriptsss.storage_inventory --apply {args.output}")
@@ -4,211 +4,325 @@
 Author: Shubham Patel (NIT Raipur)
 ============================================================
 
-✅ Loads preprocessed dataset: kaggle_strong_passwords.csv
 ✅ Loads vocab.json to get vocab size
+✅ Streams training windows from the encoded corpus
+   (built once from kaggle_strong_passwords.csv if missing)
+   through tf.data — memory no longer grows with the dataset
+✅ Buckets windows by context length (less padding compute)
 ✅ Builds character-level GRU model
-✅ Trains model on strong password patterns
-✅ Saves model as gru_base_rnn.h5 for generation
+✅ Checkpoints model + optimizer + progress every N steps
+   and resumes exactly where an interrupted run stopped
+✅ Records per-epoch throughput (sequences/sec)
+✅ Saves the best model as gru_base_rnn.h5 for generation
+
+Usage (from Engine/):
+    python -m scriptsss.train --data-dir ./data --epochs 50
+    python -m scriptsss.train --data-dir ./data            # resumes
+    python -m scriptsss.train --data-dir ./data --fresh    # restarts
 ============================================================
 """
 
 import os
 import json
-import numpy as np
+import time
+import argparse
 import pandas as pd
+import tensorflow as tf
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, GRU, Dense, Dropout
+from tensorflow.keras.layers import Input, Embedding, GRU, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import ModelCheckpoint, ReduceLROnPlateau, EarlyStopping
+from tensorflow.keras.callbacks import Callback
+from scriptsss.sequence_dataset import corpus_paths, encode_passwords, load_corpus, make_dataset, split_ranges, \
+    count_windows
 
 # ============================================================
 # 🔹 CONFIGURATION
 # ============================================================
 
 SEQ_LEN = 24
-BASE_DIR = r"D:\CSE\Project\KeyCrpyt\engine\scripts"  # ✅ consistent path
+BATCH_SIZE = 256
+VALIDATION_SPLIT = 0.1
+BUCKET_BOUNDARIES = (8, 16)      # + SEQ_LEN → widths 8 / 16 / 24
+DEFAULT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the KeyCrypt GRU base generator")
+    parser.add_argument("--data-dir", default=DEFAULT_DIR,
+                        help="Folder with vocab.json + corpus / kaggle_strong_passwords.csv")
+    parser.add_argument("--output-dir", default=None, help="Model, history + checkpoints (default: --data-dir)")
+    parser.add_argument("--dataset", default=None, help="Strong-password CSV (default: <data-dir>/kaggle_strong_passwords.csv)")
+    parser.add_argument("--vocab", default=None, help="Vocabulary (default: <data-dir>/vocab.json)")
+    parser.add_argument("--corpus", default=None, help="Encoded corpus prefix (default: <data-dir>/strong_corpus)")
+    parser.add_argument("--seq-len", type=int, default=SEQ_LEN)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--validation-split", type=float, default=VALIDATION_SPLIT)
+    parser.add_argument("--buckets", default=",".join(str(b) for b in BUCKET_BOUNDARIES),
+                        help="Context-length bucket boundaries, '' = pad everything to --seq-len")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="Steps between checkpoints")
+    parser.add_argument("--keep-checkpoints", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fresh", action="store_true", help="Ignore existing checkpoints")
+    args = parser.parse_args()
+
+    args.output_dir = args.output_dir or args.data_dir
+    args.dataset = args.dataset or os.path.join(args.data_dir, "kaggle_strong_passwords.csv")
+    args.vocab = args.vocab or os.path.join(args.data_dir, "vocab.json")
+    args.corpus = args.corpus or os.path.join(args.data_dir, "strong_corpus")
+    args.buckets = [int(b) for b in args.buckets.split(",") if b.strip()]
+    return args
 
-# Preprocessed dataset + vocab + model save path
-DATA_PATH = os.path.join(BASE_DIR, "kaggle_strong_passwords.csv")
-VOCAB_PATH = os.path.join(BASE_DIR, "vocab.json")
-MODEL_PATH = os.path.join(BASE_DIR, "gru_base_rnn.h5")
-
-os.makedirs(BASE_DIR, exist_ok=True)
-
-# ============================================================
-# 🔹 LOAD DATA
-# ============================================================
-
-if not os.path.exists(DATA_PATH):
-    raise FileNotFoundError(f"❌ {DATA_PATH} not found! Run preprocessing script first.")
-print("📂 Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-
-if "password" not in df.columns or "strength" not in df.columns:
-    raise ValueError("❌ Dataset must contain 'password' and 'strength' columns")
-
-# Filter only strong passwords (label == 2)
-df_strong = df[df["strength"] == 2].dropna(subset=["password"])
-passwords = df_strong["password"].astype(str).tolist()
-
-print(f"✅ Loaded {len(passwords)} strong passwords")
 
 # ============================================================
 # 🔹 LOAD VOCABULARY
 # ============================================================
-print("📂 Loading vocabulary...")
-if not os.path.exists(VOCAB_PATH) or os.path.getsize(VOCAB_PATH) == 0:
-    raise FileNotFoundError(
-        f"❌ vocab.json not found or is empty at {VOCAB_PATH}. "
-        "Please run preprocess_strong_dataset.py first."
-    )
-
-try:
-    with open(VOCAB_PATH, "r", encoding="utf-8") as f:
-        vocab = json.load(f)
-except json.JSONDecodeError:
-    raise ValueError(
-        f"⚠️ vocab.json at {VOCAB_PATH} is corrupted or invalid. "
-        "Delete it and regenerate using preprocess_strong_dataset.py."
-    )
+def load_vocab(vocab_path: str) -> dict:
+    print("📂 Loading vocabulary...")
+    if not os.path.exists(vocab_path) or os.path.getsize(vocab_path) == 0:
+        raise FileNotFoundError(
+            f"❌ vocab.json not found or is empty at {vocab_path}. "
+            "Please run preprocess_strong_dataset.py first."
+        )
+
+    try:
+        with open(vocab_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        raise ValueError(
+            f"⚠️ vocab.json at {vocab_path} is corrupted or invalid. "
+            "Delete it and regenerate using preprocess_strong_dataset.py."
+        )
 
-vocab_size = len(vocab) + 1  # +1 for padding
-char_to_idx = {char: idx for char, idx in vocab.items()}
-print(f"🔤 Vocabulary size = {vocab_size}")
 
 # ============================================================
-# 🔹 PREPARE TRAINING DATA
+# 🔹 LOAD ENCODED CORPUS
 # ============================================================
+def iter_strong_passwords(path, chunksize=200_000):
+    """Strong passwords (label == 2) from the CSV, one chunk in memory at a time."""
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if "password" not in chunk.columns or "strength" not in chunk.columns:
+            raise ValueError("❌ Dataset must contain 'password' and 'strength' columns")
+        strong = chunk[chunk["strength"] == 2].dropna(subset=["password"])
+        yield from strong["password"].astype(str)
 
-print("🔄 Preparing training sequences...")
-
-def create_sequences(passwords, char_to_idx, seq_len):
-    """
-    Create input-output pairs for training.
-    For each password, we create sliding windows of length seq_len
-    and predict the next character.
-    """
-    X = []
-    y = []
-
-    for password in passwords:
-        # Convert password to indices
-        indices = [char_to_idx.get(char, 0) for char in password]
 
-        # Create sequences
-        for i in range(len(indices) - seq_len):
-            sequence = indices[i:i + seq_len]
-            target = indices[i + seq_len]
-            X.append(sequence)
-            y.append(target)
+def ensure_corpus(args, char_to_idx: dict) -> dict:
+    if not os.path.exists(corpus_paths(args.corpus)["meta"]):
+        if not os.path.exists(args.dataset):
+            raise FileNotFoundError(f"❌ {args.dataset} not found! Run preprocessing script first.")
+        print("🔄 Encoding dataset → compact corpus (one pass)...")
+        encode_passwords(iter_strong_passwords(args.dataset), char_to_idx, args.corpus, args.vocab)
 
-    return np.array(X), np.array(y)
+    _, _, meta = load_corpus(args.corpus)
+    print(f"✅ Loaded {meta['n_sequences']} strong passwords ({meta['n_tokens']} chars, memory-mapped)")
+    return meta
 
-# Generate training data
-X, y = create_sequences(passwords, char_to_idx, SEQ_LEN)
-
-print(f"✅ Created {len(X)} training sequences")
-print(f"📊 X shape: {X.shape}, y shape: {y.shape}")
 
 # ============================================================
 # 🔹 BUILD GRU MODEL
 # ============================================================
+def build_model(vocab_size: int):
+    print("🧠 Building GRU model...")
+
+    # Variable time axis → each length bucket runs only as many steps as it needs
+    model = Sequential([
+        Input(shape=(None,), dtype="int32"),
+        Embedding(input_dim=vocab_size, output_dim=128),
+        GRU(256, return_sequences=True),
+        Dropout(0.3),
+        GRU(256),
+        Dropout(0.3),
+        Dense(vocab_size, activation="softmax")
+    ])
+
+    model.compile(
+        optimizer=Adam(learning_rate=0.001),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+    return model
 
-print("🧠 Building GRU model...")
-
-model = Sequential([
-    Embedding(input_dim=vocab_size, output_dim=128, input_length=SEQ_LEN),
-    GRU(256, return_sequences=True),
-    Dropout(0.3),
-    GRU(256),
-    Dropout(0.3),
-    Dense(vocab_size, activation="softmax")
-])
-
-model.compile(
-    optimizer=Adam(learning_rate=0.001),
-    loss="sparse_categorical_crossentropy",
-    metrics=["accuracy"]
-)
-
-model.summary()
 
 # ============================================================
-# 🔹 CALLBACKS
+# 🔹 CHECKPOINTS (model + optimizer + progress)
 # ============================================================
+class TrainingState:
+    """Everything needed to continue a run exactly, saved with tf.train.Checkpoint."""
+
+    def __init__(self, model, directory: str, keep: int):
+        self.epoch = tf.Variable(0, dtype=tf.int64)              # completed epochs
+        self.step_in_epoch = tf.Variable(0, dtype=tf.int64)      # batches done in the current epoch
+        self.best_val_loss = tf.Variable(float("inf"), dtype=tf.float64)
+        self.wait = tf.Variable(0, dtype=tf.int64)               # epochs without improvement
+        self.lr_wait = tf.Variable(0, dtype=tf.int64)
+        self.checkpoint = tf.train.Checkpoint(
+            model=model, optimizer=model.optimizer, epoch=self.epoch, step_in_epoch=self.step_in_epoch,
+            best_val_loss=self.best_val_loss, wait=self.wait, lr_wait=self.lr_wait,
+        )
+        self.manager = tf.train.CheckpointManager(self.checkpoint, directory, max_to_keep=keep)
+
+    def restore(self) -> bool:
+        path = self.manager.latest_checkpoint
+        if not path:
+            return False
+        self.checkpoint.restore(path)
+        print(f"♻️  Resumed from {path} → epoch {int(self.epoch) + 1}, step {int(self.step_in_epoch)}")
+        return True
+
+    def save(self):
+        return self.manager.save()
+
+
+class StepCheckpoint(Callback):
+    """Counts batches and checkpoints every `every` steps inside an epoch."""
+
+    def __init__(self, state: TrainingState, every: int):
+        super().__init__()
+        self.state = state
+        self.every = every
+        self.batches = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.batches += 1
+        self.state.step_in_epoch.assign_add(1)
+        if self.every and int(self.state.step_in_epoch) % self.every == 0:
+            self.state.save()
 
-checkpoint = ModelCheckpoint(
-    MODEL_PATH,
-    monitor="val_loss",
-    save_best_only=True,
-    verbose=1
-)
-
-lr_reducer = ReduceLROnPlateau(
-    monitor="val_loss",
-    factor=0.5,
-    patience=3,
-    verbose=1,
-    min_lr=1e-6
-)
-
-early_stop = EarlyStopping(
-    monitor="val_loss",
-    patience=7,
-    restore_best_weights=True,
-    verbose=1
-)
 
 # ============================================================
-# 🔹 TRAIN MODEL
+# 🔹 TRAINING HISTORY
 # ============================================================
+def load_history(path: str, resume: bool) -> dict:
+    if resume and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"loss": [], "accuracy": [], "val_loss": [], "val_accuracy": [],
+            "learning_rate": [], "epoch_seconds": [], "sequences_per_sec": []}
 
-print("🚀 Training GRU model on strong passwords...")
-print(f"⏱️  This may take a while depending on dataset size...")
 
-history = model.fit(
-    X, y,
-    validation_split=0.1,
-    batch_size=256,
-    epochs=50,
-    callbacks=[checkpoint, lr_reducer, early_stop],
-    verbose=1
-)
+def save_history(path: str, history: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp, path)
 
-print("✅ Training completed successfully!")
 
 # ============================================================
-# 🔹 SAVE FINAL MODEL & TRAINING HISTORY
+# 🔹 TRAIN MODEL
 # ============================================================
+def train(args):
+    os.makedirs(args.output_dir, exist_ok=True)
+    model_path = os.path.join(args.output_dir, "gru_base_rnn.h5")
+    history_path = os.path.join(args.output_dir, "training_history.json")
+    checkpoint_dir = os.path.join(args.output_dir, "checkpoints")
+
+    vocab = load_vocab(args.vocab)
+    vocab_size = len(vocab) + 1  # +1 for padding
+    char_to_idx = {char: idx for char, idx in vocab.items()}
+    print(f"🔤 Vocabulary size = {vocab_size}")
+
+    meta = ensure_corpus(args, char_to_idx)
+    _, offsets, _ = load_corpus(args.corpus)
+
+    # Whole passwords are held out for validation, so no window leaks across the split
+    train_ids, val_ids = split_ranges(meta["n_sequences"], args.validation_split)
+    train_windows = count_windows(offsets, train_ids)
+    print(f"✅ {train_windows} training / {count_windows(offsets, val_ids)} validation windows")
+    print(f"📊 Buckets: {args.buckets + [args.seq_len]}, batch size {args.batch_size}")
+
+    model = build_model(vocab_size)
+    model.summary()
+
+    state = TrainingState(model, checkpoint_dir, args.keep_checkpoints)
+    resumed = not args.fresh and state.restore()
+    history = load_history(history_path, resumed)
+
+    val_ds = make_dataset(args.corpus, args.seq_len, args.batch_size, ids=val_ids, shuffle=False,
+                          bucket_boundaries=args.buckets)
+
+    print("🚀 Training GRU model on strong passwords...")
+    print(f"⏱️  This may take a while depending on dataset size...")
+
+    while int(state.epoch) < args.epochs:
+        epoch = int(state.epoch)
+        skip = int(state.step_in_epoch)
+
+        # Seed depends on the epoch only → a resumed epoch replays the same order
+        train_ds = make_dataset(args.corpus, args.seq_len, args.batch_size, ids=train_ids, shuffle=True,
+                                seed=args.seed + epoch, bucket_boundaries=args.buckets, skip_batches=skip)
+
+        print(f"\n📘 Epoch {epoch + 1}/{args.epochs}" + (f" (resuming after {skip} batches)" if skip else ""))
+        step_checkpoint = StepCheckpoint(state, args.checkpoint_every)
+        start = time.perf_counter()
+        fit = model.fit(train_ds, epochs=1, callbacks=[step_checkpoint], verbose=1)
+        elapsed = time.perf_counter() - start
+        val_loss, val_accuracy = model.evaluate(val_ds, verbose=0)
+
+        # Batches (not windows) are counted, so a partial last batch is estimated as full
+        sequences = min(step_checkpoint.batches * args.batch_size, train_windows)
+        lr = float(tf.keras.backend.get_value(model.optimizer.learning_rate))
+        history["loss"].append(float(fit.history["loss"][-1]))
+        history["accuracy"].append(float(fit.history["accuracy"][-1]))
+        history["val_loss"].append(float(val_loss))
+        history["val_accuracy"].append(float(val_accuracy))
+        history["learning_rate"].append(lr)
+        history["epoch_seconds"].append(round(elapsed, 2))
+        history["sequences_per_sec"].append(round(sequences / max(elapsed, 1e-9), 1))
+        print(f"⚡ {history['sequences_per_sec'][-1]} sequences/sec, val_loss {val_loss:.4f}")
+
+        # Best model (was ModelCheckpoint(save_best_only=True))
+        if val_loss < float(state.best_val_loss):
+            state.best_val_loss.assign(val_loss)
+            state.wait.assign(0)
+            state.lr_wait.assign(0)
+            model.save(model_path)
+            print(f"💾 val_loss improved → {model_path}")
+        else:
+            state.wait.assign_add(1)
+            state.lr_wait.assign_add(1)
+
+        # Learning-rate plateau (was ReduceLROnPlateau(factor=0.5, patience=3, min_lr=1e-6))
+        if int(state.lr_wait) >= 3:
+            model.optimizer.learning_rate.assign(max(lr * 0.5, 1e-6))
+            state.lr_wait.assign(0)
+            print(f"📉 Learning rate → {float(tf.keras.backend.get_value(model.optimizer.learning_rate)):.2e}")
+
+        state.epoch.assign_add(1)
+        state.step_in_epoch.assign(0)
+        state.save()
+        save_history(history_path, history)
+
+        # Early stopping (was EarlyStopping(patience=7, restore_best_weights=True))
+        if int(state.wait) >= 7:
+            print("🛑 Early stopping — no val_loss improvement for 7 epochs")
+            break
+
+    print("✅ Training completed successfully!")
+    print(f"💾 Best model → {model_path}")
+    print(f"📊 Training history saved → {history_path}")
+    return history
 
-model.save(MODEL_PATH)
-print(f"💾 Model saved → {MODEL_PATH}")
-
-# Save training history
-history_path = os.path.join(BASE_DIR, "training_history.json")
-history_dict = {
-    "loss": [float(x) for x in history.history["loss"]],
-    "accuracy": [float(x) for x in history.history["accuracy"]],
-    "val_loss": [float(x) for x in history.history["val_loss"]],
-    "val_accuracy": [float(x) for x in history.history["val_accuracy"]]
-}
-
-with open(history_path, "w") as f:
-    json.dump(history_dict, f, indent=2)
-
-print(f"📊 Training history saved → {history_path}")
 
 # ============================================================
 # 🔹 TRAINING SUMMARY
 # ============================================================
-
-print("\n" + "="*60)
-print("📈 TRAINING SUMMARY")
-print("="*60)
-print(f"Final Training Loss:     {history.history['loss'][-1]:.4f}")
-print(f"Final Training Accuracy: {history.history['accuracy'][-1]:.4f}")
-print(f"Final Val Loss:          {history.history['val_loss'][-1]:.4f}")
-print(f"Final Val Accuracy:      {history.history['val_accuracy'][-1]:.4f}")
-print(f"Total Epochs Trained:    {len(history.history['loss'])}")
-print("="*60)
-print("\n✨ Model is ready for password generation!")
+def print_summary(history: dict):
+    if not history["loss"]:
+        print("ℹ️ Nothing to train — already at the requested epoch count")
+        return
+    print("\n" + "="*60)
+    print("📈 TRAINING SUMMARY")
+    print("="*60)
+    print(f"Final Training Loss:     {history['loss'][-1]:.4f}")
+    print(f"Final Training Accuracy: {history['accuracy'][-1]:.4f}")
+    print(f"Final Val Loss:          {history['val_loss'][-1]:.4f}")
+    print(f"Final Val Accuracy:      {history['val_accuracy'][-1]:.4f}")
+    print(f"Total Epochs Trained:    {len(history['loss'])}")
+    print(f"Avg Throughput:          {sum(history['sequences_per_sec']) / len(history['sequences_per_sec']):.1f} seq/s")
+    print("="*60)
+    print("\n✨ Model is ready for password generation!")
+
+
+if __name__ == "__main__":
+    print_summary(train(parse_args()))
@@ -0,0 +1,191 @@
+"""
+============================================================
+🔐 KeyCrypt — Breached-Password Membership Index
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Sorted array of password fingerprints (first 64 or 32 bits
+  of SHA-1), built offline by scriptsss/build_breach_index.py
+✔ Memory-mapped read-only .npy → opened in the pre-fork parent,
+  pages shared by every worker through the page cache
+✔ Lookup = binary search (~log2(n) cache lines), well under 1 ms
+✔ No false negatives; false positives ≈ n / 2^bits
+  (64-bit: ~5e-11 for 1e9 entries)
+✔ "breached" (0 / 1) feature for the featurizers; the predictor
+  also accepts a client-side "breachHash" (hex SHA-1) instead
+  of ever receiving the password
+✔ KEYCRYPT_BREACH_INDEX=/path/breach_index.npy (unset → off,
+  feature is 0)
+============================================================
+"""
+
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from .metrics import register_collector
+
+FINGERPRINT_DTYPES = {64: np.uint64, 32: np.uint32}
+
+
+# ============================================================
+# 🔹 Fingerprints
+# ============================================================
+def fingerprint_from_digest(digest: bytes, bits: int = 64) -> int:
+    return int.from_bytes(digest[:8], "big") >> (64 - bits)
+
+
+def fingerprint(password: str, bits: int = 64) -> int:
+    return fingerprint_from_digest(hashlib.sha1(password.encode("utf-8")).digest(), bits)
+
+
+def fingerprint_from_hex(sha1_hex: str, bits: int = 64) -> int:
+    """Client-computed SHA-1 (hex, ≥16 chars) → fingerprint; ValueError if malformed."""
+    sha1_hex = sha1_hex.strip()
+    if len(sha1_hex) < 16:
+        raise ValueError("breachHash must be at least 16 hex chars of SHA-1")
+    return fingerprint_from_digest(bytes.fromhex(sha1_hex[:16]), bits)
+
+
+# ============================================================
+# 🔹 Index
+# ============================================================
+class BreachIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprints = np.load(path, mmap_mode="r")     # read-only, shared pages
+        if self.fingerprints.dtype == np.uint64:
+            self.bits = 64
+        elif self.fingerprints.dtype == np.uint32:
+            self.bits = 32
+        else:
+            raise ValueError(f"❌ {path}: unexpected fingerprint dtype {self.fingerprints.dtype}")
+        meta_path = os.path.splitext(path)[0] + ".json"
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        self._lookups = 0
+        self._hits = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _count(self, lookups: int, hits: int):
+        with self._lock:
+            self._lookups += lookups
+            self._hits += hits
+
+    def contains_fingerprint(self, fp: int) -> bool:
+        fps = self.fingerprints
+        i = int(np.searchsorted(fps, fps.dtype.type(fp)))
+        found = i < len(fps) and int(fps[i]) == fp
+        self._count(1, int(found))
+        return found
+
+    def contains(self, password: str) -> bool:
+        return self.contains_fingerprint(fingerprint(password, self.bits))
+
+    def contains_many(self, passwords) -> np.ndarray:
+        """Vectorized membership for a batch (one searchsorted call)."""
+        fps = self.fingerprints
+        if not len(passwords):
+            return np.zeros(0, dtype=bool)
+        query = np.fromiter((fingerprint(p, self.bits) for p in passwords), dtype=fps.dtype, count=len(passwords))
+        idx = np.searchsorted(fps, query)
+        found = np.zeros(len(query), dtype=bool)
+        inside = idx < len(fps)
+        found[inside] = fps[idx[inside]] == query[inside]
+        self._count(len(query), int(found.sum()))
+        return found
+
+    def expected_fpr(self) -> float:
+        return len(self) / float(2 ** self.bits)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups, hits = self._lookups, self._hits
+        return {
+            "path": self.path,
+            "entries": len(self),
+            "bits": self.bits,
+            "bytes": int(self.fingerprints.nbytes),
+            "expected_fpr": self.expected_fpr(),
+            "lookups": lookups,
+            "hits": hits,
+            "source": self.meta.get("source"),
+        }
+
+
+# ============================================================
+# 🔹 Process-wide Instance (lazy, env-configured)
+# ============================================================
+_index = None
+_index_state = "pending"        # pending → loaded | disabled
+_index_lock = threading.Lock()
+
+
+def get_breach_index():
+    """The configured index, or None when KEYCRYPT_BREACH_INDEX is unset / unreadable."""
+    global _index, _index_state
+    if _index_state == "pending":
+        with _index_lock:
+            if _index_state == "pending":
+                path = os.getenv("KEYCRYPT_BREACH_INDEX", "").strip()
+                if path:
+                    try:
+                        _index = BreachIndex(path)
+                        print(f"🛡️ Breach index ready → {len(_index)} fingerprints ({_index.bits}-bit)")
+                    except Exception as e:
+                        print(f"⚠️ Breach index not loaded ({path}) → {e}")
+                _index_state = "loaded" if _index is not None else "disabled"
+    return _index
+
+
+def breach_feature(password: str) -> float:
+    """1.0 if the password is in the breach index, 0.0 otherwise (or when disabled)."""
+    index = get_breach_index()
+    return float(index.contains(password)) if index is not None and password else 0.0
+
+
+def resolve_breach_feature(features: dict):
+    """
+    Predictor input → (features with "breached" set, breached: True/False/None).
+    A client-side "breachHash" is looked up and removed; an explicit
+    "breached" value is kept as-is; otherwise a plaintext "password" (left
+    in place for resolve_pattern_features) is checked directly.
+    None = index disabled / nothing to look up.
+    """
+    if "breachHash" not in features:
+        if "breached" in features:
+            return features, bool(features["breached"])
+        password = features.get("password")
+        index = get_breach_index()
+        if index is None or not isinstance(password, str) or not password:
+            return features, None
+        breached = index.contains(password)
+        return {**features, "breached": float(breached)}, breached
+
+    features = dict(features)
+    sha1_hex = features.pop("breachHash")
+    index = get_breach_index()
+    if index is None or not isinstance(sha1_hex, str):
+        return features, None
+    try:
+        breached = index.contains_fingerprint(fingerprint_from_hex(sha1_hex, index.bits))
+    except ValueError:
+        return features, None
+    features["breached"] = float(breached)
+    return features, breached
+
+
+@register_collector
+def _breach_index_metrics():
+    index = _index
+    if index is None:
+        return
+    stats = index.stats()
+    yield ("keycrypt_breach_lookups_total", "counter", "Breach index lookups by result",
+           [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["lookups"] - stats["hits"])])
+    yield ("keycrypt_breach_index_entries", "gauge", "Fingerprints in the breach index", [({}, stats["entries"])])
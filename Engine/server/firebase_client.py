@@ -6,12 +6,24 @@ Author: Shubham Patel (NIT Raipur)
 ✔ Initializes Firebase Admin SDK (Firestore + Storage)
 ✔ Prevents duplicate initialization
 ✔ Loads credentials and correct bucket
+✔ Lazy get_db() / get_bucket() — nothing connects at import time
+✔ get_storage() → pooled, chunked downloads (server/storage.py)
+✔ Local stand-ins for offline benchmarks:
+    KEYCRYPT_LOCAL_STORAGE=<dir>   → LocalBucket
+    KEYCRYPT_LOCAL_FIRESTORE=1     → in-memory Firestore
 ============================================================
 """
 
 import os
+import threading
 import firebase_admin
 from firebase_admin import credentials, firestore, storage
+from .startup_timing import timed
+from .storage import LocalBucket, StorageClient
+from .local_firestore import LocalFirestore
+
+# Firestore rejects write batches with more than 500 operations
+FIRESTORE_BATCH_LIMIT = 500
 
 # ============================================================
 # 🔹 Firebase Initialization Function
@@ -56,3 +68,82 @@ def initialize_firebase():
     bucket = storage.bucket()
 
     return db, bucket
+
+
+# ============================================================
+# 🔹 Lazy Client Accessors
+# ============================================================
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_clients():
+    """Initializes Firebase on first use (not at module import)."""
+    if "db" not in _clients:
+        with _clients_lock:
+            if "db" not in _clients:
+                with timed("firebase_admin clients", "init"):
+                    db, bucket = initialize_firebase()
+                _clients["db"], _clients["firebase_bucket"] = db, bucket
+    return _clients
+
+
+def get_db():
+    """Firestore client, or the in-memory stand-in when KEYCRYPT_LOCAL_FIRESTORE=1."""
+    if os.getenv("KEYCRYPT_LOCAL_FIRESTORE", "").lower() in ("1", "true", "yes"):
+        if "local_db" not in _clients:
+            with _clients_lock:
+                if "local_db" not in _clients:
+                    _clients["local_db"] = LocalFirestore()
+                    print("🗂️ Using in-memory Firestore stand-in")
+        return _clients["local_db"]
+    return _get_clients()["db"]
+
+
+def get_bucket():
+    """
+    Firebase Storage bucket, or a LocalBucket when KEYCRYPT_LOCAL_STORAGE
+    points at a directory (offline benchmarks / development).
+    """
+    local_root = os.getenv("KEYCRYPT_LOCAL_STORAGE")
+    if local_root:
+        if "local_bucket" not in _clients:
+            with _clients_lock:
+                if "local_bucket" not in _clients:
+                    _clients["local_bucket"] = LocalBucket(local_root)
+                    print(f"📁 Using local storage bucket → {local_root}")
+        return _clients["local_bucket"]
+    return _get_clients()["firebase_bucket"]
+
+
+def _reset_after_fork():
+    """
+    Pre-fork workers (server/prefork.py) must not reuse the parent's gRPC
+    channels, HTTP sessions or download threads — rebuild them on first use.
+    firebase_admin caches its Firestore / Storage clients on the default
+    App, so the App is dropped too and initialize_firebase() recreates it.
+    """
+    global _clients_lock
+    _clients_lock = threading.Lock()
+    for key in ("db", "firebase_bucket", "storage"):
+        _clients.pop(key, None)
+    if firebase_admin._apps:
+        try:
+            firebase_admin.delete_app(firebase_admin.get_app())
+        except Exception:
+            # Closing the parent's channels can fail in the child; forget the App regardless
+            firebase_admin._apps.pop(firebase_admin._DEFAULT_APP_NAME, None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_storage() -> StorageClient:
+    """Shared pooled StorageClient over get_bucket() (one per process)."""
+    if "storage" not in _clients:
+        bucket = get_bucket()
+        with _clients_lock:
+            if "storage" not in _clients:
+                _clients["storage"] = StorageClient(bucket)
+    return _clients["storage"]
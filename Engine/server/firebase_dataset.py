@@ -1,22 +1,25 @@
 import io
+import os
+import time
+import threading
 import pandas as pd
-from .firebase_client import initialize_firebase
-
-db, bucket = initialize_firebase()
+from collections import OrderedDict
+from .firebase_client import get_db, get_storage
+from .tracing import traced
 
 # ============================================================
 # 🔹 Fetch Kaggle Dataset from Firebase Storage
 # ============================================================
 
+@traced()
 def fetch_kaggle_dataset():
     firebase_kaggle_path = "kaggle_password_feature/kaggle_password_feature.csv"
-    blob = bucket.blob(firebase_kaggle_path)
-
-    if not blob.exists():
-        raise FileNotFoundError("❌ Kaggle dataset not found in Firebase Storage!")
-
     print(f"📥 Downloading Kaggle dataset → {firebase_kaggle_path}")
-    data = blob.download_as_bytes()
+    try:
+        # Large CSV → parallel byte-range chunks over pooled connections
+        data = get_storage().download_bytes(firebase_kaggle_path)
+    except FileNotFoundError:
+        raise FileNotFoundError("❌ Kaggle dataset not found in Firebase Storage!")
     kaggle_df = pd.read_csv(io.BytesIO(data))
 
     if "label" not in kaggle_df.columns:
@@ -30,7 +33,65 @@ def fetch_kaggle_dataset():
 # 🔹 Fetch User Password Features
 # ============================================================
 
-def get_user_features(user_id: str):
-    docs = db.collection("password-features").document(user_id).collection("userPasswordFeatures").stream()
-    data = [doc.to_dict() for doc in docs]
-    return pd.DataFrame(data) if data else pd.DataFrame()
+# Recently fetched per-user frames (login warm-up state; retrain always reads fresh)
+USER_FEATURES_MAX_AGE_S = float(os.getenv("KEYCRYPT_USER_FEATURES_MAX_AGE_S", "30"))
+_user_features = OrderedDict()      # user_id → (fetched_at, DataFrame)
+_user_features_lock = threading.Lock()
+_USER_FEATURES_KEEP = 256
+
+
+# Bulk-ingested rows carry a sortable ingest_key (see scripts/feature_ingest.py)
+FEATURE_CURSOR_FIELD = "ingest_key"
+
+
+def user_features_ref(user_id: str):
+    return get_db().collection("password-features").document(user_id).collection("userPasswordFeatures")
+
+
+@traced()
+def get_user_features(user_id: str, max_age_s: float = 0.0, since: str = None, limit: int = None):
+    """
+    Fetches the user's feature rows from Firestore.
+    With max_age_s > 0, a frame fetched less than max_age_s ago is reused.
+    With since / limit, only ingested rows whose ingest_key sorts after
+    `since` are read (oldest first, uncached); df.attrs["cursor"] is the
+    key to pass as `since` next time.
+    """
+    if since is not None or limit:
+        query = user_features_ref(user_id).where(FEATURE_CURSOR_FIELD, ">", since or "")
+        query = query.order_by(FEATURE_CURSOR_FIELD)
+        if limit:
+            query = query.limit(limit)
+        data = [doc.to_dict() for doc in query.stream()]
+        df = pd.DataFrame(data) if data else pd.DataFrame()
+        df.attrs["cursor"] = data[-1][FEATURE_CURSOR_FIELD] if data else since
+        return df
+
+    if max_age_s > 0:
+        with _user_features_lock:
+            cached = _user_features.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < max_age_s:
+            return cached[1].copy()
+
+    data = [doc.to_dict() for doc in user_features_ref(user_id).stream()]
+    df = pd.DataFrame(data) if data else pd.DataFrame()
+
+    with _user_features_lock:
+        _user_features[user_id] = (time.monotonic(), df)
+        _user_features.move_to_end(user_id)
+        while len(_user_features) > _USER_FEATURES_KEEP:
+            _user_features.popitem(last=False)
+    return df.copy()
+
+
+def invalidate_user_features(user_id: str):
+    """Drops the cached frame after new rows were written."""
+    with _user_features_lock:
+        _user_features.pop(user_id, None)
+
+
+def user_features_age(user_id: str):
+    """Seconds since the user's features were last fetched (None if never)."""
+    with _user_features_lock:
+        cached = _user_features.get(user_id)
+    return time.monotonic() - cached[0] if cached else None
@@ -15,10 +15,12 @@ Author: Shubham Patel (NIT Raipur)
 import os
 import joblib
 from datetime import datetime
-from .firebase_client import initialize_firebase  # global Firebase setup
-
-# Initialize Firestore and Storage once
-db, bucket = initialize_firebase()
+from .firebase_client import get_db, get_bucket, get_storage  # lazy global Firebase setup
+from .startup_timing import mark_warm
+from .prediction_cache import prediction_cache
+from .metrics import stage, timed_stage, MODEL_CACHE_BYTES
+from .tracing import traced
+from .user_model_cache import from_env as user_model_cache_from_env, register_metrics
 
 # ============================================================
 # 🔹 Load Model (Base/User)
@@ -33,93 +35,190 @@ import os
 import joblib
 import tempfile
 
-def load_strength_model_for_user(user_id: str):
+def user_strength_model_path(user_id: str) -> str:
+    return f"models/users/user_{user_id}_model.pkl"
+
+
+def user_strength_model_generation(user_id: str):
+    """Storage generation of the user's personalized model (None if absent)."""
+    return get_storage().generation(user_strength_model_path(user_id))
+
+
+@traced()
+def fetch_user_strength_model(user_id: str):
     """
-    Loads the password strength prediction model for a user.
-    Falls back to base model if not personalized.
-    Downloads model from Firebase Storage safely into a temp file (no caching).
+    Downloads + deserializes a personalized model.
+    Returns (model_data, download_stats), or None if the user has none.
     """
-    user_strength_path = f"models/users/user_{user_id}_model.pkl"
-    base_strength_path = "models/base/password_strength_base.pkl"
+    user_strength_path = user_strength_model_path(user_id)
 
     # Create a temporary file to safely store model before loading
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pkl") as tmp:
         temp_path = tmp.name
 
     try:
-        # Try personalized model first
-        blob = bucket.blob(user_strength_path)
-        if blob.exists():
-            print(f"📦 Downloading personalized strength model for → {user_id}")
-            blob.download_to_filename(temp_path)
+        # Metadata lookup doubles as existence check
+        try:
+            stats = get_storage().download(user_strength_path, temp_path)
+        except FileNotFoundError:
+            return None
+        print(f"📦 Downloaded personalized strength model for → {user_id}")
+        with stage("deserialize"):
             model_data = joblib.load(temp_path)
+        # Storage generation identifies this exact upload (cache keys)
+        model_data["version"] = f"user:{stats['generation']}"
+        return model_data, stats
+
+    finally:
+        # Clean up temp file after use
+        try:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        except Exception as cleanup_error:
+            print(f"⚠️ Could not delete temp file: {cleanup_error}")
+
+
+@traced()
+@timed_stage("resolve")
+def load_strength_model_for_user(user_id: str):
+    """
+    Loads the password strength prediction model for a user.
+    Falls back to base model if not personalized.
+    Blocking: the personalized model is downloaded on every call. Serving
+    paths use user_model_cache.resolve() instead (stale-while-revalidate);
+    the shared base model is cached in-process after first load.
+    """
+    try:
+        loaded = fetch_user_strength_model(user_id)
+        if loaded is not None:
             print("✅ Personalized strength model loaded successfully.")
-            return model_data, "user"
+            return loaded[0], "user"
 
-        # Fallback to base model
+        # Fallback to base model (cached in-process once loaded)
         print("⚙️ Personalized model not found, using base model...")
-        blob = bucket.blob(base_strength_path)
-        if not blob.exists():
-            raise FileNotFoundError("❌ Base strength model missing from Firebase Storage!")
-
-        blob.download_to_filename(temp_path)
-        model_data = joblib.load(temp_path)
-        print("✅ Base strength model loaded successfully.")
-        return model_data, "base"
+        return load_base_strength_model(), "base"
 
     except Exception as e:
         print(f"❌ Error loading model for {user_id}: {e}")
         raise
 
-    finally:
-        # Clean up temp file after use
+# ============================================================
+# 🔹 Base Strength Model (shared, cached in-process)
+# ============================================================
+_base_model_data = None
+
+
+def load_base_strength_model():
+    """
+    Loads the shared base strength model once per process.
+    The base model is a static artifact, so it is kept warm after first use.
+    """
+    global _base_model_data
+    if _base_model_data is not None:
+        return _base_model_data
+
+    base_strength_path = "models/base/password_strength_base.pkl"
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pkl") as tmp:
+        temp_path = tmp.name
+    try:
         try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                # print(f"🧹 Temporary model file deleted: {temp_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ Could not delete temp file: {cleanup_error}")
+            stats = get_storage().download(base_strength_path, temp_path)
+        except FileNotFoundError:
+            raise FileNotFoundError("❌ Base strength model missing from Firebase Storage!")
+        with stage("deserialize"):
+            model_data = joblib.load(temp_path)
+        model_data["version"] = f"base:{stats['generation']}"
+        _base_model_data = model_data
+        MODEL_CACHE_BYTES.set(stats["bytes"], model="strength_base")
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    mark_warm("strength_base")
+    print("✅ Base strength model loaded successfully.")
+    return _base_model_data
 
 # ============================================================
 # 🔹 Load GRU Generator Model (Base Only)
 # ============================================================
 
+@traced()
 def load_gru_model():
     """
     Loads the base GRU password generator model from Firebase Storage.
     This is a shared model for generating passwords — not user-specific.
+    Returns a unique temp path; the caller deletes it once loaded.
     """
     gru_model_path = "models/base/gru_base_rnn.h5"
-    temp_path = "temp_gru_model.h5"
-
-    blob = bucket.blob(gru_model_path)
-    if not blob.exists():
-        raise FileNotFoundError("❌ GRU base model not found in Firebase Storage!")
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".h5") as tmp:
+        temp_path = tmp.name
 
     print("📦 Loading GRU base password generator model...")
-    blob.download_to_filename(temp_path)
+    try:
+        # .h5 is large → parallel byte-range download
+        get_storage().download(gru_model_path, temp_path)
+    except FileNotFoundError:
+        os.remove(temp_path)
+        raise FileNotFoundError("❌ GRU base model not found in Firebase Storage!")
     print("✅ GRU model downloaded successfully.")
     return temp_path  # returns path for TensorFlow/Keras to load
 
+
+@traced()
+def load_gru_int8_model():
+    """
+    Downloads the int8 quantized GRU generator (see scripts/gru_int8.py).
+    Returns a unique temp .npz path for the NumPy runtime to load;
+    the caller deletes it once loaded.
+    """
+    gru_int8_path = "models/base/gru_base_rnn_int8.npz"
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".npz") as tmp:
+        temp_path = tmp.name
+
+    print("📦 Loading int8 GRU password generator model...")
+    try:
+        get_storage().download(gru_int8_path, temp_path)
+    except FileNotFoundError:
+        os.remove(temp_path)
+        raise FileNotFoundError("❌ Int8 GRU model not found in Firebase Storage!")
+    print("✅ Int8 GRU model downloaded successfully.")
+    return temp_path
+
 # ============================================================
 # 🔹 Upload Trained Model to Firebase
 # ============================================================
 
+@traced()
 def upload_trained_model(user_id: str, model_data: dict, local_path: str):
     """
     Uploads personalized model to Firebase Storage
     and updates Firestore metadata.
     """
-    firebase_model_path = f"models/users/user_{user_id}_model.pkl"
-    blob = bucket.blob(firebase_model_path)
-    blob.upload_from_filename(local_path)
+    firebase_model_path = user_strength_model_path(user_id)
+    blob = get_bucket().blob(firebase_model_path)
+    with stage("upload"):
+        blob.upload_from_filename(local_path)
     print(f"📤 Uploaded personalized model → {firebase_model_path}")
 
+    # Cached predictions from the previous model are no longer valid;
+    # the cached model keeps serving until the new one is swapped in
+    prediction_cache.invalidate(user_id)
+    user_model_cache.invalidate(user_id)
+
     # Firestore metadata update
-    db.collection("user-models").document(user_id).set({
+    get_db().collection("user-models").document(user_id).set({
         "updatedAt": datetime.utcnow(),
         "path": firebase_model_path,
         "accuracy": model_data.get("accuracy", None)
     }, merge=True)
 
     print("📊 Firestore metadata updated successfully.")
+
+
+# ============================================================
+# 🔹 Serving Cache (stale-while-revalidate, see user_model_cache.py)
+# ============================================================
+user_model_cache = user_model_cache_from_env(
+    fetch_user_strength_model, user_strength_model_generation, load_base_strength_model)
+register_metrics(user_model_cache)
@@ -0,0 +1,208 @@
+"""
+============================================================
+🗂️ KeyCrypt — In-memory Firestore Stand-in
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Same call shapes the Engine uses on firestore.Client:
+    db.collection(c).document(d).collection(s).stream()
+    db.collection(c).document(d).set(data, merge=True)
+    db.batch() → set / update / delete / commit
+    collection.where(f, op, v).order_by(f).limit(n).stream()
+✔ Documents are copied in and out (no shared mutable state)
+✔ Enabled by KEYCRYPT_LOCAL_FIRESTORE=1 (see get_db())
+✔ Benchmarks / offline development only — not persistent
+============================================================
+"""
+
+import copy
+import uuid
+import threading
+from collections import OrderedDict
+
+
+class LocalSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field: str):
+        return (self._data or {}).get(field)
+
+
+class LocalDocument:
+    def __init__(self, db, collection_path: tuple, doc_id: str):
+        self._db = db
+        self._collection_path = collection_path
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return "/".join(self._collection_path + (self.id,))
+
+    def collection(self, name: str):
+        return LocalCollection(self._db, self._collection_path + (self.id, name))
+
+    def get(self):
+        with self._db._lock:
+            data = self._db._docs(self._collection_path).get(self.id)
+            return LocalSnapshot(self, copy.deepcopy(data))
+
+    def set(self, data: dict, merge: bool = False):
+        self._db._write(self._collection_path, self.id, data, merge)
+
+    def update(self, data: dict):
+        with self._db._lock:
+            if self.id not in self._db._docs(self._collection_path):
+                raise KeyError(f"No document to update: {self.path}")
+        self._db._write(self._collection_path, self.id, data, merge=True)
+
+    def delete(self):
+        with self._db._lock:
+            self._db._docs(self._collection_path).pop(self.id, None)
+
+
+class LocalCollection:
+    def __init__(self, db, path: tuple):
+        self._db = db
+        self._path = path
+        self.id = path[-1]
+
+    def document(self, doc_id: str = None):
+        return LocalDocument(self._db, self._path, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data: dict):
+        doc = self.document()
+        doc.set(data)
+        return None, doc
+
+    def stream(self):
+        with self._db._lock:
+            items = [(doc_id, copy.deepcopy(data)) for doc_id, data in self._db._docs(self._path).items()]
+        for doc_id, data in items:
+            yield LocalSnapshot(LocalDocument(self._db, self._path, doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+    # Queries start from the whole collection
+    def where(self, field: str, op: str, value):
+        return LocalQuery(self).where(field, op, value)
+
+    def order_by(self, field: str, direction: str = "ASCENDING"):
+        return LocalQuery(self).order_by(field, direction)
+
+    def limit(self, count: int):
+        return LocalQuery(self).limit(count)
+
+
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class LocalQuery:
+    """where / order_by / limit with Firestore's rule that docs missing the field never match."""
+
+    def __init__(self, collection: LocalCollection, filters=(), order=None, count=None):
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._order = order
+        self._count = count
+
+    def where(self, field: str, op: str, value):
+        if op not in _OPS:
+            raise ValueError(f"Unsupported operator for the local stand-in: {op}")
+        return LocalQuery(self._collection, self._filters + ((field, op, value),), self._order, self._count)
+
+    def order_by(self, field: str, direction: str = "ASCENDING"):
+        return LocalQuery(self._collection, self._filters, (field, direction), self._count)
+
+    def limit(self, count: int):
+        return LocalQuery(self._collection, self._filters, self._order, count)
+
+    def stream(self):
+        snapshots = []
+        for snap in self._collection.stream():
+            data = snap._data
+            if all(field in data and _OPS[op](data[field], value) for field, op, value in self._filters):
+                snapshots.append(snap)
+        if self._order is not None:
+            field, direction = self._order
+            snapshots = [s for s in snapshots if field in s._data]
+            snapshots.sort(key=lambda s: s._data[field], reverse=str(direction).upper().startswith("DESC"))
+        if self._count is not None:
+            snapshots = snapshots[:self._count]
+        return iter(snapshots)
+
+    def get(self):
+        return list(self.stream())
+
+
+class LocalWriteBatch:
+    """Buffers writes and applies them atomically on commit()."""
+
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+
+    def set(self, reference: LocalDocument, data: dict, merge: bool = False):
+        self._ops.append(("set", reference, data, merge))
+
+    def update(self, reference: LocalDocument, data: dict):
+        self._ops.append(("set", reference, data, True))
+
+    def delete(self, reference: LocalDocument):
+        self._ops.append(("delete", reference, None, False))
+
+    def commit(self):
+        with self._db._lock:
+            for op, ref, data, merge in self._ops:
+                if op == "delete":
+                    self._db._docs(ref._collection_path).pop(ref.id, None)
+                else:
+                    self._db._write_locked(ref._collection_path, ref.id, data, merge)
+        committed, self._ops = len(self._ops), []
+        return committed
+
+
+class LocalFirestore:
+    def __init__(self):
+        self._collections = {}      # collection path tuple → OrderedDict(doc_id → data)
+        self._lock = threading.RLock()
+
+    def _docs(self, path: tuple) -> OrderedDict:
+        return self._collections.setdefault(path, OrderedDict())
+
+    def _write_locked(self, path: tuple, doc_id: str, data: dict, merge: bool):
+        docs = self._docs(path)
+        if merge and doc_id in docs:
+            docs[doc_id].update(copy.deepcopy(data))
+        else:
+            docs[doc_id] = copy.deepcopy(data)
+
+    def _write(self, path: tuple, doc_id: str, data: dict, merge: bool):
+        with self._lock:
+            self._write_locked(path, doc_id, data, merge)
+
+    def collection(self, name: str):
+        return LocalCollection(self, (name,))
+
+    def batch(self):
+        return LocalWriteBatch(self)
+
+    def document_count(self) -> int:
+        with self._lock:
+            return sum(len(docs) for docs in self._collections.values())
@@ -0,0 +1,251 @@
+"""
+============================================================
+📈 KeyCrypt — Prometheus-style Metrics
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Dependency-free Counter / Gauge / Histogram (text format 0.0.4)
+✔ stage("predict") → per-stage latency histogram
+✔ MetricsMiddleware → per-route latency histogram + status counts
+✔ Collectors → values sampled at scrape time (cache ratios, bytes)
+✔ Cheap enough to leave on: one lock + bisect per observation
+============================================================
+"""
+
+import time
+import bisect
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from .tracing import span
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+_collectors = []
+
+
+def _label_str(labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+# ============================================================
+# 🔹 Metric Types
+# ============================================================
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict):
+        return tuple((name, labels.get(name, "")) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_str(k)} {v}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_str(k)} {v}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_label_str(key)} {total}")
+            lines.append(f"{self.name}_count{_label_str(key)} {count}")
+        return lines
+
+
+# ============================================================
+# 🔹 Core Engine Metrics
+# ============================================================
+REQUEST_SECONDS = Histogram(
+    "keycrypt_request_seconds", "HTTP request latency by route", ("route", "method"))
+REQUESTS_TOTAL = Counter(
+    "keycrypt_requests_total", "HTTP requests by route and status", ("route", "method", "status"))
+STAGE_SECONDS = Histogram(
+    "keycrypt_stage_seconds",
+    "Internal stage latency (resolve, download, deserialize, featurize, frame, scale, predict, blend, upload)",
+    ("stage",))
+RETRAINS_IN_FLIGHT = Gauge("keycrypt_retrains_in_flight", "Retrain jobs currently running")
+GENERATOR_CANDIDATES = Counter(
+    "keycrypt_generator_candidates_total", "Candidates scored by the generator", ("mode",))
+MODEL_CACHE_BYTES = Gauge(
+    "keycrypt_model_cache_bytes", "Bytes of model artifacts held in process", ("model",))
+FEATURE_ROWS_INGESTED = Counter(
+    "keycrypt_feature_rows_ingested_total", "Bulk feature rows by outcome", ("result",))
+
+
+@contextmanager
+def stage(name: str):
+    """Stage histogram + a child span when the call is being traced."""
+    start = time.perf_counter()
+    try:
+        with span(name, root=False):
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+def timed_stage(name: str):
+    """Decorator form of stage()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ============================================================
+# 🔹 Scrape-time Collectors
+# ============================================================
+def register_collector(fn):
+    """
+    fn() → iterable of (name, kind, help, [(labels_dict, value), ...]).
+    Evaluated on every scrape, so it should only read counters.
+    """
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        body = metric.render()
+        if not body:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(body)
+
+    for collector in _collectors:
+        try:
+            families = list(collector())
+        except Exception as e:
+            lines.append(f"# collector error: {e}")
+            continue
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f"{name}{_label_str(tuple(sorted(labels.items())))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================
+# 🔹 ASGI Middleware (per-route latency)
+# ============================================================
+class MetricsMiddleware:
+    """
+    Times every HTTP request. The route label is the mount prefix plus the
+    matched route template (e.g. /strength/predict-strength/{user_id}), so
+    user IDs never become label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Mount updates root_path in place, so it carries the sub-app prefix
+            template = getattr(scope.get("route"), "path", None)
+            label = scope.get("root_path", "") + template if template else "unmatched"
+
+            method = scope.get("method", "")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=label, method=method)
+            REQUESTS_TOTAL.inc(route=label, method=method, status=str(status["code"]))
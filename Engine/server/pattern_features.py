@@ -0,0 +1,316 @@
+"""
+============================================================
+🔐 KeyCrypt — Weak-Pattern Detection Features
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Aho-Corasick automata compiled once per process:
+    words    → matched on de-leeted input (p@$$w0rd → password,
+               1 / l / ! / | all fold to the same letter)
+    keyboard → walks along QWERTY rows / columns (+ reversed)
+✔ Dates + years from one scan over digit runs
+✔ Every password is scanned once per automaton → linear in its
+  length, independent of dictionary size
+✔ Flat array.array tables (no per-node dicts), so large word
+  lists stay compact and are shared by pre-forked workers
+✔ Features (0..1, share of the password):
+    tokenCoverage, dictCoverage, keyboardWalkRatio,
+    dateRatio, leetRatio, longestTokenRatio
+✔ KEYCRYPT_PATTERN_WORDLIST=/path/words.txt[,more.txt] adds
+  words to the built-in list (one per line)
+✔ Predictor input: resolve_pattern_features() computes the six
+  features server-side from an optional "password" field (the
+  plaintext is dropped right after), like "breachHash" → "breached"
+============================================================
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+MIN_WORD_LEN = 3
+MIN_WALK_LEN = 4
+DIGITS = frozenset("0123456789")
+
+# Leet / look-alike folding (applied to words and passwords alike)
+LEET_FOLD = {
+    "@": "a", "4": "a", "8": "b", "3": "e", "6": "g", "9": "g",
+    "1": "i", "!": "i", "|": "i", "l": "i",
+    "0": "o", "$": "s", "5": "s", "7": "t", "+": "t",
+}
+LEET_CHARS = frozenset(c for c in LEET_FOLD if not c.isalpha())
+
+COMMON_WORDS = (
+    "password", "passwd", "pass", "admin", "administrator", "root", "login", "welcome", "letmein",
+    "qwerty", "secret", "master", "monkey", "dragon", "shadow", "sunshine", "princess", "football",
+    "baseball", "soccer", "hockey", "cricket", "superman", "batman", "starwars", "pokemon", "iloveyou",
+    "love", "lover", "angel", "baby", "honey", "freedom", "whatever", "trustno", "hello", "hi",
+    "test", "guest", "user", "default", "changeme", "access", "flower", "summer", "winter", "spring",
+    "autumn", "monday", "friday", "sunday", "january", "december", "michael", "jessica", "ashley",
+    "charlie", "daniel", "thomas", "jordan", "hunter", "killer", "cookie", "cheese", "chocolate",
+    "computer", "internet", "google", "facebook", "apple", "samsung", "india", "america", "london",
+    "keycrypt", "abc", "xyz", "god", "jesus", "family", "forever", "secure", "money", "star",
+)
+
+KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+KEYBOARD_COLUMNS = ("1234567890", "qwertyuiop", "asdfghjkl;", "zxcvbnm,./")     # aligned: 1qaz, 2wsx, ...
+NUMPAD_WALKS = ("7894561230", "147258369", "159357", "963852741")
+
+
+def fold(text: str) -> str:
+    return "".join(LEET_FOLD.get(c, c) for c in text.lower())
+
+
+def keyboard_walks():
+    """Every row / column-zigzag / numpad substring of length ≥ MIN_WALK_LEN, both directions."""
+    columns = "".join("".join(row[i] for row in KEYBOARD_COLUMNS) for i in range(len(KEYBOARD_COLUMNS[0])))
+    walks = set()
+    for line in KEYBOARD_ROWS + NUMPAD_WALKS + (columns,):
+        for seq in (line, line[::-1]):
+            for start in range(len(seq)):
+                for end in range(start + MIN_WALK_LEN, len(seq) + 1):
+                    walks.add(seq[start:end])
+    return walks
+
+
+# ============================================================
+# 🔹 Aho-Corasick Automaton (compact tables)
+# ============================================================
+class Automaton:
+    """
+    Node i's edges are edge_label[edge_start[i]:edge_start[i+1]] (sorted
+    code points) → edge_target; out_len[i] = longest token ending at i,
+    following failure links (0 = none).
+    """
+
+    def __init__(self, tokens, min_len: int = 1):
+        # Temporary dict trie, only while compiling
+        children, lengths = [{}], [0]
+        for token in tokens:
+            if len(token) < min_len:
+                continue
+            node = 0
+            for ch in token:
+                nxt = children[node].get(ch)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][ch] = nxt
+                    children.append({})
+                    lengths.append(0)
+                node = nxt
+            lengths[node] = max(lengths[node], len(token))
+
+        n = len(children)
+        fail = [0] * n
+        order = []
+        queue = deque(children[0].values())
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for ch, child in children[node].items():
+                f = fail[node]
+                while f and ch not in children[f]:
+                    f = fail[f]
+                fail[child] = children[f].get(ch, 0)
+                queue.append(child)
+        out_len = lengths[:]
+        for node in order:                      # BFS order → fail target already final
+            out_len[node] = max(out_len[node], out_len[fail[node]])
+
+        self.edge_start = array("i", [0])
+        self.edge_label = array("I")
+        self.edge_target = array("i")
+        for node in range(n):
+            for ch, child in sorted(children[node].items()):
+                self.edge_label.append(ord(ch))
+                self.edge_target.append(child)
+            self.edge_start.append(len(self.edge_label))
+        self.fail = array("i", fail)
+        self.out_len = array("H", [min(v, 65535) for v in out_len])
+        self.nodes = n
+
+    def _goto(self, node: int, code: int) -> int:
+        lo, hi = self.edge_start[node], self.edge_start[node + 1]
+        i = bisect_left(self.edge_label, code, lo, hi)
+        return self.edge_target[i] if i < hi and self.edge_label[i] == code else -1
+
+    def longest_matches(self, text: str) -> list:
+        """ends[i] = length of the longest token ending at text[i] (0 = none)."""
+        ends = [0] * len(text)
+        node = 0
+        for i, ch in enumerate(text):
+            code = ord(ch)
+            nxt = self._goto(node, code)
+            while nxt < 0 and node:
+                node = self.fail[node]
+                nxt = self._goto(node, code)
+            node = nxt if nxt > 0 else 0
+            ends[i] = self.out_len[node]
+        return ends
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in
+                   (self.edge_start, self.edge_label, self.edge_target, self.fail, self.out_len))
+
+
+# ============================================================
+# 🔹 Dates (digit runs)
+# ============================================================
+def _valid_day_month(d: int, m: int) -> bool:
+    return 1 <= m <= 12 and 1 <= d <= 31
+
+
+def _is_year(y: int) -> bool:
+    return 1900 <= y <= 2039
+
+
+def _is_date(s: str) -> bool:
+    if len(s) == 8:
+        a, b, y = int(s[:2]), int(s[2:4]), int(s[4:])
+        if _is_year(y) and (_valid_day_month(a, b) or _valid_day_month(b, a)):
+            return True
+        y, m, d = int(s[:4]), int(s[4:6]), int(s[6:])
+        return _is_year(y) and _valid_day_month(d, m)
+    if len(s) == 6:
+        a, b, c = int(s[:2]), int(s[2:4]), int(s[4:])
+        return _valid_day_month(a, b) or _valid_day_month(b, a) or _valid_day_month(c, b)
+    return len(s) == 4 and _is_year(int(s))
+
+
+def date_matches(text: str) -> list:
+    """ends[i] = length of the longest date / year ending at text[i]."""
+    ends = [0] * len(text)
+    i, n = 0, len(text)
+    while i < n:
+        if text[i] not in DIGITS:
+            i += 1
+            continue
+        j = i
+        while j < n and text[j] in DIGITS:
+            j += 1
+        for end in range(i, j):                 # ≤ 3 fixed-size checks per digit
+            for size in (8, 6, 4):
+                start = end - size + 1
+                if start >= i and _is_date(text[start:end + 1]):
+                    ends[end] = size
+                    break
+        i = j
+    return ends
+
+
+# ============================================================
+# 🔹 Coverage
+# ============================================================
+def _covered(ends: list) -> list:
+    """Per-position flag: inside some match (ends[i] = match length ending at i)."""
+    n = len(ends)
+    flags = [False] * n
+    reach = n                                   # min start of matches ending at ≥ i
+    for i in range(n - 1, -1, -1):
+        if ends[i]:
+            reach = min(reach, i - ends[i] + 1)
+        flags[i] = reach <= i
+    return flags
+
+
+class PatternDetector:
+    def __init__(self, words=(), walks=None):
+        folded = {fold(w.strip()) for w in words if w and w.strip()}
+        self.words = Automaton(folded, MIN_WORD_LEN)
+        self.walks = Automaton(walks if walks is not None else keyboard_walks(), MIN_WALK_LEN)
+        self.word_count = len(folded)
+
+    def features(self, password: str) -> dict:
+        if not password:
+            return dict.fromkeys(PATTERN_FEATURES, 0.0)
+        lower = password.lower()
+        n = len(password)
+
+        word_ends = self.words.longest_matches(fold(password))
+        walk_ends = self.walks.longest_matches(lower)
+        date_ends = date_matches(lower)
+
+        word_cov = _covered(word_ends)
+        walk_cov = _covered(walk_ends)
+        date_cov = _covered(date_ends)
+        any_cov = _covered([max(a, b, c) for a, b, c in zip(word_ends, walk_ends, date_ends)])
+        leet = sum(1 for i, c in enumerate(lower) if word_cov[i] and c in LEET_CHARS)
+
+        return {
+            "tokenCoverage": sum(any_cov) / n,
+            "dictCoverage": sum(word_cov) / n,
+            "keyboardWalkRatio": sum(walk_cov) / n,
+            "dateRatio": sum(date_cov) / n,
+            "leetRatio": leet / n,
+            "longestTokenRatio": max(max(word_ends), max(walk_ends), max(date_ends)) / n,
+        }
+
+    def features_many(self, passwords) -> list:
+        return [self.features(p) for p in passwords]
+
+    def stats(self) -> dict:
+        return {"words": self.word_count, "word_nodes": self.words.nodes, "walk_nodes": self.walks.nodes,
+                "bytes": self.words.nbytes() + self.walks.nbytes()}
+
+
+PATTERN_FEATURES = ("tokenCoverage", "dictCoverage", "keyboardWalkRatio", "dateRatio", "leetRatio",
+                    "longestTokenRatio")
+
+
+# ============================================================
+# 🔹 Process-wide Detector (lazy)
+# ============================================================
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def load_wordlists(paths):
+    for path in paths:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                word = line.strip()
+                if word:
+                    yield word
+
+
+def get_detector() -> PatternDetector:
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                paths = [p for p in os.getenv("KEYCRYPT_PATTERN_WORDLIST", "").split(",") if p.strip()]
+                words = list(COMMON_WORDS)
+                for path in paths:
+                    try:
+                        words.extend(load_wordlists([path.strip()]))
+                    except OSError as e:
+                        print(f"⚠️ Pattern wordlist not loaded ({path}) → {e}")
+                _detector = PatternDetector(words)
+                stats = _detector.stats()
+                print(f"🧩 Pattern detector ready → {stats['words']} words, "
+                      f"{stats['word_nodes'] + stats['walk_nodes']} nodes ({stats['bytes'] / 1e6:.1f} MB)")
+    return _detector
+
+
+def pattern_features(password: str) -> dict:
+    return get_detector().features(password)
+
+
+def pattern_features_many(passwords) -> list:
+    return get_detector().features_many(passwords)
+
+
+def resolve_pattern_features(features: dict) -> dict:
+    """
+    Predictor input → features with the pattern features filled in.
+    A "password" field is scanned and removed (server values win over any
+    sent by the client); without it, client-sent values are kept as-is.
+    """
+    if "password" not in features:
+        return features
+    features = dict(features)
+    password = features.pop("password")
+    if isinstance(password, str):
+        features.update(pattern_features(password))
+    return features
@@ -0,0 +1,145 @@
+"""
+============================================================
+🔐 KeyCrypt — Prediction Result Cache
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Bounded LRU in front of strength inference
+✔ Key = model key + model version + hash of ordered feature vector
+✔ A new model version (retrain / reload) never shares entries
+  with the old one; old-version entries age out through the
+  LRU, so callers still pinned to the old model (open live-typing
+  sockets) keep their hits without flushing the new version's
+✔ invalidate(model_key) drops every version of that model
+✔ Hit ratio + approximate memory usage exposed via stats()
+============================================================
+"""
+
+import os
+import sys
+import struct
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from .metrics import register_collector
+
+
+def feature_vector(features: dict, feature_names):
+    """
+    Ordered vector exactly as the model sees it (missing → 0, like reindex).
+    None if a value isn't numeric — such inputs bypass the cache rather
+    than sharing a key with whatever 0.0 would have produced.
+    """
+    vector = []
+    for name in feature_names:
+        value = features.get(name, 0)
+        try:
+            vector.append(float(value))
+        except (TypeError, ValueError):
+            return None
+    return tuple(vector)
+
+
+def vector_digest(vector) -> bytes:
+    return hashlib.blake2b(struct.pack(f"{len(vector)}d", *vector), digest_size=16).digest()
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()            # (model_key, version, digest) → (result, size)
+        self._by_model = defaultdict(set)        # model_key → {(version, digest)}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Internals (caller holds the lock)
+    # --------------------------------------------------------
+    def _drop(self, key):
+        _, size = self._entries.pop(key)
+        model_key, version, digest = key
+        entries = self._by_model.get(model_key)
+        if entries is not None:
+            entries.discard((version, digest))
+            if not entries:
+                del self._by_model[model_key]
+        self._bytes -= size
+
+    def _invalidate_locked(self, model_key: str):
+        for version, digest in list(self._by_model.pop(model_key, ())):
+            self._drop((model_key, version, digest))
+        self._invalidations += 1
+
+    @staticmethod
+    def _sizeof(result: dict) -> int:
+        size = sys.getsizeof(result)
+        for k, v in result.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+            if isinstance(v, dict):
+                size += sum(sys.getsizeof(x) + sys.getsizeof(y) for x, y in v.items())
+        return size + 16 + 64      # digest + OrderedDict node overhead
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def get(self, model_key: str, version, digest: bytes):
+        key = (model_key, version, digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, model_key: str, version, digest: bytes, result: dict):
+        if self.max_entries <= 0:
+            return
+        key = (model_key, version, digest)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            size = self._sizeof(result)
+            self._entries[key] = (result, size)
+            self._by_model[model_key].add((version, digest))
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, model_key: str):
+        with self._lock:
+            self._invalidate_locked(model_key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "models": len(self._by_model),
+                "versions": len({(m, v) for m, entries in self._by_model.items() for v, _ in entries}),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+                "invalidations": self._invalidations,
+                "approx_bytes": self._bytes,
+            }
+
+
+# One cache per process, shared by the predictor and the retrain path
+prediction_cache = PredictionCache(int(os.getenv("KEYCRYPT_PREDICTION_CACHE_SIZE", "10000")))
+
+
+@register_collector
+def _prediction_cache_metrics():
+    stats = prediction_cache.stats()
+    yield ("keycrypt_prediction_cache_lookups_total", "counter", "Prediction cache lookups by result",
+           [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])])
+    yield ("keycrypt_prediction_cache_hit_ratio", "gauge", "Prediction cache hit ratio",
+           [({}, stats["hit_ratio"])])
+    yield ("keycrypt_prediction_cache_entries", "gauge", "Prediction cache entries", [({}, stats["entries"])])
+    yield ("keycrypt_prediction_cache_bytes", "gauge", "Approximate prediction cache memory",
+           [({}, stats["approx_bytes"])])
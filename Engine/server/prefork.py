@@ -0,0 +1,180 @@
+"""
+============================================================
+🍴 KeyCrypt — Pre-fork Multi-worker Server
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Parent imports the sub-APIs and loads the base strength
+  model (+ feature schema), the breach index (mmap), the
+  weak-pattern automata and optionally the GRU generator
+✔ gc.freeze() before fork → workers share those pages
+  copy-on-write instead of each holding its own copy
+✔ One listening socket bound in the parent, inherited by
+  every worker (uvicorn.Server(...).run(sockets=[sock]))
+✔ Crashed workers are re-forked; SIGINT / SIGTERM stop all
+✔ Per-worker state (thread pools, the Firebase App + clients, the
+  candidate pool thread) is created after fork, in the worker
+✔ POSIX only — falls back to a single process elsewhere
+
+Usage (from Engine/):
+    python -m server.prefork --workers 4 --port 8000
+    KEYCRYPT_WORKERS=4 python main.py
+============================================================
+"""
+
+import gc
+import os
+import sys
+import time
+import signal
+import argparse
+
+
+# ============================================================
+# 🔹 Preload (parent, before fork)
+# ============================================================
+def preload(gru: bool = True, app=None, lazy_apps=None) -> dict:
+    """Imports every sub-API and loads the shared read-only models once."""
+    # No collections while the long-lived model objects are being built
+    gc.disable()
+    if app is None:
+        from main import app, lazy_apps
+    from server.startup_timing import timed, format_timing_report
+
+    for sub in lazy_apps.values():
+        sub.load()
+
+    loaded = {}
+    from server.firebase_model import load_base_strength_model
+    with timed("base strength model (pre-fork)", "warmup"):
+        model_data = load_base_strength_model()
+    loaded["base_model"] = model_data.get("version")
+    loaded["features"] = len(model_data["features"])
+
+    # mmap opened once here → workers share the fingerprint pages
+    from server.breach_index import get_breach_index
+    index = get_breach_index()
+    loaded["breach_index"] = len(index) if index is not None else None
+
+    # Pattern automata are flat arrays → built once, shared copy-on-write
+    from server.pattern_features import get_detector
+    loaded["pattern_nodes"] = get_detector().stats()["word_nodes"]
+
+    if gru:
+        try:
+            from scripts.password_generator import get_gru_model, GRU_VARIANT
+            with timed("gru generator (pre-fork)", "warmup"):
+                get_gru_model()
+            loaded["gru"] = GRU_VARIANT
+        except Exception as e:
+            print(f"⚠️ GRU not preloaded (workers load it lazily) → {e}")
+
+    # Move everything allocated so far out of the collector's reach, so
+    # workers never write GC headers into the shared pages
+    gc.collect()
+    gc.freeze()
+    print(format_timing_report("PRE-FORK PRELOAD"))
+    return {"app": app, "loaded": loaded}
+
+
+# ============================================================
+# 🔹 Worker (child, after fork)
+# ============================================================
+def _run_worker(app, sock, log_level: str):
+    import uvicorn
+
+    gc.enable()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(app, sock, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, log_level)
+        except BaseException as e:
+            print(f"❌ Worker {os.getpid()} crashed → {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+# ============================================================
+# 🔹 Supervisor (parent)
+# ============================================================
+def serve(workers: int = 2, host: str = "127.0.0.1", port: int = 8000, preload_models: bool = True,
+          gru: bool = True, log_level: str = "warning", app=None, lazy_apps=None):
+    """
+    `app` / `lazy_apps` come from the caller when main.py is run as a
+    script — importing `main` again would build (and preload) a second copy.
+    """
+    import uvicorn
+
+    if app is None:
+        from main import app, lazy_apps
+
+    if not hasattr(os, "fork"):
+        print("⚠️ os.fork() unavailable on this platform → single-process server")
+        uvicorn.run(app, host=host, port=port, log_level=log_level)
+        return
+
+    if preload_models:
+        preload(gru, app, lazy_apps)
+
+    sock = uvicorn.Config(app, host=host, port=port).bind_socket()
+    children = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        pid = _fork_worker(app, sock, log_level)
+        children[pid] = time.time()
+    print(f"🍴 Pre-fork server on http://{host}:{port} → parent {os.getpid()}, "
+          f"workers {sorted(children)} (preload={'on' if preload_models else 'off'})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"⚠️ Worker {pid} exited (status {status}) → re-forking")
+        if time.time() - started < 1.0:
+            time.sleep(1.0)     # crash loop guard
+        children[_fork_worker(app, sock, log_level)] = time.time()
+
+    sock.close()
+    print("🛑 Pre-fork server stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KeyCrypt pre-fork multi-worker server")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("KEYCRYPT_WORKERS", "2")))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-preload", action="store_true", help="Fork first, load models per worker")
+    parser.add_argument("--no-gru", action="store_true", help="Skip preloading the GRU generator")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    serve(args.workers, args.host, args.port, not args.no_preload, not args.no_gru, args.log_level)
+    sys.exit(0)
@@ -0,0 +1,408 @@
+"""
+============================================================
+🔐 KeyCrypt — Near-duplicate Password Reuse Index (per user)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Sketch = MinHash over character 3-grams of the de-leeted,
+  lower-cased password (P@ssw0rd2024 ≈ password2025)
+✔ Every n-gram hash is keyed with a per-user key
+  (HMAC-SHA256(KEYCRYPT_REUSE_SECRET, user_id)), so stored
+  sketches cannot be matched against a dictionary, or across
+  users, without the server secret; the password itself is
+  never stored
+✔ LSH banding (16 bands × 4 rows): a lookup only touches the
+  entries sharing a band bucket → sub-linear in vault size
+✔ add / remove are incremental (one sketch, 16 bucket updates)
+✔ audit() → near-duplicate groups + exact reuse for a vault
+✔ Sketches persisted in Firestore:
+    reuse-sketches/{userId}/entries/{entryId}
+  every write also sets reuse-sketches/{userId}.version, so a
+  worker's cached index is rebuilt once another worker changed
+  the vault (checked every KEYCRYPT_REUSE_REVALIDATE_S, default 30)
+============================================================
+"""
+
+import os
+import hmac
+import time
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict, defaultdict
+import numpy as np
+
+from .pattern_features import fold
+
+NGRAM = 3
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.5          # ≈ (1 / BANDS) ** (1 / ROWS) → LSH sweet spot
+_PRIME = np.uint64(4294967311)   # first prime > 2^32
+
+
+# ============================================================
+# 🔹 Keys
+# ============================================================
+_secret = None
+_secret_lock = threading.Lock()
+
+
+def server_secret() -> bytes:
+    global _secret
+    with _secret_lock:
+        if _secret is None:
+            configured = os.getenv("KEYCRYPT_REUSE_SECRET", "")
+            if configured:
+                _secret = configured.encode()
+            else:
+                # Sketches from an ephemeral key are ignored after a restart (key_id mismatch)
+                _secret = secrets.token_bytes(32)
+                print("⚠️ KEYCRYPT_REUSE_SECRET not set → ephemeral key, stored sketches won't survive a restart")
+        return _secret
+
+
+def user_key(user_id: str) -> bytes:
+    return hmac.new(server_secret(), f"reuse:{user_id}".encode(), hashlib.sha256).digest()
+
+
+def key_id(key: bytes) -> str:
+    return hashlib.blake2b(key, digest_size=4).hexdigest()
+
+
+# ============================================================
+# 🔹 Sketches
+# ============================================================
+def _permutations(key: bytes):
+    """NUM_PERM (a, b) pairs for h(x) = (a·x + b) mod p, derived from the user key."""
+    stream = hashlib.shake_256(key + b"minhash").digest(NUM_PERM * 8)
+    ab = np.frombuffer(stream, dtype=">u4").astype(np.uint64).reshape(NUM_PERM, 2)
+    return ab[:, 0] | np.uint64(1), ab[:, 1]
+
+
+def ngrams(password: str):
+    text = fold(password)
+    if len(text) < NGRAM:
+        return {text} if text else set()
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class Sketcher:
+    def __init__(self, key: bytes):
+        self.key = key
+        self.key_id = key_id(key)
+        self._a, self._b = _permutations(key)
+
+    def signature(self, password: str) -> np.ndarray:
+        grams = ngrams(password)
+        if not grams:
+            return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint64)
+        hashed = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), key=self.key[:32], digest_size=4).digest(), "big")
+             for g in grams),
+            dtype=np.uint64, count=len(grams),
+        )
+        # (NUM_PERM × n-grams) permuted hashes, min per permutation; a, x < 2^32 → no overflow
+        permuted = (self._a[:, None] * hashed[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def digest(self, password: str) -> str:
+        """Keyed digest of the exact password (exact-reuse check)."""
+        return hmac.new(self.key, password.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def band_keys(signature: np.ndarray):
+    rows = signature.reshape(BANDS, ROWS)
+    return [hashlib.blake2b(rows[b].tobytes(), digest_size=8).digest() for b in range(BANDS)]
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """MinHash estimate of the n-gram Jaccard similarity."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+# ============================================================
+# 🔹 Per-user Index
+# ============================================================
+class ReuseIndex:
+    def __init__(self, user_id: str, key: bytes = None):
+        self.user_id = user_id
+        self.sketcher = Sketcher(key or user_key(user_id))
+        self._entries = {}                          # entry_id → {"signature", "digest", "bands"}
+        self._buckets = defaultdict(set)            # (band, key) → {entry_id}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry_ids(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    # --------------------------------------------------------
+    # Sketch records (what gets persisted)
+    # --------------------------------------------------------
+    def sketch(self, password: str) -> dict:
+        return {
+            "signature": [int(v) for v in self.sketcher.signature(password)],
+            "digest": self.sketcher.digest(password),
+            "key_id": self.sketcher.key_id,
+        }
+
+    def load_sketch(self, entry_id: str, record: dict) -> bool:
+        """Adds a stored sketch; False if it was made with another key."""
+        if record.get("key_id") != self.sketcher.key_id or len(record.get("signature", ())) != NUM_PERM:
+            return False
+        self._insert(entry_id, np.asarray(record["signature"], dtype=np.uint64), record.get("digest"))
+        return True
+
+    # --------------------------------------------------------
+    # Incremental updates
+    # --------------------------------------------------------
+    def _insert(self, entry_id: str, signature: np.ndarray, digest: str):
+        bands = band_keys(signature)
+        with self._lock:
+            self._remove_locked(entry_id)
+            self._entries[entry_id] = {"signature": signature, "digest": digest, "bands": bands}
+            for b, key in enumerate(bands):
+                self._buckets[(b, key)].add(entry_id)
+
+    def _remove_locked(self, entry_id: str) -> bool:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return False
+        for b, key in enumerate(entry["bands"]):
+            bucket = self._buckets.get((b, key))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[(b, key)]
+        return True
+
+    def add(self, entry_id: str, password: str) -> dict:
+        record = self.sketch(password)
+        self.load_sketch(entry_id, record)
+        return record
+
+    def remove(self, entry_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(entry_id)
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+    def _neighbours(self, signature: np.ndarray, digest: str, exclude: str, threshold: float):
+        with self._lock:
+            candidates = set()
+            for b, key in enumerate(band_keys(signature)):
+                candidates |= self._buckets.get((b, key), set())
+            candidates.discard(exclude)
+            entries = [(eid, self._entries[eid]) for eid in candidates]
+
+        matches = []
+        for eid, entry in entries:
+            exact = digest is not None and entry["digest"] == digest
+            score = 1.0 if exact else similarity(signature, entry["signature"])
+            if score >= threshold:
+                matches.append({"entry_id": eid, "similarity": round(score, 3), "exact": exact})
+        matches.sort(key=lambda m: (-m["similarity"], m["entry_id"]))
+        return matches, len(candidates)
+
+    def query(self, password: str, threshold: float = DEFAULT_THRESHOLD, exclude: str = None) -> dict:
+        signature = self.sketcher.signature(password)
+        matches, candidates = self._neighbours(signature, self.sketcher.digest(password), exclude, threshold)
+        return {"matches": matches, "candidates_checked": candidates, "entries": len(self)}
+
+    def query_entry(self, entry_id: str, threshold: float = DEFAULT_THRESHOLD) -> dict:
+        with self._lock:
+            entry = self._entries.get(entry_id)
+        if entry is None:
+            raise KeyError(entry_id)
+        matches, candidates = self._neighbours(entry["signature"], entry["digest"], entry_id, threshold)
+        return {"matches": matches, "candidates_checked": candidates, "entries": len(self)}
+
+    def audit(self, threshold: float = DEFAULT_THRESHOLD) -> dict:
+        """Groups of near-duplicate entries (union-find over LSH candidate pairs)."""
+        start = time.perf_counter()
+        with self._lock:
+            entries = dict(self._entries)
+            buckets = [set(b) for b in self._buckets.values() if len(b) > 1]
+
+        parent = {eid: eid for eid in entries}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        checked, pairs = set(), []
+        for bucket in buckets:
+            members = sorted(bucket)
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if (a, b) in checked:
+                        continue
+                    checked.add((a, b))
+                    ea, eb = entries[a], entries[b]
+                    exact = ea["digest"] is not None and ea["digest"] == eb["digest"]
+                    score = 1.0 if exact else similarity(ea["signature"], eb["signature"])
+                    if score >= threshold:
+                        pairs.append({"a": a, "b": b, "similarity": round(score, 3), "exact": exact})
+                        parent[find(a)] = find(b)
+
+        groups = defaultdict(list)
+        for eid in entries:
+            groups[find(eid)].append(eid)
+        clusters = sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g))
+        reused = sum(len(g) for g in clusters)
+
+        return {
+            "user_id": self.user_id,
+            "entries": len(entries),
+            "threshold": threshold,
+            "groups": [{"entries": g, "size": len(g)} for g in clusters],
+            "pairs": sorted(pairs, key=lambda p: (-p["similarity"], p["a"], p["b"])),
+            "exact_reuse_pairs": sum(1 for p in pairs if p["exact"]),
+            "entries_in_groups": reused,
+            "reuse_ratio": round(reused / len(entries), 4) if entries else 0.0,
+            "pairs_checked": len(checked),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+
+
+# ============================================================
+# 🔹 Index Cache + Firestore Persistence
+# ============================================================
+REUSE_COLLECTION = "reuse-sketches"
+
+
+def _user_ref(user_id: str):
+    from .firebase_client import get_db
+    return get_db().collection(REUSE_COLLECTION).document(user_id)
+
+
+def _entries_ref(user_id: str):
+    return _user_ref(user_id).collection("entries")
+
+
+def stored_version(user_id: str):
+    """Version token of the user's stored sketches (None if never written)."""
+    snapshot = _user_ref(user_id).get()
+    return (snapshot.to_dict() or {}).get("version") if snapshot.exists else None
+
+
+def _version_update() -> dict:
+    return {"version": secrets.token_hex(8), "updated_at": time.time()}
+
+
+class ReuseIndexCache:
+    """
+    Bounded LRU of per-user indexes, rebuilt from stored sketches on first
+    use. Every revalidate_s an index is checked against the stored version
+    (one document read) and rebuilt if any worker changed the sketches
+    since it was built. This worker's own writes update the index in place
+    and mark it dirty: it can't tell whether another worker wrote first,
+    so the next check rebuilds it.
+    """
+
+    def __init__(self, max_users: int = 256, revalidate_s: float = 30.0):
+        self.max_users = max_users
+        self.revalidate_s = revalidate_s
+        self._indexes = OrderedDict()       # user_id → {"index", "version", "checked", "dirty"}
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._counts = {"builds": 0, "revalidations": 0}
+
+    def _fresh(self, entry) -> bool:
+        return entry is not None and time.monotonic() - entry["checked"] < self.revalidate_s
+
+    def _build(self, user_id: str) -> ReuseIndex:
+        index = ReuseIndex(user_id)
+        stale = 0
+        for doc in _entries_ref(user_id).stream():
+            if not index.load_sketch(doc.id, doc.to_dict() or {}):
+                stale += 1
+        if stale:
+            print(f"⚠️ {stale} reuse sketch(es) for {user_id} were made with another key → ignored")
+        return index
+
+    def get(self, user_id: str) -> ReuseIndex:
+        with self._lock:
+            entry = self._indexes.get(user_id)
+            if entry is not None:
+                self._indexes.move_to_end(user_id)
+            if self._fresh(entry):
+                return entry["index"]
+            loading = self._loading.get(user_id)
+            if loading is None:
+                loading = self._loading[user_id] = threading.Lock()
+
+        with loading:                       # one Firestore read per user, even under concurrency
+            with self._lock:
+                entry = self._indexes.get(user_id)
+            if self._fresh(entry):
+                return entry["index"]
+            # Version read first: a write racing the rebuild leaves it behind → rebuilt next check
+            version = stored_version(user_id)
+            if entry is not None and not entry["dirty"] and entry["version"] == version:
+                entry = {**entry, "checked": time.monotonic()}
+                counter = "revalidations"
+            else:
+                entry = {"index": self._build(user_id), "version": version,
+                         "checked": time.monotonic(), "dirty": False}
+                counter = "builds"
+            with self._lock:
+                self._counts[counter] += 1
+                self._indexes[user_id] = entry
+                self._indexes.move_to_end(user_id)
+                self._loading.pop(user_id, None)
+                while len(self._indexes) > self.max_users:
+                    self._indexes.popitem(last=False)
+            return entry["index"]
+
+    def mark_dirty(self, user_id: str):
+        with self._lock:
+            entry = self._indexes.get(user_id)
+            if entry is not None:
+                self._indexes[user_id] = {**entry, "dirty": True}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"users": len(self._indexes), "max_users": self.max_users,
+                    "revalidate_s": self.revalidate_s, **self._counts,
+                    "entries": sum(len(e["index"]) for e in self._indexes.values())}
+
+
+def save_sketches(user_id: str, records: dict):
+    """records: entry_id → sketch record; chunked into Firestore batches of ≤ 500 writes."""
+    from .firebase_client import get_db, FIRESTORE_BATCH_LIMIT
+    db, ref = get_db(), _entries_ref(user_id)
+    items = list(records.items())
+    per_batch = FIRESTORE_BATCH_LIMIT - 1               # + the version bump
+    try:
+        for start in range(0, len(items), per_batch):
+            batch = db.batch()
+            for entry_id, record in items[start:start + per_batch]:
+                batch.set(ref.document(entry_id), {**record, "updated_at": time.time()})
+            batch.set(_user_ref(user_id), _version_update(), merge=True)
+            batch.commit()
+    finally:
+        reuse_indexes.mark_dirty(user_id)
+
+
+def delete_sketch(user_id: str, entry_id: str):
+    from .firebase_client import get_db
+    batch = get_db().batch()
+    batch.delete(_entries_ref(user_id).document(entry_id))
+    batch.set(_user_ref(user_id), _version_update(), merge=True)
+    try:
+        batch.commit()
+    finally:
+        reuse_indexes.mark_dirty(user_id)
+
+
+reuse_indexes = ReuseIndexCache(
+    int(os.getenv("KEYCRYPT_REUSE_CACHE_SIZE", "256")),
+    revalidate_s=float(os.getenv("KEYCRYPT_REUSE_REVALIDATE_S", "30")),
+)
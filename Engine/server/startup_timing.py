@@ -0,0 +1,89 @@
+"""
+============================================================
+⏱️ KeyCrypt — Startup Timing & Warm-State Registry
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ Records per-module import + client/model init durations
+✔ Tracks which models are warm (loaded in this process)
+✔ Formats a boot-time breakdown for the unified server log
+============================================================
+"""
+
+import sys
+import time
+import threading
+import importlib
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_timings = []          # [{"name", "kind", "seconds"}]
+_warm_models = {}      # name → unix timestamp when it became warm
+
+
+# ============================================================
+# 🔹 Timings
+# ============================================================
+def record_timing(name: str, kind: str, seconds: float):
+    with _lock:
+        _timings.append({"name": name, "kind": kind, "seconds": round(seconds, 4)})
+
+
+@contextmanager
+def timed(name: str, kind: str = "init"):
+    """Times a block and records it under `kind` (import / init / warmup)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, kind, time.perf_counter() - start)
+
+
+def timed_import(module_path: str):
+    """Imports a module, recording the time only if it was not loaded yet."""
+    if module_path in sys.modules:
+        return sys.modules[module_path]
+    with timed(module_path, "import"):
+        return importlib.import_module(module_path)
+
+
+def get_timings():
+    with _lock:
+        return list(_timings)
+
+
+# Wall-clock spans that already contain the stages → listed, never summed
+SPAN_KINDS = ("boot",)
+
+
+def format_timing_report(title: str = "STARTUP TIMING BREAKDOWN") -> str:
+    rows = get_timings()
+    stages = [r for r in rows if r["kind"] not in SPAN_KINDS]
+    lines = ["=" * 60, f"⏱️ {title}", "=" * 60]
+    for row in stages:
+        lines.append(f"{row['kind']:<8} {row['name']:<40} {row['seconds'] * 1000:>9.1f} ms")
+    total = sum(r["seconds"] for r in stages)
+    lines.append("-" * 60)
+    lines.append(f"{'total':<49} {total * 1000:>9.1f} ms")
+    for row in rows:
+        if row["kind"] in SPAN_KINDS:
+            lines.append(f"{row['name']:<49} {row['seconds'] * 1000:>9.1f} ms")
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+# ============================================================
+# 🔹 Warm Models
+# ============================================================
+def mark_warm(name: str):
+    with _lock:
+        _warm_models.setdefault(name, time.time())
+
+
+def mark_cold(name: str):
+    with _lock:
+        _warm_models.pop(name, None)
+
+
+def warm_models() -> dict:
+    with _lock:
+        return dict(_warm_models)
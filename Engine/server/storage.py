@@ -0,0 +1,382 @@
+"""
+============================================================
+📦 KeyCrypt — Storage Access Layer
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ One shared StorageClient per process (pooled HTTP connections)
+✔ Large blobs downloaded in parallel byte-range chunks
+✔ Concurrent prefetch of a known list of blobs
+✔ Bytes / seconds / throughput recorded per download
+✔ LocalBucket — filesystem stand-in with the same blob API
+  (incl. paged / delimited listings), so everything can be
+  benchmarked offline
+
+Local mode:
+    KEYCRYPT_LOCAL_STORAGE=/path/to/bucket-root
+
+Offline benchmark:
+    python -m server.storage bench --root /tmp/kc-bucket --size-mb 64
+Prefetch known artifacts:
+    python -m server.storage prefetch models/base/gru_base_rnn.h5 ... --dest ./cache
+============================================================
+"""
+
+import os
+import time
+import shutil
+import uuid
+import argparse
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import stage
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024       # 8 MiB per range request
+DEFAULT_MAX_WORKERS = 8
+
+
+# ============================================================
+# 🔹 Local Filesystem Bucket (GCS-compatible subset)
+# ============================================================
+class LocalBlob:
+    """Mimics the parts of google.cloud.storage.Blob the Engine uses."""
+
+    def __init__(self, bucket, name: str, generation=None):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.size = None
+        self.updated = None
+        self.generation = generation
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.bucket.root, *self.name.split("/"))
+
+    def exists(self, *args, **kwargs) -> bool:
+        return os.path.isfile(self.path)
+
+    def reload(self, *args, **kwargs):
+        if not self.exists():
+            raise FileNotFoundError(f"❌ Blob not found: {self.name}")
+        st = os.stat(self.path)
+        self.size = st.st_size
+        self.updated = datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
+        self.generation = st.st_mtime_ns
+        return self
+
+    def _check_generation(self, f):
+        # A handle pinned to a generation must not read a replaced file (GCS: 404)
+        if self.generation is not None and os.fstat(f.fileno()).st_mtime_ns != self.generation:
+            raise FileNotFoundError(f"❌ Generation {self.generation} of {self.name} no longer exists")
+
+    def download_as_bytes(self, start=None, end=None, **kwargs) -> bytes:
+        # `end` is inclusive, as in google-cloud-storage
+        with open(self.path, "rb") as f:
+            self._check_generation(f)
+            if start is None:
+                return f.read() if end is None else f.read(end + 1)
+            f.seek(start)
+            return f.read() if end is None else f.read(end - start + 1)
+
+    def download_to_filename(self, filename: str, start=None, end=None, **kwargs):
+        if start is None and end is None:
+            shutil.copyfile(self.path, filename)
+        else:
+            with open(filename, "wb") as out:
+                out.write(self.download_as_bytes(start=start, end=end))
+
+    def _upload_tmp(self) -> str:
+        # Unique per upload, so concurrent writers never rename each other's file
+        return f"{self.path}.{uuid.uuid4().hex[:8]}.uploading"
+
+    def upload_from_filename(self, filename: str, **kwargs):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self._upload_tmp()
+        shutil.copyfile(filename, tmp)
+        os.replace(tmp, self.path)
+        self.reload()
+
+    def upload_from_string(self, data, content_type=None, **kwargs):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        tmp = self._upload_tmp()
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self.content_type = content_type
+        self.reload()
+
+    def delete(self, *args, if_generation_match=None, **kwargs):
+        # Same precondition as GCS: refuse if the blob was replaced since it was listed
+        if if_generation_match is not None and os.stat(self.path).st_mtime_ns != if_generation_match:
+            raise FileExistsError(f"❌ Generation changed, not deleted: {self.name}")
+        os.remove(self.path)
+
+
+class LocalBlobIterator:
+    """
+    What LocalBucket.list_blobs() returns: iterable over blobs, with
+    .pages / .prefixes / .next_page_token like google-cloud-storage.
+    A page token is the last name of the previous page (names are sorted).
+    """
+
+    def __init__(self, bucket, names: list, prefixes: set, page_size: int):
+        self.bucket = bucket
+        self.prefixes = prefixes
+        self.next_page_token = None
+        self._names = names
+        self._page_size = max(1, page_size)
+
+    @property
+    def pages(self):
+        for start in range(0, len(self._names), self._page_size):
+            names = self._names[start:start + self._page_size]
+            more = start + self._page_size < len(self._names)
+            self.next_page_token = names[-1] if more else None
+            yield [LocalBlob(self.bucket, name).reload() for name in names]
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+
+class LocalBucket:
+    """Filesystem directory exposed through the bucket.blob(...) API."""
+
+    def __init__(self, root: str, name: str = "local-bucket"):
+        self.root = os.path.abspath(root)
+        self.name = name
+        os.makedirs(self.root, exist_ok=True)
+
+    def blob(self, name: str, generation=None) -> LocalBlob:
+        return LocalBlob(self, name, generation)
+
+    def get_blob(self, name: str):
+        blob = LocalBlob(self, name)
+        return blob.reload() if blob.exists() else None
+
+    def list_blobs(self, prefix: str = None, delimiter: str = None, max_results: int = None,
+                   page_token: str = None, page_size: int = 1000, include_temp: bool = False, **kwargs):
+        """
+        Sorted listing with GCS paging semantics. `include_temp` also
+        returns in-progress / abandoned *.uploading files (inventory only).
+        """
+        prefix = prefix or ""
+        top = os.path.join(self.root, *prefix.split("/")[:-1])
+        names = []
+        for dirpath, _, files in os.walk(top):
+            for fname in files:
+                if fname.endswith(".uploading") and not include_temp:
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, fname), self.root).replace(os.sep, "/")
+                if name.startswith(prefix) and (page_token is None or name > page_token):
+                    names.append(name)
+        names.sort()
+
+        prefixes = set()
+        if delimiter:
+            direct = []
+            for name in names:
+                cut = name.find(delimiter, len(prefix))
+                if cut < 0:
+                    direct.append(name)
+                else:
+                    prefixes.add(name[:cut + len(delimiter)])
+            names = direct
+        if max_results is not None:
+            names = names[:max_results]
+        return LocalBlobIterator(self, names, prefixes, page_size)
+
+
+# ============================================================
+# 🔹 Pooled Storage Client
+# ============================================================
+def _enlarge_connection_pool(bucket, pool_size: int):
+    """
+    google-cloud-storage talks HTTP through a requests session; its default
+    adapter keeps only 10 connections, which parallel chunk downloads exhaust.
+    """
+    session = getattr(getattr(bucket, "client", None), "_http", None)
+    if session is None or not hasattr(session, "mount"):
+        return
+    from requests.adapters import HTTPAdapter
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+class StorageClient:
+    """
+    Download layer shared by the model / dataset loaders.
+    Blobs larger than `chunk_size` are fetched as parallel byte ranges.
+    """
+
+    def __init__(self, bucket, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_workers: int = DEFAULT_MAX_WORKERS, history: int = 200):
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kc-storage")
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+        _enlarge_connection_pool(bucket, max_workers * 2)
+
+    # --------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------
+    def _ranges(self, size: int):
+        return [(start, min(start + self.chunk_size, size) - 1)
+                for start in range(0, size, self.chunk_size)]
+
+    def _fetch_range(self, name: str, generation, start: int, end: int) -> bytes:
+        # Fresh blob handle per thread, pinned to the generation seen in the
+        # metadata so ranges can't be stitched from two uploads (checksums
+        # don't apply to partial reads)
+        blob = self.bucket.blob(name, generation=generation)
+        return blob.download_as_bytes(start=start, end=end, checksum=None)
+
+    def _record(self, name: str, size: int, seconds: float, chunks: int, generation=None) -> dict:
+        stats = {
+            "name": name,
+            "generation": generation,
+            "bytes": size,
+            "seconds": round(seconds, 4),
+            "throughput_mb_s": round(size / (1024 * 1024) / seconds, 2) if seconds > 0 else None,
+            "chunks": chunks,
+        }
+        with self._lock:
+            self._history.append(stats)
+        print(f"📥 {name} → {size} bytes in {seconds:.2f}s "
+              f"({stats['throughput_mb_s']} MB/s, {chunks} chunk(s))")
+        return stats
+
+    def _metadata(self, name: str):
+        blob = self.bucket.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(f"❌ Blob not found in storage: {name}")
+        return blob
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def exists(self, name: str) -> bool:
+        return self.bucket.blob(name).exists()
+
+    def generation(self, name: str):
+        """Current generation of a blob (metadata only), or None if missing."""
+        blob = self.bucket.get_blob(name)
+        return blob.generation if blob is not None else None
+
+    def download(self, name: str, dest_path: str) -> dict:
+        """Downloads a blob to `dest_path`; returns per-download stats."""
+        with stage("download"):
+            return self._download(name, dest_path)
+
+    def _download(self, name: str, dest_path: str) -> dict:
+        start_time = time.perf_counter()
+        blob = self._metadata(name)
+        size = int(blob.size or 0)
+
+        if size <= self.chunk_size:
+            blob.download_to_filename(dest_path)
+            return self._record(name, size, time.perf_counter() - start_time, 1, blob.generation)
+
+        ranges = self._ranges(size)
+        with open(dest_path, "wb") as f:
+            f.truncate(size)
+
+        def fetch_into_file(byte_range):
+            start, end = byte_range
+            data = self._fetch_range(name, blob.generation, start, end)
+            with open(dest_path, "r+b") as out:
+                out.seek(start)
+                out.write(data)
+
+        list(self._pool.map(fetch_into_file, ranges))
+        return self._record(name, size, time.perf_counter() - start_time, len(ranges), blob.generation)
+
+    def download_bytes(self, name: str) -> bytes:
+        """Downloads a blob into memory (chunked in parallel when large)."""
+        with stage("download"):
+            return self._download_bytes(name)
+
+    def _download_bytes(self, name: str) -> bytes:
+        start_time = time.perf_counter()
+        blob = self._metadata(name)
+        size = int(blob.size or 0)
+
+        if size <= self.chunk_size:
+            data = blob.download_as_bytes()
+            self._record(name, len(data), time.perf_counter() - start_time, 1, blob.generation)
+            return data
+
+        ranges = self._ranges(size)
+        parts = self._pool.map(lambda r: self._fetch_range(name, blob.generation, *r), ranges)
+        data = b"".join(parts)
+        self._record(name, len(data), time.perf_counter() - start_time, len(ranges), blob.generation)
+        return data
+
+    def prefetch(self, names, dest_dir: str) -> list:
+        """
+        Downloads several blobs concurrently into `dest_dir`.
+        Each blob still chunks itself, so prefetch uses its own small pool.
+        """
+        os.makedirs(dest_dir, exist_ok=True)
+
+        def fetch(name):
+            dest = os.path.join(dest_dir, name.replace("/", "__"))
+            try:
+                stats = self.download(name, dest)
+                return {**stats, "path": dest}
+            except Exception as e:
+                print(f"⚠️ Prefetch failed for {name} → {e}")
+                return {"name": name, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=min(len(names), 4) or 1) as pool:
+            return list(pool.map(fetch, names))
+
+    def recent_downloads(self) -> list:
+        with self._lock:
+            return list(self._history)
+
+
+# ============================================================
+# 🧪 Offline Benchmark (local bucket)
+# ============================================================
+def benchmark(root: str, size_mb: int = 64, chunk_mb: int = 8, workers: int = 8) -> dict:
+    bucket = LocalBucket(root)
+    name = "bench/artifact.bin"
+    blob = bucket.blob(name)
+    if not blob.exists() or blob.reload().size != size_mb * 1024 * 1024:
+        print(f"🧪 Writing {size_mb} MB synthetic artifact...")
+        blob.upload_from_string(os.urandom(size_mb * 1024 * 1024))
+
+    dest = os.path.join(root, "bench_download.bin")
+    single = StorageClient(bucket, chunk_size=size_mb * 1024 * 1024 + 1, max_workers=1).download(name, dest)
+    chunked = StorageClient(bucket, chunk_size=chunk_mb * 1024 * 1024, max_workers=workers).download(name, dest)
+    os.remove(dest)
+    return {"single": single, "chunked": chunked}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KeyCrypt storage layer utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("bench", help="Single vs chunked download on a local bucket")
+    b.add_argument("--root", required=True)
+    b.add_argument("--size-mb", type=int, default=64)
+    b.add_argument("--chunk-mb", type=int, default=8)
+    b.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    p = sub.add_parser("prefetch", help="Concurrently download blobs via get_storage()")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--dest", default="prefetch_cache")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(benchmark(args.root, args.size_mb, args.chunk_mb, args.workers))
+    else:
+        from server.firebase_client import get_storage
+        for row in get_storage().prefetch(args.names, args.dest):
+            print(row)
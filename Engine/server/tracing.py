@@ -0,0 +1,369 @@
+"""
+============================================================
+🧵 KeyCrypt — Request Tracing & On-demand Profiling
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ span("name") / @traced → nested timing spans (contextvars,
+  so they follow requests into the threadpool)
+✔ TracingMiddleware → one root span per HTTP request; the
+  span tree is logged when a request is slower than
+  KEYCRYPT_SLOW_TRACE_MS (default 1000)
+✔ Admin-gated profiling of a single request:
+    ?profile=cprofile | sample   +   X-Admin-Token header
+  (KEYCRYPT_ADMIN_TOKEN must be set, otherwise disabled)
+✔ Profiles kept in memory (last KEYCRYPT_PROFILE_KEEP)
+  and downloadable via GET /admin/profiles/{id}
+============================================================
+"""
+
+import io
+import os
+import sys
+import hmac
+import time
+import uuid
+import marshal
+import pstats
+import cProfile
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import OrderedDict, Counter
+from urllib.parse import parse_qs
+
+SLOW_TRACE_MS = float(os.getenv("KEYCRYPT_SLOW_TRACE_MS", "1000"))
+PROFILE_KEEP = int(os.getenv("KEYCRYPT_PROFILE_KEEP", "20"))
+SAMPLE_INTERVAL_S = float(os.getenv("KEYCRYPT_PROFILE_SAMPLE_MS", "5")) / 1000
+PROFILE_KINDS = ("cprofile", "sample")
+
+_current_span = ContextVar("keycrypt_span", default=None)
+_current_profile = ContextVar("keycrypt_profile", default=None)
+
+
+# ============================================================
+# 🔹 Spans
+# ============================================================
+class Span:
+    __slots__ = ("name", "attrs", "start", "end", "children", "thread", "error")
+
+    def __init__(self, name: str, attrs: dict = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+        self.thread = threading.current_thread().name
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "ms": round(self.duration_ms, 2),
+            "thread": self.thread,
+            "attrs": self.attrs,
+            "error": self.error,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+    def format_tree(self, indent: int = 0) -> str:
+        label = "  " * indent + self.name
+        extra = " ".join(f"{k}={v}" for k, v in self.attrs.items())
+        line = f"{label:<48} {self.duration_ms:>9.1f} ms  [{self.thread}] {extra}".rstrip()
+        if self.error:
+            line += f"  ❌ {self.error}"
+        return "\n".join([line] + [c.format_tree(indent + 1) for c in self.children])
+
+
+def current_span():
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, root: bool = True, profile: bool = True, **attrs):
+    """
+    Opens a child span of the current one. Without a parent, a new root is
+    started (root=True) or nothing is recorded (root=False, used by stage()).
+    profile=False keeps the span out of an active profiling session (the
+    middleware's root span lives on the event loop, not in the worker).
+    """
+    parent = _current_span.get()
+    if parent is None and not root:
+        yield None
+        return
+
+    node = Span(name, attrs)
+    if parent is not None:
+        parent.children.append(node)
+    token = _current_span.set(node)
+
+    # The outermost span in a worker thread owns that thread's profiler
+    session = _current_profile.get()
+    owns_thread = profile and session is not None and session.enter_thread()
+
+    try:
+        yield node
+    except BaseException as e:
+        node.error = type(e).__name__
+        raise
+    finally:
+        if owns_thread:
+            session.exit_thread()
+        node.end = time.perf_counter()
+        _current_span.reset(token)
+        if parent is None:
+            log_if_slow(node)
+
+
+def traced(name: str = None):
+    """Decorator form of span(); defaults to the function name."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_if_slow(root: Span, threshold_ms: float = None):
+    threshold_ms = SLOW_TRACE_MS if threshold_ms is None else threshold_ms
+    if root.duration_ms >= threshold_ms:
+        print(f"🐢 Slow trace ({root.duration_ms:.0f} ms ≥ {threshold_ms:.0f} ms)\n{root.format_tree()}")
+
+
+# ============================================================
+# 🔹 Profiling Sessions
+# ============================================================
+class ProfileSession:
+    """
+    One profiled request. cProfile only sees the thread it was enabled in,
+    so every thread that enters a span under this request gets its own
+    profiler; the sampler instead watches all registered thread ids.
+    """
+
+    def __init__(self, kind: str, label: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.label = label
+        self.created = time.time()
+        self._lock = threading.Lock()
+        self._depth = {}            # thread id → nested span count
+        self._profilers = {}        # thread id → cProfile.Profile
+        self._finished = []         # disabled profilers (threads can be reused)
+        self._stacks = Counter()    # collapsed stack → samples
+        self._samples = 0
+        self._stop = threading.Event()
+        self._sampler = None
+
+    # --------------------------------------------------------
+    # Thread registration (called from span())
+    # --------------------------------------------------------
+    def enter_thread(self) -> bool:
+        tid = threading.get_ident()
+        with self._lock:
+            depth = self._depth.get(tid, 0)
+            self._depth[tid] = depth + 1
+            if depth:
+                return True
+            if self.kind == "cprofile":
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # Another profiler is already active in this thread
+                    return True
+                self._profilers[tid] = profiler
+        return True
+
+    def exit_thread(self):
+        tid = threading.get_ident()
+        with self._lock:
+            self._depth[tid] -= 1
+            if self._depth[tid]:
+                return
+            del self._depth[tid]
+            profiler = self._profilers.pop(tid, None)
+        if profiler is not None:
+            profiler.disable()
+            with self._lock:
+                self._finished.append(profiler)
+
+    # --------------------------------------------------------
+    # Sampling profiler
+    # --------------------------------------------------------
+    def _sample_loop(self):
+        while not self._stop.wait(SAMPLE_INTERVAL_S):
+            with self._lock:
+                tids = list(self._depth)
+            frames = sys._current_frames()
+            for tid in tids:
+                frame = frames.get(tid)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[";".join(reversed(stack))] += 1
+                    self._samples += 1
+
+    def start(self):
+        if self.kind == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name=f"profile-{self.id}", daemon=True)
+            self._sampler.start()
+
+    def finish(self) -> dict:
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+
+        if self.kind == "cprofile":
+            with self._lock:
+                profilers = list(self._finished)
+            if profilers:
+                stats = pstats.Stats(profilers[0])
+                for extra in profilers[1:]:
+                    stats.add(extra)
+                data = marshal.dumps(stats.stats)     # same bytes as dump_stats()
+            else:
+                data = b""
+            return self._record(data, "application/octet-stream", f"{self.id}.prof",
+                                threads=len(profilers))
+
+        # Collapsed stacks → flamegraph.pl / speedscope compatible
+        lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+        data = ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+        return self._record(data, "text/plain", f"{self.id}.folded",
+                            samples=self._samples, interval_ms=SAMPLE_INTERVAL_S * 1000)
+
+    def _record(self, data: bytes, content_type: str, filename: str, **extra) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "created": self.created,
+            "bytes": len(data),
+            "content_type": content_type,
+            "filename": filename,
+            "data": data,
+            **extra,
+        }
+
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def store_profile(record: dict):
+    with _profiles_lock:
+        _profiles[record["id"]] = record
+        while len(_profiles) > PROFILE_KEEP:
+            _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str):
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def list_profiles():
+    with _profiles_lock:
+        return [{k: v for k, v in r.items() if k != "data"} for r in _profiles.values()]
+
+
+def profile_as_text(record: dict, limit: int = 40) -> str:
+    """Human-readable view: top cumulative functions / hottest stacks."""
+    if record["kind"] == "cprofile":
+        if not record["data"]:
+            return "no profiled threads\n"
+        stats = pstats.Stats(_MarshalledStats(record["data"]), stream=io.StringIO())
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stats.stream.getvalue()
+    lines = record["data"].decode("utf-8").splitlines()[:limit]
+    return "\n".join(lines) + "\n"
+
+
+class _MarshalledStats:
+    """Lets pstats.Stats load a profile straight from bytes."""
+
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+# ============================================================
+# 🔹 Admin Gate
+# ============================================================
+def admin_token_ok(token) -> bool:
+    expected = os.getenv("KEYCRYPT_ADMIN_TOKEN", "")
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(str(token).encode(), expected.encode())
+
+
+# ============================================================
+# 🔹 ASGI Middleware (root span + profiling)
+# ============================================================
+class TracingMiddleware:
+    """
+    Opens the root span for each HTTP request. With ?profile=cprofile|sample
+    and a valid X-Admin-Token the request is profiled; the response carries
+    X-Profile-Id for GET /admin/profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = self._profile_session(scope)
+        if session is not None:
+            session.start()
+
+        async def send_wrapper(message):
+            if session is not None and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", session.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profile_token = _current_profile.set(session)
+        try:
+            with span(f"{scope.get('method', '')} {scope['path']}", profile=False) as root:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    template = getattr(scope.get("route"), "path", None)
+                    if template:
+                        root.attrs["route"] = scope.get("root_path", "") + template
+        finally:
+            _current_profile.reset(profile_token)
+            if session is not None:
+                record = session.finish()
+                store_profile(record)
+                print(f"🔬 Stored {record['kind']} profile {record['id']} ({record['bytes']} bytes) → {record['label']}")
+
+    @staticmethod
+    def _profile_session(scope):
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        kind = (query.get("profile") or [None])[0]
+        if kind not in PROFILE_KINDS:
+            return None
+        token = dict(scope.get("headers", [])).get(b"x-admin-token", b"").decode("latin-1")
+        if not admin_token_ok(token):
+            # Silently ignored: never reveal the hook to non-admins
+            return None
+        return ProfileSession(kind, f"{scope.get('method', '')} {scope['path']}")
@@ -10,7 +10,9 @@ Author: Shubham Patel (NIT Raipur)
 ============================================================
 """
 
+import os
 import joblib
+import tempfile
 import pandas as pd
 from fastapi import FastAPI, HTTPException, Path
 from sklearn.ensemble import RandomForestClassifier
@@ -20,6 +22,8 @@ from sklearn.metrics import accuracy_score
 
 from .firebase_model import load_strength_model_for_user, upload_trained_model
 from .firebase_dataset import fetch_kaggle_dataset, get_user_features
+from .metrics import RETRAINS_IN_FLIGHT
+from .tracing import traced
 
 # ============================================================
 # 🔹 FastAPI App
@@ -59,12 +63,15 @@ def auto_label_unlabeled_data(df: pd.DataFrame, model_data: dict):
 # 🔹 Train Personalized Model
 # ============================================================
 
+@traced()
 def train_user_model(user_id: str):
     print(f"🚀 Starting personalized model training for → {user_id}")
 
     # 1️⃣ Load Kaggle + User data
     kaggle_df = fetch_kaggle_dataset()
-    user_df = get_user_features(user_id)
+    # Always a fresh read: a cached frame (warm-up / another worker's
+    # ingest) can predate rows written moments before this retrain
+    user_df = get_user_features(user_id, max_age_s=0)
     if user_df.empty:
         print("⚠️ No user data found, using Kaggle data only.")
         user_df = pd.DataFrame()
@@ -109,9 +116,15 @@ def train_user_model(user_id: str):
 
     # 5️⃣ Save + upload
     model_dict = {"model": model, "scaler": scaler, "features": features, "accuracy": acc}
-    local_path = f"user_{user_id}_model.pkl"
-    joblib.dump(model_dict, local_path)
-    upload_trained_model(user_id, model_dict, local_path)
+    # Unique local file: concurrent retrains of one user must not share it
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f"_user_{user_id}_model.pkl") as tmp:
+        local_path = tmp.name
+    try:
+        joblib.dump(model_dict, local_path)
+        upload_trained_model(user_id, model_dict, local_path)
+    finally:
+        if os.path.exists(local_path):
+            os.remove(local_path)
 
     print(f"✅ Training completed and model uploaded for → {user_id}")
     return {"user_id": user_id, "accuracy": acc, "samples": len(X)}
@@ -130,7 +143,8 @@ def retrain_with_param(user_id: str = Path(..., description="Firebase user ID"))
     """
     try:
         print(f"🔔 API retrain request for user_id: {user_id}")
-        result = train_user_model(user_id)
+        with RETRAINS_IN_FLIGHT.track_inprogress():
+            result = train_user_model(user_id)
         return {
             "status": "success",
             "message": f"Retraining completed for {user_id}",
@@ -0,0 +1,208 @@
+"""
+============================================================
+🔐 KeyCrypt — Personalized Model Cache (Stale-While-Revalidate)
+Author: Shubham Patel (NIT Raipur)
+============================================================
+✔ resolve(user_id) never waits on storage:
+    cached personalized model → served (even if stale)
+    nothing cached yet        → base model served
+  and the newer personalized model loads in the background
+✔ Revalidation = one metadata call; the pickle is only
+  downloaded when the storage generation changed
+✔ Swap is a single dict assignment under the lock, so a
+  request sees either the old or the new model, never a mix
+✔ invalidate(user_id) after a retrain → reload right away
+✔ Bounded LRU (KEYCRYPT_USER_MODEL_CACHE_SIZE, default 256),
+  revalidated every KEYCRYPT_MODEL_REVALIDATE_S (default 60)
+============================================================
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import register_collector, MODEL_CACHE_BYTES
+
+
+class UserModelCache:
+    def __init__(self, fetch, probe, base_loader, max_users: int = 256,
+                 revalidate_s: float = 60.0, max_workers: int = 2):
+        """
+        fetch(user_id)       → (model_data, stats) or None (no personalized model)
+        probe(user_id)       → storage generation or None
+        base_loader()        → base model_data (cached by the caller)
+        """
+        self._fetch = fetch
+        self._probe = probe
+        self._base_loader = base_loader
+        self.max_users = max_users
+        self.revalidate_s = revalidate_s
+        self.max_workers = max_workers
+        self._entries = OrderedDict()    # user_id → {"model", "generation", "checked", "bytes", "stale"}
+        self._inflight = set()
+        self._rerun = set()              # invalidated while a refresh was running
+        self._lock = threading.Lock()
+        self._pool = None
+        self._counts = {"user": 0, "base": 0, "stale_served": 0, "refreshes": 0,
+                        "loads": 0, "swaps": 0, "errors": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counts[key] += 1
+
+    # --------------------------------------------------------
+    # Background refresh
+    # --------------------------------------------------------
+    def _executor(self):
+        # Created on first use, so a pre-fork parent never owns its threads
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kc-user-models")
+        return self._pool
+
+    def _schedule(self, user_id: str) -> bool:
+        with self._lock:
+            if user_id in self._inflight:
+                return False
+            self._inflight.add(user_id)
+            executor = self._executor()
+        executor.submit(self._refresh, user_id)
+        return True
+
+    def _refresh(self, user_id: str):
+        try:
+            self._count("refreshes")
+            generation = self._probe(user_id)
+            with self._lock:
+                current = self._entries.get(user_id)
+
+            if generation is not None and current is not None and current["generation"] == generation \
+                    and current["model"] is not None:
+                entry = {**current, "checked": time.monotonic(), "stale": False}
+            elif generation is None:
+                entry = {"model": None, "generation": None, "checked": time.monotonic(), "bytes": 0, "stale": False}
+            else:
+                loaded = self._fetch(user_id)
+                self._count("loads")
+                if loaded is None:      # deleted between probe and download
+                    entry = {"model": None, "generation": None, "checked": time.monotonic(),
+                             "bytes": 0, "stale": False}
+                else:
+                    model_data, stats = loaded
+                    entry = {"model": model_data, "generation": stats.get("generation", generation),
+                             "checked": time.monotonic(), "bytes": stats.get("bytes", 0), "stale": False}
+
+            with self._lock:
+                previous = self._entries.get(user_id)
+                if previous is None or previous["model"] is not entry["model"]:
+                    self._counts["swaps"] += 1
+                self._entries[user_id] = entry          # atomic swap
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+                MODEL_CACHE_BYTES.set(sum(e["bytes"] for e in self._entries.values()), model="strength_users")
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Background model refresh failed for {user_id} → {e}")
+        finally:
+            with self._lock:
+                rerun = user_id in self._rerun
+                self._rerun.discard(user_id)
+                if not rerun:
+                    self._inflight.discard(user_id)
+            if rerun:
+                # Still in flight → no window where the user looks settled
+                self._executor().submit(self._refresh, user_id)
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def resolve(self, user_id: str):
+        """→ (model_data, "user" | "base") without waiting on storage."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            needs_refresh = entry is None or entry["stale"] or now - entry["checked"] >= self.revalidate_s
+
+        if needs_refresh:
+            self._schedule(user_id)
+
+        if entry is not None and entry["model"] is not None:
+            self._count("user")
+            if entry["stale"]:
+                self._count("stale_served")
+            return entry["model"], "user"
+
+        self._count("base")
+        return self._base_loader(), "base"
+
+    def prefetch(self, user_id: str) -> bool:
+        """Starts a background load unless the user is already fresh / loading."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            fresh = entry is not None and not entry["stale"] and \
+                time.monotonic() - entry["checked"] < self.revalidate_s
+        return False if fresh else self._schedule(user_id)
+
+    def state(self, user_id: str) -> str:
+        """cold | loading | warm | stale | no_model"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            loading = user_id in self._inflight
+        if entry is None:
+            return "loading" if loading else "cold"
+        if entry["stale"] or loading:
+            return "stale" if entry["model"] is not None else "loading"
+        return "warm" if entry["model"] is not None else "no_model"
+
+    def invalidate(self, user_id: str):
+        """New model uploaded → keep serving the old one, reload now."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries[user_id] = {**entry, "stale": True}
+            if user_id in self._inflight:
+                # The running refresh may have probed the old generation
+                self._rerun.add(user_id)
+                return
+        self._schedule(user_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = list(self._entries.values())
+            inflight = len(self._inflight)
+            counts = dict(self._counts)
+        served = counts["user"] + counts["base"]
+        return {
+            "users": len(entries),
+            "with_model": sum(1 for e in entries if e["model"] is not None),
+            "max_users": self.max_users,
+            "revalidate_s": self.revalidate_s,
+            "loading": inflight,
+            "served": counts,
+            "user_model_ratio": round(counts["user"] / served, 4) if served else None,
+            "approx_bytes": sum(e["bytes"] for e in entries),
+        }
+
+
+def from_env(fetch, probe, base_loader) -> UserModelCache:
+    return UserModelCache(
+        fetch, probe, base_loader,
+        max_users=int(os.getenv("KEYCRYPT_USER_MODEL_CACHE_SIZE", "256")),
+        revalidate_s=float(os.getenv("KEYCRYPT_MODEL_REVALIDATE_S", "60")),
+    )
+
+
+def register_metrics(cache: UserModelCache):
+    @register_collector
+    def _user_model_cache_metrics():
+        stats = cache.stats()
+        yield ("keycrypt_user_model_resolutions_total", "counter",
+               "Strength model resolutions by what was served",
+               [({"served": k}, v) for k, v in stats["served"].items() if k in ("user", "base", "stale_served")])
+        yield ("keycrypt_user_model_cache_users", "gauge", "Users with a cached model entry",
+               [({}, stats["users"])])
+        yield ("keycrypt_user_model_loads_total", "counter", "Background personalized model downloads",
+               [({}, stats["served"]["loads"])])
@@ -0,0 +1,42 @@
+"""
+Shared fixtures: a fresh in-memory Firestore per test (the same
+stand-in the benchmarks use), and a manual clock.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import pytest
+
+from server import firebase_client
+
+
+@pytest.fixture
+def local_db(monkeypatch):
+    monkeypatch.setenv("KEYCRYPT_LOCAL_FIRESTORE", "1")
+    firebase_client._clients.pop("local_db", None)
+    yield firebase_client.get_db()
+    firebase_client._clients.pop("local_db", None)
+
+
+class ManualClock:
+    """Stands in for the `time` module; only moves when told to."""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
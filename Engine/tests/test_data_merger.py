@@ -0,0 +1,56 @@
+"""
+Dataset merger: conflict rules on duplicated passwords, and an
+end-to-end merge across CSV / TSV inputs that needs several partitions.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import pandas as pd
+import pytest
+
+from scriptsss.data_merger import resolve, merge
+
+# (password, strength) in arrival order
+ROWS = [("abc", 2), ("abc", 0), ("abc", 0), ("tie", 1), ("tie", 2), ("solo", 1), ("same", 2), ("same", 2)]
+
+
+def labels(rule):
+    group = pd.DataFrame(ROWS, columns=["password", "strength"])
+    group["order"] = range(len(group))
+    return dict(zip(*resolve(group, rule)[["password", "strength"]].to_numpy().T))
+
+
+@pytest.mark.parametrize("rule, expected", [
+    ("max", {"abc": 2, "tie": 2, "solo": 1, "same": 2}),
+    ("min", {"abc": 0, "tie": 1, "solo": 1, "same": 2}),
+    ("first", {"abc": 2, "tie": 1, "solo": 1, "same": 2}),
+    ("majority", {"abc": 0, "tie": 1, "solo": 1, "same": 2}),    # tie → lower label
+    ("drop", {"solo": 1, "same": 2}),
+])
+def test_conflict_rules(rule, expected):
+    assert labels(rule) == expected
+
+
+def test_unknown_rule_rejected():
+    with pytest.raises(ValueError):
+        resolve(pd.DataFrame(ROWS, columns=["password", "strength"]), "average")
+
+
+def test_merge_dedupes_across_files_and_partitions(tmp_path):
+    (tmp_path / "a.csv").write_text("password,strength\nhunter2,0\nNULL,1\nTr0ub4dor,2\nbad,9\nqwerty,1\n")
+    (tmp_path / "b.tsv").write_text("pwd\tlabel\nhunter2\tweak\nnan\tmedium\ncorrect horse\tstrong\n")
+    (tmp_path / "leaked.csv").write_text("password\nhunter2\nqwerty\n")
+
+    out = tmp_path / "merged"
+    report = merge([str(tmp_path / "a.csv"), str(tmp_path / "b.tsv"), f"{tmp_path / 'leaked.csv'}=0"],
+                   str(out), rule="drop", partitions=4, shard_rows=3)
+
+    merged = pd.concat(pd.read_csv(s["path"], dtype={"password": str}, keep_default_na=False)
+                       for s in report["shards"])
+    assert dict(zip(merged["password"], merged["strength"])) == {
+        "hunter2": 0, "NULL": 1, "Tr0ub4dor": 2, "nan": 1, "correct horse": 2}
+    assert report["rows_read"] == 10 and report["rows_valid"] == 9
+    assert report["conflicting_passwords"] == 1 and report["dropped_conflicts"] == 1
+    assert report["rows_unique"] == 5 and report["duplicates_removed"] == 3
+    assert [s["rows"] for s in report["shards"]] == [3, 2]
+    assert not (out / "_partitions").exists()
@@ -0,0 +1,117 @@
+"""
+Bulk ingestion cursors: keys are stamped per batch at commit time,
+reads hold back unsettled rows, and resuming from any handed-out
+cursor (POST or GET) never skips a row.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import scripts.feature_ingest as ingest
+
+SCHEMA = ["length", "entropy"]
+SETTLE_S = 10.0
+
+
+@pytest.fixture
+def client(local_db, clock, monkeypatch):
+    monkeypatch.setattr(ingest, "time", clock)
+    monkeypatch.setattr(ingest, "_last_us", 0)
+    monkeypatch.setattr(ingest, "INGEST_SETTLE_S", SETTLE_S)
+    monkeypatch.setattr(ingest, "FIRESTORE_BATCH_LIMIT", 2)
+    monkeypatch.setattr(ingest, "feature_schema", lambda: list(SCHEMA))
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(ingest, "_pool", pool)
+    yield TestClient(ingest.app)
+    pool.shutdown()
+
+
+def rows(n, start=0):
+    return [{"length": start + i, "entropy": 1.5} for i in range(n)]
+
+
+def read_all(client, clock, since=None):
+    """Drains settled rows from `since` → (lengths seen, final cursor)."""
+    seen = []
+    while True:
+        params = {"limit": 3, **({"since": since} if since else {})}
+        page = client.get("/u1", params=params).json()
+        seen += [r["length"] for r in page["rows"]]
+        since = page["cursor"]
+        if not page["more"]:
+            return seen, since
+        if not page["rows"]:
+            clock.advance(SETTLE_S)
+
+
+def test_keys_are_stamped_when_each_batch_commits(client, clock, monkeypatch):
+    commit = ingest._commit
+
+    def slow_commit(*args):
+        commit(*args)
+        clock.advance(SETTLE_S)             # whole request runs far past the settle window
+
+    monkeypatch.setattr(ingest, "_commit", slow_commit)
+    start = clock.time()
+    body = client.post("/u1/bulk", json={"rows": rows(6)}).json()
+    assert body["written"] == 6 and body["batches"] == 3
+
+    docs = sorted(d.to_dict()[ingest.FEATURE_CURSOR_FIELD] for d in ingest.user_features_ref("u1").stream())
+    stamps = sorted({int(k.split("-")[0]) / 1e6 for k in docs})
+    assert stamps == pytest.approx([start, start + SETTLE_S, start + 2 * SETTLE_S], abs=1e-3)
+
+
+def test_post_cursor_resumes_without_skipping(client, clock):
+    first = client.post("/u1/bulk", json={"rows": rows(5)}).json()
+    clock.advance(1)
+    client.post("/u1/bulk", json={"rows": rows(4, start=100)})
+    assert first["cursor"] is not None
+
+    clock.advance(SETTLE_S + 1)
+    seen, cursor = read_all(client, clock, since=first["cursor"])
+    assert seen == [0, 1, 2, 3, 4, 100, 101, 102, 103]
+
+    again = client.get("/u1", params={"since": cursor}).json()
+    assert again["rows"] == [] and again["more"] is False
+
+
+def test_unsettled_rows_are_held_back(client, clock):
+    client.post("/u1/bulk", json={"rows": rows(3)})
+    page = client.get("/u1").json()
+    assert page["rows"] == [] and page["held_back"] == 3 and page["more"] is True
+    assert page["cursor"] is None
+
+    clock.advance(SETTLE_S + 1)
+    page = client.get("/u1").json()
+    assert [r["length"] for r in page["rows"]] == [0, 1, 2]
+    assert page["held_back"] == 0 and page["more"] is False
+
+
+def test_full_page_reports_more_even_when_held_back(client, clock):
+    client.post("/u1/bulk", json={"rows": rows(2)})
+    clock.advance(SETTLE_S + 1)
+    client.post("/u1/bulk", json={"rows": rows(2, start=10)})
+
+    page = client.get("/u1", params={"limit": 3}).json()
+    assert [r["length"] for r in page["rows"]] == [0, 1]
+    assert page["held_back"] == 1 and page["more"] is True
+
+
+def test_invalid_rows_rejected_and_failed_rows_mapped(client, monkeypatch):
+    commit = ingest._commit
+
+    def flaky_commit(db, ref, batch_rows, offset):
+        if offset == 2:
+            raise RuntimeError("deadline exceeded")
+        commit(db, ref, batch_rows, offset)
+
+    monkeypatch.setattr(ingest, "_commit", flaky_commit)
+    sent = [{"length": 1}, *rows(5)]        # request position 0 is missing "entropy"
+    body = client.post("/u1/bulk", json={"rows": sent}).json()
+    assert body["rejected"] == 1 and body["errors"][0]["index"] == 0
+    assert body["written"] == 3 and body["failed_rows"] == [3, 4]
+    assert client.post("/u1/bulk", json={"rows": sent, "strict": True}).status_code == 422
@@ -0,0 +1,35 @@
+"""
+Int8 comparison inputs: windows come from the encoded corpus when one
+exists, random token ids only otherwise.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import json
+
+from scripts.gru_int8 import _sample_windows
+from scriptsss.sequence_dataset import encode_passwords
+
+PASSWORDS = ["Tr0ub4dor&3", "correcthorse", "x9!Kq#2mLp"] * 20
+
+
+def test_windows_are_real_corpus_contexts(tmp_path):
+    chars = sorted(set("".join(PASSWORDS)))
+    char_to_idx = {c: i + 1 for i, c in enumerate(chars)}
+    vocab = tmp_path / "vocab.json"
+    vocab.write_text(json.dumps(char_to_idx))
+    encode_passwords(PASSWORDS, char_to_idx, str(tmp_path / "strong_corpus"), str(vocab))
+
+    windows, source = _sample_windows(str(vocab), num_samples=50, seq_len=8)
+    assert source == f"corpus:{tmp_path / 'strong_corpus'}"
+    assert windows.shape == (50, 8)
+
+    idx_to_char = {i: c for c, i in char_to_idx.items()}
+    for row in windows:
+        context = "".join(idx_to_char[i] for i in row if i)
+        assert context and any(context in p for p in PASSWORDS)
+
+
+def test_random_windows_without_corpus(tmp_path):
+    windows, source = _sample_windows(None, num_samples=10, seq_len=8)
+    assert source == "random" and windows.shape == (10, 8)
@@ -0,0 +1,35 @@
+"""
+Policy construction must be valid by construction: every built
+candidate passes PasswordPolicy.check, even on tight policies.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import random
+import string
+import pytest
+
+from scripts.password_policy import PasswordPolicy, build_policy_candidates
+
+BASES = ["".join(random.Random(i).choice(string.ascii_lowercase) for _ in range(16)) for i in range(2000)]
+
+
+@pytest.mark.parametrize("policy, keywords", [
+    (PasswordPolicy(min_length=4, max_length=4), ["shubham"]),
+    (PasswordPolicy(min_length=4, max_length=4, max_keyword_share=1.0), ["Ab1!"]),
+    (PasswordPolicy(min_length=5, max_length=6, banned="aeiou@"), ["love", "2024"]),
+    (PasswordPolicy(min_length=2, max_length=2, required=["digit", "symbol"]), ["x"]),
+    (PasswordPolicy(min_length=12, max_length=20), ["alpha", "beta", "gamma"]),
+])
+def test_tight_policies_accept_every_candidate(policy, keywords):
+    policy.validate()
+    accepted, stats = build_policy_candidates(BASES, keywords, policy, random.Random(7))
+    assert stats["acceptance_rate"] == 1.0
+    assert all(policy.check(p) for p in accepted)
+
+
+def test_max_length_only_policy_is_valid():
+    from scripts.password_generator import policy_params
+
+    policy = policy_params(min_length=None, max_length=10, require=[], banned="", max_keyword_share=None)
+    assert (policy.min_length, policy.max_length) == (10, 10)
@@ -0,0 +1,43 @@
+"""
+Weak-pattern features are computed the same way for training rows
+and for predictor input that carries the plaintext.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+from scriptsss.data_loader import extract_password_features
+from server.pattern_features import PATTERN_FEATURES, pattern_features, resolve_pattern_features
+
+
+def test_training_rows_carry_pattern_features():
+    row = extract_password_features("P@ssw0rd1990")
+    assert set(PATTERN_FEATURES) <= set(row)
+    assert row["dictCoverage"] > 0 and row["dateRatio"] > 0
+
+
+def test_predictor_input_resolved_from_password():
+    resolved = resolve_pattern_features({"password": "qwerty2024", "length": 10, "keyboardWalkRatio": 0.0})
+    assert "password" not in resolved
+    assert {f: resolved[f] for f in PATTERN_FEATURES} == pattern_features("qwerty2024")
+    assert resolved["length"] == 10
+
+
+def test_predictor_input_without_password_is_untouched():
+    features = {"length": 10, "keyboardWalkRatio": 0.25}
+    assert resolve_pattern_features(features) is features
+
+
+def test_predict_vector_matches_training_vector():
+    from benchmarks.fixtures import build_strength_model
+    from scripts.strength_predictor import predict_with_model
+    from server.prediction_cache import feature_vector
+
+    model_data = build_strength_model(n_samples=200, n_estimators=5)
+    row = extract_password_features("1qaz2wsxDragon!")
+    client = {k: v for k, v in row.items() if k not in PATTERN_FEATURES and k != "label"}
+    with_password = predict_with_model(model_data, "base", "u1", {**client, "password": "1qaz2wsxDragon!"})
+    with_row = predict_with_model(model_data, "base", "u1", row)
+    assert with_password["cache_hit"] is False and with_row["cache_hit"] is True
+    assert with_password["confidence"] == with_row["confidence"]
+    assert feature_vector(resolve_pattern_features({**client, "password": "1qaz2wsxDragon!"}),
+                          model_data["features"]) == feature_vector(row, model_data["features"])
@@ -0,0 +1,72 @@
+"""
+Prediction cache: entries are keyed by model version, so callers on
+different versions of one model share the cache without evicting
+each other.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+from server.prediction_cache import PredictionCache, feature_vector, vector_digest
+
+FEATURES = ["length", "entropy"]
+
+
+def digest(**features):
+    return vector_digest(feature_vector(features, FEATURES))
+
+
+def test_alternating_versions_keep_their_entries():
+    cache = PredictionCache(max_entries=100)
+    d = digest(length=8, entropy=2.5)
+    cache.put("u1", "user:1", d, {"predicted_label": "Weak"})       # socket pinned to the old model
+    cache.put("u1", "user:2", d, {"predicted_label": "Medium"})     # HTTP callers on the new one
+
+    for _ in range(3):
+        assert cache.get("u1", "user:1", d) == {"predicted_label": "Weak"}
+        assert cache.get("u1", "user:2", d) == {"predicted_label": "Medium"}
+    stats = cache.stats()
+    assert stats["hits"] == 6 and stats["invalidations"] == 0
+    assert stats["entries"] == 2 and stats["versions"] == 2
+
+
+def test_new_version_never_serves_old_results():
+    cache = PredictionCache(max_entries=100)
+    d = digest(length=8, entropy=2.5)
+    cache.put("u1", "user:1", d, {"predicted_label": "Weak"})
+    assert cache.get("u1", "user:2", d) is None
+    assert cache.get("base", "user:1", d) is None
+
+
+def test_invalidate_drops_every_version_of_one_model():
+    cache = PredictionCache(max_entries=100)
+    d = digest(length=8, entropy=2.5)
+    for version in ("user:1", "user:2"):
+        cache.put("u1", version, d, {"predicted_label": "Weak"})
+    cache.put("base", "base:1", d, {"predicted_label": "Weak"})
+
+    cache.invalidate("u1")
+    assert cache.get("u1", "user:1", d) is None and cache.get("u1", "user:2", d) is None
+    assert cache.get("base", "base:1", d) is not None
+    assert cache.stats()["entries"] == 1 and cache.stats()["invalidations"] == 1
+
+
+def test_lru_bound_and_byte_accounting():
+    cache = PredictionCache(max_entries=3)
+    digests = [digest(length=n, entropy=1.0) for n in range(5)]
+    for d in digests[:3]:
+        cache.put("base", "base:1", d, {"predicted_label": "Weak"})
+    cache.get("base", "base:1", digests[0])                  # most recently used → survives
+    for d in digests[3:]:
+        cache.put("base", "base:1", d, {"predicted_label": "Weak"})
+
+    assert cache.get("base", "base:1", digests[0]) is not None
+    assert cache.get("base", "base:1", digests[1]) is None and cache.get("base", "base:1", digests[2]) is None
+    assert cache.stats()["entries"] == 3
+    cache.invalidate("base")
+    assert cache.stats()["approx_bytes"] == 0
+
+
+def test_non_numeric_features_have_no_vector():
+    assert feature_vector({"length": "8", "entropy": 2.5}, FEATURES) == (8.0, 2.5)
+    assert feature_vector({"length": "eight", "entropy": 2.5}, FEATURES) is None
+    assert feature_vector({"entropy": 2.5}, FEATURES) == (0.0, 2.5)
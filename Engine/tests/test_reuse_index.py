@@ -0,0 +1,90 @@
+"""
+Reuse index: LSH add / check / delete on one index, and cached
+indexes in separate workers (separate caches over the same Firestore)
+picking up each other's writes.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import pytest
+
+from server import reuse_index
+from server.reuse_index import ReuseIndex, ReuseIndexCache, save_sketches, delete_sketch
+
+KEY = b"k" * 32
+
+
+def test_near_duplicates_found_and_forgotten():
+    index = ReuseIndex("u1", key=KEY)
+    index.add("mail", "P@ssw0rd2024!")
+    index.add("bank", "correct horse battery staple")
+
+    hits = index.query("password2025!")["matches"]
+    assert [m["entry_id"] for m in hits] == ["mail"] and not hits[0]["exact"]
+
+    exact = index.query("P@ssw0rd2024!")["matches"]
+    assert exact[0] == {"entry_id": "mail", "similarity": 1.0, "exact": True}
+
+    assert index.remove("mail") is True and index.remove("mail") is False
+    assert index.query("password2025!")["matches"] == []
+    assert len(index) == 1
+
+
+def test_audit_groups_variations():
+    index = ReuseIndex("u1", key=KEY)
+    for entry_id, pwd in [("a", "summer2023!"), ("b", "Summer2023#"), ("c", "zq8#Lk2!vW0p"), ("d", "summer2023!")]:
+        index.add(entry_id, pwd)
+    report = index.audit()
+    assert report["groups"] == [{"entries": ["a", "b", "d"], "size": 3}]
+    assert report["exact_reuse_pairs"] == 1
+
+
+def test_sketch_from_another_key_is_ignored():
+    record = ReuseIndex("u1", key=KEY).sketch("hunter2")
+    assert ReuseIndex("u1", key=b"x" * 32).load_sketch("e", record) is False
+
+
+@pytest.fixture
+def workers(local_db, clock, monkeypatch):
+    monkeypatch.setattr(reuse_index, "time", clock)
+    monkeypatch.setattr(reuse_index, "user_key", lambda user_id: KEY)
+    first, second = ReuseIndexCache(revalidate_s=30), ReuseIndexCache(revalidate_s=30)
+    monkeypatch.setattr(reuse_index, "reuse_indexes", first)   # "this" worker's writes
+    return first, second
+
+
+def put(cache, user_id, entry_id, password):
+    save_sketches(user_id, {entry_id: cache.get(user_id).add(entry_id, password)})
+
+
+def test_other_worker_sees_put_and_delete_after_revalidation(workers, clock):
+    first, second = workers
+    assert second.get("u1").query("letmein123")["matches"] == []
+
+    put(first, "u1", "mail", "letmein123")
+    assert second.get("u1").query("letmein123")["matches"] == []     # still inside revalidate_s
+    clock.advance(31)
+    assert [m["entry_id"] for m in second.get("u1").query("letmein124")["matches"]] == ["mail"]
+
+    first.get("u1").remove("mail")
+    delete_sketch("u1", "mail")
+    clock.advance(31)
+    assert second.get("u1").query("letmein124")["matches"] == []
+    assert second.stats()["builds"] == 3
+
+
+def test_unchanged_vault_is_revalidated_not_rebuilt(workers, clock):
+    first, second = workers
+    put(first, "u1", "mail", "letmein123")
+    second.get("u1")
+    clock.advance(31)
+    second.get("u1")
+    assert second.stats()["builds"] == 1 and second.stats()["revalidations"] == 1
+
+
+def test_own_write_is_visible_at_once_and_rebuilt_at_next_check(workers, clock):
+    first, _ = workers
+    put(first, "u1", "mail", "letmein123")
+    assert len(first.get("u1")) == 1 and first.stats()["builds"] == 1
+    clock.advance(31)
+    assert len(first.get("u1")) == 1 and first.stats()["builds"] == 2
@@ -0,0 +1,43 @@
+"""
+Stage timings: one observation per stage per prediction, whether the
+result was computed or served from the prediction cache.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import pytest
+
+from benchmarks.fixtures import build_strength_model
+from scriptsss.data_loader import extract_password_features
+from scripts.strength_predictor import predict_with_model
+from server.metrics import STAGE_SECONDS
+
+
+@pytest.fixture(scope="module")
+def model_data():
+    return {**build_strength_model(n_samples=200, n_estimators=5), "version": "test-stages"}
+
+
+def stage_counts():
+    with STAGE_SECONDS._lock:
+        return {dict(k)["stage"]: v[2] for k, v in STAGE_SECONDS._values.items()}
+
+
+def observed(before: dict, name: str) -> int:
+    return stage_counts().get(name, 0) - before.get(name, 0)
+
+
+def test_uncached_prediction_observes_each_stage_once(model_data):
+    before = stage_counts()
+    result = predict_with_model(model_data, "base", "u1", extract_password_features("Tr0ub4dor&3x"))
+    assert result["cache_hit"] is False
+    assert {name: observed(before, name) for name in ("featurize", "frame", "scale", "predict")} == \
+        {"featurize": 1, "frame": 1, "scale": 1, "predict": 1}
+
+
+def test_cached_prediction_only_featurizes(model_data):
+    features = extract_password_features("correcthorse99")
+    predict_with_model(model_data, "base", "u1", features)
+    before = stage_counts()
+    assert predict_with_model(model_data, "base", "u1", features)["cache_hit"] is True
+    assert observed(before, "featurize") == 1 and observed(before, "predict") == 0
@@ -0,0 +1,130 @@
+"""
+Personalized model cache (stale-while-revalidate): resolve() never
+waits on storage, swaps are atomic, and an invalidate() that lands
+while a refresh is running triggers one more refresh.
+
+Run from Engine/:  python -m pytest -q tests
+"""
+
+import time
+import threading
+
+import pytest
+
+from server import user_model_cache as cache_module
+from server.user_model_cache import UserModelCache
+
+BASE = {"version": "base:1"}
+
+
+class Storage:
+    """Fake fetch / probe over generation → model; fetch can be held."""
+
+    def __init__(self):
+        self.generation = None
+        self.fetches = 0
+        self.hold = None                    # threading.Event → fetch waits on it
+        self.fetching = threading.Event()
+
+    def probe(self, user_id):
+        return self.generation
+
+    def fetch(self, user_id):
+        generation = self.generation
+        self.fetching.set()
+        if self.hold is not None:
+            self.hold.wait(5)
+        self.fetches += 1
+        if generation is None:
+            return None
+        return {"version": f"user:{generation}"}, {"generation": generation, "bytes": 10}
+
+
+@pytest.fixture
+def storage():
+    return Storage()
+
+
+@pytest.fixture
+def cache(storage, clock, monkeypatch):
+    monkeypatch.setattr(cache_module, "time", clock)
+    cache = UserModelCache(storage.fetch, storage.probe, lambda: BASE, revalidate_s=60)
+    yield cache
+    if cache._pool is not None:
+        cache._pool.shutdown(wait=True)
+
+
+def settle(cache, timeout: float = 5.0):
+    """Waits for background refreshes (including reruns) to finish."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with cache._lock:
+            if not cache._inflight:
+                return
+        time.sleep(0.005)
+    raise AssertionError("background refresh did not finish")
+
+
+def test_cold_user_gets_base_then_personalized(cache, storage):
+    storage.generation = 1
+    model, kind = cache.resolve("u1")
+    assert (model, kind) == (BASE, "base")
+    settle(cache)
+    model, kind = cache.resolve("u1")
+    assert (model["version"], kind) == ("user:1", "user")
+
+
+def test_stale_model_served_while_newer_loads(cache, storage, clock):
+    storage.generation = 1
+    cache.resolve("u1")
+    settle(cache)
+
+    storage.generation = 2
+    storage.hold = threading.Event()
+    clock.advance(61)                                  # past revalidate_s → background refresh
+    model, _ = cache.resolve("u1")
+    assert model["version"] == "user:1"                # answered at once, old model
+    assert storage.fetching.wait(5)
+    assert cache.resolve("u1")[0]["version"] == "user:1"
+
+    storage.hold.set()
+    settle(cache)
+    assert cache.resolve("u1")[0]["version"] == "user:2"
+    assert cache.stats()["served"]["swaps"] == 2
+
+
+def test_unchanged_generation_revalidates_without_download(cache, storage, clock):
+    storage.generation = 1
+    cache.resolve("u1")
+    settle(cache)
+    clock.advance(61)
+    cache.resolve("u1")
+    settle(cache)
+    assert storage.fetches == 1 and cache.stats()["served"]["refreshes"] == 2
+
+
+def test_invalidate_during_refresh_reruns_it(cache, storage):
+    storage.generation = 1
+    storage.hold = threading.Event()
+    cache.resolve("u1")                                # refresh starts, fetches generation 1
+    assert storage.fetching.wait(5)
+
+    storage.generation = 2                             # retrain uploads while it is running
+    cache.invalidate("u1")
+    storage.hold.set()
+    settle(cache)
+
+    assert cache.resolve("u1")[0]["version"] == "user:2"
+    assert storage.fetches == 2
+
+
+def test_deleted_model_falls_back_to_base(cache, storage):
+    storage.generation = 1
+    cache.resolve("u1")
+    settle(cache)
+    storage.generation = None
+    cache.invalidate("u1")
+    assert cache.resolve("u1")[0]["version"] == "user:1"   # old one until the refresh lands
+    settle(cache)
+    assert cache.resolve("u1") == (BASE, "base")
+    assert cache.state("u1") == "no_model"